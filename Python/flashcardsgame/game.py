@@ -18,8 +18,26 @@ import struct
 import wave
 import io
 import threading
+import queue
+import functools
+import heapq
+import bisect
+import re
+import concurrent.futures
+import graphlib
+import hashlib
 import os
 import sys
+import shutil
+import subprocess
+import collections
+import itertools
+from array import array
+
+try:
+    import numpy as np          # optional: faster PCM synthesis
+except ImportError:
+    np = None
 
 # ─────────────────────────── ACHIEVEMENT DEFINITIONS ─────────────────────────
 
@@ -101,6 +119,8 @@ ACHIEVEMENTS = [
 ]
 
 # ─────────────────────────── FLASHCARD DATA ──────────────────────────────────
+# The built-in "cs" deck.  It is imported into the cards table when it
+# changes (see BUILTIN_DECK_HASH); the game itself reads cards from there.
 
 FLASHCARDS = {
     # ── Original 25 ──────────────────────────────────────────────────────────
@@ -248,18 +268,37 @@ CARD_CATEGORIES = {
     "Logic Gates":  ["AND","OR","NOT","NAND","NOR","XOR"],
     "Misc":         ["VR","PAYLOAD","TRAILER","INFORMATION","INPUT"],
 }
+# term -> category for the built-in deck; unlisted terms are "Misc"
+TERM_CATEGORY = {t: cat for cat, terms in CARD_CATEGORIES.items() for t in terms}
+
+# The deck played unless --deck picks another
+DEFAULT_DECK = "cs"
+
+# Changes whenever FLASHCARDS or CARD_CATEGORIES is edited; the built-in
+# deck is re-imported then
+BUILTIN_DECK_HASH = hashlib.sha1(
+    repr((FLASHCARDS, CARD_CATEGORIES)).encode()).hexdigest()
 
 # ── Daily challenge seeds (10 cards per day) ──────────────────────────────────
-ALL_CARDS = list(FLASHCARDS.keys())
+DAILY_CARDS = 10
 
-def get_daily_cards():
-    """Return a stable list of 10 cards for today."""
-    today = date.today()
-    seed  = today.year * 10000 + today.month * 100 + today.day
-    rng   = random.Random(seed)
-    cards = list(FLASHCARDS.keys())
-    rng.shuffle(cards)
-    return cards[:10]
+def sample_daily_cards(terms, deck_id, day, k=DAILY_CARDS):
+    """
+    k distinct terms for a deck and date, seeded by both.  Draws indexes
+    until k are distinct, so the cost is O(k) however big the deck is.
+    DatabaseManager.get_daily_cards stores the result, which keeps a day's
+    challenge fixed if cards are added later.
+    """
+    rng    = random.Random(f"{deck_id}:{day.isoformat()}")
+    k      = min(k, len(terms))
+    picked = set()
+    cards  = []
+    while len(cards) < k:
+        i = rng.randrange(len(terms))
+        if i not in picked:
+            picked.add(i)
+            cards.append(terms[i])
+    return cards
 
 # ── Daily Quests definition ───────────────────────────────────────────────────
 DAILY_QUESTS = [
@@ -291,9 +330,52 @@ BADGE_DEPENDENCIES = {
     "Dominant":             ["Duelist"],
 }
 
+# Prerequisites before the badges that need them, so one pass over a
+# sorted candidate list can award a badge and its dependants together.
+BADGE_ORDER = {name: i for i, name in enumerate(
+    graphlib.TopologicalSorter(BADGE_DEPENDENCIES).static_order())}
+
+# Changes whenever ACHIEVEMENTS is edited; the badges table is re-seeded then
+BADGE_CATALOGUE_HASH = hashlib.sha1(repr(ACHIEVEMENTS).encode()).hexdigest()
+
 SPEEDRUN_UNLOCK_AT  = 40
 TIMEWARP_UNLOCK_AT  = 100
 
+# UPDATE ... RETURNING needs SQLite 3.35+; older builds re-select the columns
+SQLITE_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+# SQLite access: WAL, one writer thread, results polled back onto Tk
+DB_BUSY_TIMEOUT_MS = 5000
+DB_READ_WORKERS    = 2
+DB_POLL_MS         = 20
+
+# Animation clock: one Tk timer drives every animation at this period
+ANIM_FRAME_MS = 16
+
+# SFX playback: sounds waiting to start, and players running at once
+SFX_QUEUE_MAX  = 4
+SFX_MAX_VOICES = 4
+
+# Streamed music: samples synthesised per write to the player's stdin
+MUSIC_CHUNK = 2048
+
+# Built screens kept (hidden) for reuse by show_frame
+SCREEN_POOL_SIZE = 6
+
+# Leaderboard rows fetched per page
+LEADERBOARD_PAGE = 50
+
+# Card search: results per query, FTS matches ranked per query, the
+# shortest last word matched as a prefix, and the typing pause before a query
+SEARCH_LIMIT       = 200
+SEARCH_CANDIDATES  = 300
+SEARCH_MIN_PREFIX  = 2
+SEARCH_DEBOUNCE_MS = 150
+
+# Answer journal: per-answer writes are buffered and committed together
+JOURNAL_FLUSH_EVERY   = 10     # answers
+JOURNAL_FLUSH_SECONDS = 15     # max age of an unflushed answer
+
 # ─────────────────────────── COLOUR PALETTE ──────────────────────────────────
 
 C = {
@@ -322,41 +404,636 @@ FONT_SMALL = ("Segoe UI", 11)
 FONT_MONO  = ("Consolas", 13)
 
 
-# ══════════════════════════ DATABASE MANAGER ═════════════════════════════════
+# ══════════════════════════ DATABASE EXECUTOR ════════════════════════════════
+
+def _open_db(db_path):
+    conn = sqlite3.connect(db_path, timeout=DB_BUSY_TIMEOUT_MS / 1000,
+                           check_same_thread=False)
+    conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+    return conn
+
+
+class DBExecutor:
+    """
+    Runs SQLite work off the Tk thread.
+      • every write goes through one dedicated writer thread (one connection,
+        WAL journal), so writes are serialised and never block the UI
+      • every other thread reads through its own connection; WAL lets those
+        reads run while the writer is busy
+    Work is handed out as concurrent.futures.Future objects.
+    """
+
+    def __init__(self, db_path):
+        self.db_path     = db_path
+        self._local      = threading.local()
+        self._lock       = threading.Lock()
+        self._readers    = []
+        self._last_write = None
+        self._queue      = queue.Queue()
+        self._writer     = threading.Thread(target=self._run_writer,
+                                            name="db-writer", daemon=True)
+        self._writer.start()
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=DB_READ_WORKERS, thread_name_prefix="db-reader")
+
+    # ---------- connections ----------
+
+    def connection(self):
+        """Connection owned by the calling thread (opened on first use)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = _open_db(self.db_path)
+            self._local.conn = conn
+            with self._lock:
+                self._readers.append(conn)
+        return conn
+
+    def in_writer(self):
+        return threading.current_thread() is self._writer
+
+    # ---------- writer ----------
+
+    def _run_writer(self):
+        conn = _open_db(self.db_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        self._local.conn = conn
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            fn, fut = item
+            if not fut.set_running_or_notify_cancel():
+                continue
+            try:
+                fut.set_result(fn())
+            except BaseException as e:
+                try: conn.rollback()
+                except sqlite3.Error: pass
+                fut.set_exception(e)
+        conn.close()
+
+    def write(self, fn):
+        """Queue fn on the writer thread; return its Future."""
+        fut = concurrent.futures.Future()
+        with self._lock:
+            self._last_write = fut
+            self._queue.put((fn, fut))
+        return fut
+
+    def sync(self):
+        """Block until every write queued so far has been applied."""
+        fut = self._last_write
+        if fut is not None and not self.in_writer():
+            concurrent.futures.wait([fut])
+
+    # ---------- readers ----------
+
+    def read(self, fn):
+        """Run fn on a reader thread after the writes queued so far."""
+        barrier = self._last_write
+
+        def _job():
+            if barrier is not None:
+                concurrent.futures.wait([barrier])
+            return fn()
+        return self._pool.submit(_job)
+
+    def close(self):
+        self._queue.put(None)
+        self._writer.join(timeout=10)
+        self._pool.shutdown(wait=True)
+        with self._lock:
+            for conn in self._readers:
+                try: conn.close()
+                except sqlite3.Error: pass
+            self._readers.clear()
+
+
+def _db_read(fn):
+    """Read on the calling thread's connection once pending writes landed."""
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        if not self._exec.in_writer():
+            self.flush_journal()
+            self._exec.sync()
+        return fn(self, *args, **kwargs)
+    wrapper.db_kind = "read"
+    return wrapper
+
+
+def _db_write(wait=True):
+    """
+    Run on the writer thread.  wait=True blocks for the return value (for
+    callers that branch on it); wait=False returns the Future immediately.
+    Calls made from the writer thread itself run inline.
+    """
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            if self._exec.in_writer():
+                return fn(self, *args, **kwargs)
+            fut = self._exec.write(lambda: fn(self, *args, **kwargs))
+            return fut.result() if wait else fut
+        wrapper.db_kind = "write"
+        return wrapper
+    return deco
+
+
+# ══════════════════════════ ANSWER JOURNAL ═══════════════════════════════════
+
+class AnswerJournal:
+    """
+    In-memory buffer of the writes made on every Correct/Wrong click
+    (streak, card result, coins).  DatabaseManager flushes it in a single
+    transaction so an answer costs no commit of its own.
+    """
+
+    def __init__(self):
+        self.streaks  = []   # (correct, correct, correct, timestamp, user_id)
+        self.cards    = []   # (user_id, deck_id, term, category, correct, unix time)
+        self.coins    = {}   # user_id -> coins earned since last flush
+        self.answers  = 0
+        self.first_at = None
+
+    def __len__(self):
+        return len(self.streaks) + len(self.cards) + len(self.coins)
+
+    def touch(self):
+        if self.first_at is None:
+            self.first_at = time.time()
+
+    def is_due(self):
+        if not self:
+            return False
+        return (self.answers >= JOURNAL_FLUSH_EVERY or
+                time.time() - self.first_at >= JOURNAL_FLUSH_SECONDS)
+
+
+# ══════════════════════════ BADGE ENGINE ═════════════════════════════════════
+
+class BadgeEngine:
+    """
+    Evaluates badge awards in memory. The catalogue's name -> id map (at
+    the first award) and each user's earned set are loaded once; an
+    event's candidates are checked in BADGE_ORDER and the new rows are
+    written in one executemany.
+    Only used from the DB writer thread.
+    """
+
+    def __init__(self):
+        self.ids    = None  # badge_name -> badge id
+        self.earned = {}   # user_id -> set of earned badge names
+
+    def load(self, conn):
+        self.ids = dict(conn.execute("SELECT badge_name, id FROM badges").fetchall())
+        self.earned.clear()
+
+    def earned_by(self, conn, user_id):
+        earned = self.earned.get(user_id)
+        if earned is None:
+            earned = self.earned[user_id] = {r[0] for r in conn.execute("""
+                SELECT b.badge_name FROM badges b
+                JOIN user_badges ub ON b.id=ub.badge_id
+                WHERE ub.user_id=?""", (user_id,)).fetchall()}
+        return earned
+
+    def _grant(self, name, have, new):
+        if (name in self.ids and name not in have and
+                all(dep in have for dep in BADGE_DEPENDENCIES.get(name, ()))):
+            have.add(name)
+            new.append(name)
+
+    def award(self, conn, user_id, candidates):
+        """
+        Award every eligible badge in candidates plus the badge-count badges
+        they unlock. Returns the newly earned candidates in the order given;
+        the count badges are awarded silently, as before.
+        """
+        if self.ids is None:
+            self.load(conn)
+        candidates = list(dict.fromkeys(candidates))
+        earned = self.earned_by(conn, user_id)
+        have, new = set(earned), []
+        for name in sorted(candidates, key=lambda n: BADGE_ORDER.get(n, 0)):
+            self._grant(name, have, new)
+        total = len(self.ids)
+        while new:
+            before = len(new)
+            if len(have) >= 10:
+                self._grant("Root Access", have, new)
+            if len(have) >= 20:
+                self._grant("System Administrator", have, new)
+            # Legendary: every other achievement unlocked
+            if len(have) >= total - 1:
+                self._grant("Legendary", have, new)
+            if len(new) == before:
+                break
+        if not new:
+            return []
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO user_badges(user_id,badge_id) VALUES(?,?)",
+                [(user_id, self.ids[name]) for name in new])
+            conn.execute("UPDATE users SET badge_count=? WHERE id=?",
+                         (len(have), user_id))
+        earned.update(new)
+        granted = set(new)
+        return [name for name in candidates if name in granted]
+
+
+# ══════════════════════════ POWER-UP INVENTORY ═══════════════════════════════
+
+class PowerUpInventory:
+    """
+    One user's power-up counts. DatabaseManager hands out a single cached
+    instance per user and updates it after each committed change, so the
+    HUD and shop read counts without touching the database.
+    """
+
+    def __init__(self, rows=()):
+        self.counts = {pup_id: 0 for pup_id, *_ in POWERUPS}
+        self.counts.update(rows)
+
+    def __getitem__(self, pup_id):
+        return self.counts.get(pup_id, 0)
+
+
+# ══════════════════════════ CARD STORE ═══════════════════════════════════════
+
+Card = collections.namedtuple("Card", "term definition category")
+
+
+class Deck:
+    """
+    One deck, loaded whole from the cards table on first use: a term -> Card
+    index plus its terms and categories in deck order.  Screens keep a
+    reference and look cards up here instead of querying.
+    """
+
+    def __init__(self, deck_id, name, categories, rows):
+        self.id    = deck_id
+        self.name  = name
+        self.cards = {term: Card(term, definition, category)
+                      for term, definition, category in rows}
+        self.terms = list(self.cards)
+        seen = dict.fromkeys(categories)
+        seen.update(dict.fromkeys(c.category for c in self.cards.values()))
+        self.categories = list(seen)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def __contains__(self, term):
+        return term in self.cards
+
+    def __getitem__(self, term):
+        return self.cards[term]
+
+    def definition(self, term):
+        card = self.cards.get(term)
+        return card.definition if card else ""
+
+    def category(self, term):
+        card = self.cards.get(term)
+        return card.category if card else "Misc"
+
+    @functools.cached_property
+    def search_index(self):
+        """SearchIndex over this deck, built on first use (only without FTS5)."""
+        return SearchIndex(self)
+
+
+def search_tokens(text):
+    """Lower-cased words, split the way FTS5's unicode61 tokenizer splits them."""
+    return re.findall(r"[^\W_]+", text.lower())
+
+
+def parse_search(query):
+    """(words, last word is a prefix): the last word is still being typed."""
+    words = search_tokens(query)
+    prefix = (bool(words) and not query[-1:].isspace()
+              and len(words[-1]) >= SEARCH_MIN_PREFIX)
+    return words, prefix
+
+
+def fts_deck_token(deck_id):
+    """The single cards_fts token for a deck: 'd' || hex(deck_id) in SQL."""
+    return "d" + deck_id.encode().hex()
+
+
+def search_scorer(words, prefix):
+    """
+    score(term, definition) for ranking matches: SearchIndex.TERM_WEIGHT
+    per query word found in the term plus 1 per one in the definition.
+    """
+    alts = [re.escape(w) for w in words]
+    if prefix:
+        alts[-1] += r"[^\W_]*"
+    find = re.compile(r"(?<![^\W_])(?:%s)(?![^\W_])" % "|".join(alts)).findall
+
+    def score(term, definition):
+        return (SearchIndex.TERM_WEIGHT * len(find(term.lower()))
+                + len(find(definition.lower())))
+    return score
+
+
+class SearchIndex:
+    """
+    Inverted index over a deck's terms and definitions, used by
+    DatabaseManager.search_cards when SQLite has no FTS5.  Postings are
+    arrays of card indexes per word, over a sorted vocabulary with running
+    posting counts, so a prefix's match count is two bisects.  Like the
+    FTS5 path, at most SEARCH_CANDIDATES matches are collected and then
+    ranked with search_scorer.
+    """
+
+    TERM_WEIGHT = 10
+
+    def __init__(self, deck):
+        self._terms = deck.terms
+        self._text  = []   # (term, definition) lower-cased, by card index
+        postings = collections.defaultdict(lambda: array("I"))
+        for i, term in enumerate(deck.terms):
+            text = (term.lower(), deck.cards[term].definition.lower())
+            self._text.append(text)
+            for word in dict.fromkeys(search_tokens(" ".join(text))):
+                postings[word].append(i)
+        self._vocab    = sorted(postings)
+        self._postings = [postings[w] for w in self._vocab]
+        self._counts   = array("L", itertools.accumulate(
+            (len(p) for p in self._postings), initial=0))
+
+    def _span(self, word, prefix):
+        """Vocabulary indexes [lo, hi) of the words matching word."""
+        lo = bisect.bisect_left(self._vocab, word)
+        if prefix:
+            return lo, bisect.bisect_left(self._vocab, word + "\U0010ffff", lo)
+        return lo, lo + (lo < len(self._vocab) and self._vocab[lo] == word)
+
+    def _candidates(self, words, prefix, cap):
+        """
+        Up to cap card indexes matching every word: the word with the fewest
+        postings drives, and each of its cards is checked for the others,
+        by bisecting a whole word's postings (they are in card order) or
+        with a regex on the card for the prefix.
+        """
+        last  = len(words) - 1
+        spans = [self._span(w, prefix and n == last) for n, w in enumerate(words)]
+        driver = min(range(len(words)),
+                     key=lambda n: self._counts[spans[n][1]] - self._counts[spans[n][0]])
+        checks = []
+        for n, (lo, hi) in enumerate(spans):
+            if n == driver:
+                continue
+            if prefix and n == last:
+                find = re.compile(r"(?<![^\W_])%s" % re.escape(words[n])).search
+                checks.append(lambda i, find=find: any(map(find, self._text[i])))
+            elif lo == hi:
+                return []
+            else:
+                checks.append(functools.partial(self._posts, self._postings[lo]))
+        seen, found = set(), []
+        for v in range(*spans[driver]):
+            for i in self._postings[v]:
+                if i in seen:
+                    continue
+                seen.add(i)
+                if all(check(i) for check in checks):
+                    found.append(i)
+                    if len(found) >= cap:
+                        return found
+        return found
+
+    @staticmethod
+    def _posts(postings, i):
+        n = bisect.bisect_left(postings, i)
+        return n < len(postings) and postings[n] == i
+
+    def search(self, words, prefix, limit, candidates=SEARCH_CANDIDATES):
+        """Terms matching every word, best first; ties keep deck order."""
+        if not words:
+            return []
+        score = search_scorer(words, prefix)
+        found = self._candidates(words, prefix, candidates)
+        best  = heapq.nsmallest(limit, found, key=lambda i: (-score(*self._text[i]), i))
+        return [self._terms[i] for i in best]
+
+
+def load_deck_file(path):
+    """
+    Read a JSON deck file: {"id", "name", "version", optional "categories",
+    "cards"}, where cards is a list of {"term", "definition", "category"}
+    or a plain {term: definition} object.  Returns the arguments for
+    DatabaseManager.import_deck.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    cards = data["cards"]
+    if isinstance(cards, dict):
+        cards = [(t, d, "Misc") for t, d in cards.items()]
+    else:
+        cards = [(c["term"], c["definition"], c.get("category") or "Misc") for c in cards]
+    deck_id = data.get("id") or os.path.splitext(os.path.basename(path))[0]
+    return dict(deck_id=deck_id, name=data.get("name", deck_id), cards=cards,
+                version=int(data.get("version", 1)),
+                categories=data.get("categories", ()))
+
+
+# ══════════════════════════ DECK SCHEDULER ═══════════════════════════════════
+
+class DeckScheduler:
+    """
+    SM-2 spaced repetition over one user's cards.  Each card has an ease
+    factor, an interval in days, a run of correct answers and a due time
+    (unix seconds); next() takes the card due soonest from a heap in
+    O(log n).  Changed cards are pushed again; each card's latest entry is
+    remembered, older ones are skipped when they surface and dropped
+    whenever they outnumber the cards.  A missed card is due again within
+    the session rather than tomorrow, so a game can drill it.
+    """
+
+    NEW_EASE        = 2.5
+    MIN_EASE        = 1.3
+    RELEARN_SECONDS = 600   # a missed card comes back after this long
+    SHOWN_SECONDS   = 60    # a card shown but not answered waits this long
+
+    def __init__(self, terms, rows=()):
+        terms = list(terms)
+        random.shuffle(terms)   # new cards come up in random order
+        # term -> [ease, interval_days, reps, due]
+        self.state = {t: [self.NEW_EASE, 0.0, 0, 0.0] for t in terms}
+        for term, ease, interval, reps, due in rows:
+            if term in self.state:
+                self.state[term] = [ease, interval, reps, due]
+        self._heap = [(st[3], i, t) for i, (t, st) in enumerate(self.state.items())]
+        heapq.heapify(self._heap)
+        self._live = {t: i for _, i, t in self._heap}   # term -> seq of its current entry
+        self._seq  = len(self._heap)
+
+    def _push(self, term):
+        self._seq += 1
+        self._live[term] = self._seq
+        heapq.heappush(self._heap, (self.state[term][3], self._seq, term))
+        if len(self._heap) > 2 * len(self._live):
+            self._heap = [e for e in self._heap if self._live[e[2]] == e[1]]
+            heapq.heapify(self._heap)
+
+    def next(self, now=None):
+        """The card due soonest (overdue first); None if there are no cards."""
+        now = now or time.time()
+        while self._heap:
+            due, seq, term = heapq.heappop(self._heap)
+            if self._live[term] == seq:
+                break
+        else:
+            return None
+        # Not again until answered, or for a while if it never is
+        self.state[term][3] = max(due, now) + self.SHOWN_SECONDS
+        self._push(term)
+        return term
+
+    @classmethod
+    def advance(cls, state, correct, now):
+        """[ease, interval_days, reps, due] after one answer as SM-2 quality 4 (correct) or 1."""
+        ease, interval, reps, _ = state or (cls.NEW_EASE, 0.0, 0, 0.0)
+        q    = 4 if correct else 1
+        ease = max(cls.MIN_EASE, ease + 0.1 - (5 - q) * (0.08 + (5 - q) * 0.02))
+        if correct:
+            interval = 1.0 if reps == 0 else 6.0 if reps == 1 else interval * ease
+            reps    += 1
+            due      = now + interval * 86400
+        else:
+            interval, reps = 0.0, 0
+            due = now + cls.RELEARN_SECONDS
+        return [ease, interval, reps, due]
+
+    def record(self, term, correct, now=None):
+        """Apply one answer; returns the card's new state."""
+        self.state[term] = self.advance(self.state.get(term), correct, now or time.time())
+        self._push(term)
+        return self.state[term]
+
+
 # ══════════════════════════ DATABASE MANAGER ═════════════════════════════════
 
 class DatabaseManager:
+    """
+    All game persistence.  Method bodies use self.conn, which resolves to
+    the connection of whichever thread runs them: reads run on the caller's
+    own connection, writes are shipped to the DBExecutor writer thread.
+    """
+
     def __init__(self, db_path="flashcard_game.db"):
-        self.conn = sqlite3.connect(db_path)
-        self._create_tables()
-        self._migrate_schema()
-        self._seed_badges()
+        self._exec         = DBExecutor(db_path)
+        self._journal      = AnswerJournal()
+        self._journal_lock = threading.Lock()
+        # Identity map of user records: one dict per user id, patched in
+        # place by every UPDATE users path so it never needs a re-read.
+        self._users        = {}   # user_id -> record dict
+        self._user_ids     = {}   # username -> user_id
+        self._user_lock    = threading.Lock()
+        self._badges       = BadgeEngine()
+        self._inventories  = {}   # user_id -> PowerUpInventory, guarded by _user_lock
+        self._schedulers   = {}   # (user_id, deck_id) -> DeckScheduler, guarded by _journal_lock
+        self._decks        = {}   # deck_id -> Deck, guarded by _user_lock
+        self._fts          = None  # cards_fts exists; checked on first search
+        self._daily        = {}   # (deck_id, date_str) -> terms, guarded by _user_lock
+        # Heatmap totals per user; record_card_result drops a user's entry
+        self._cat_stats    = {}   # (user_id, deck_id) -> {category: [correct, wrong]}
+        self._card_writes  = {}   # user_id -> answers recorded, to spot stale reads
+        self._exec.write(self._setup).result()
+
+    @property
+    def conn(self):
+        return self._exec.connection()
+
+    def _setup(self):
+        self._migrate()
+        # users columns are fixed once migrated: select them by name, in
+        # this order, so a record is one zip with no cursor.description
+        self._user_cols = tuple(r[1] for r in self.conn.execute("PRAGMA table_info(users)"))
+        self._user_sql  = "SELECT {} FROM users WHERE ".format(
+            ", ".join(f'"{c}"' for c in self._user_cols))
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Run a DatabaseManager method (or any callable doing DB work) without
+        blocking the caller; returns a Future.  Reads go to a reader thread,
+        everything else to the writer thread.  Use FlashcardApp.db_async to
+        get the result back on the Tk thread.
+        """
+        if getattr(fn, "db_kind", None) == "read":
+            self.flush_journal()
+            return self._exec.read(lambda: fn(*args, **kwargs))
+        return self._exec.write(lambda: fn(*args, **kwargs))
+
+    # ── Schema ───────────────────────────────────────────────────────────────
+    # Numbered migration steps.  PRAGMA user_version counts the steps already
+    # applied to a file; add new steps at the end, never edit released ones.
+    # Steps 1-6 also run against files from before user_version was used,
+    # so they check for what older versions of the game may have created.
+
+    def _migrate(self):
+        steps = [self._schema_v1, self._schema_v2, self._schema_v3,
+                 self._schema_v4, self._schema_v5, self._schema_v6,
+                 self._schema_v7, self._schema_v8, self._schema_v9,
+                 self._schema_v10, self._schema_v11, self._schema_v12,
+                 self._schema_v13]
+        version, badge_hash, deck_hash = self._schema_state()
+        if (version >= len(steps) and badge_hash == BADGE_CATALOGUE_HASH
+                and deck_hash == BUILTIN_DECK_HASH):
+            return
+        cur = self.conn.cursor()
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            for step in steps[version:]:
+                step(cur)
+            if badge_hash != BADGE_CATALOGUE_HASH:
+                self._seed_badges(cur)
+            if deck_hash != BUILTIN_DECK_HASH:
+                self._seed_builtin_deck(cur)
+            cur.execute(f"PRAGMA user_version={max(version, len(steps))}")
+        except BaseException:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
 
-    def _create_tables(self):
-        self.conn.executescript("""
+    def _schema_state(self):
+        """(user_version, stored badge catalogue hash, built-in deck hash) in a single read."""
+        try:
+            return self.conn.execute("""
+                SELECT user_version,
+                       (SELECT value FROM schema_meta WHERE key='badge_hash'),
+                       (SELECT value FROM schema_meta WHERE key='deck_hash')
+                FROM pragma_user_version""").fetchone()
+        except sqlite3.OperationalError:
+            # No schema_meta yet: a new file or one older than step 7
+            return self.conn.execute("PRAGMA user_version").fetchone()[0], None, None
+
+    def _schema_v1(self, cur):
+        """The schema as it stood before versioned migrations."""
+        cur.execute("""
             CREATE TABLE IF NOT EXISTS users (
                 id                INTEGER PRIMARY KEY AUTOINCREMENT,
                 username          TEXT UNIQUE NOT NULL,
                 code              TEXT NOT NULL,
                 endless_highscore INTEGER DEFAULT 0,
                 total_answered    INTEGER DEFAULT 0
-            );
+            )""")
+        cur.execute("""
             CREATE TABLE IF NOT EXISTS badges (
                 id          INTEGER PRIMARY KEY AUTOINCREMENT,
                 badge_name  TEXT UNIQUE,
                 description TEXT,
                 icon        TEXT
-            );
+            )""")
+        cur.execute("""
             CREATE TABLE IF NOT EXISTS user_badges (
                 user_id  INTEGER,
                 badge_id INTEGER,
                 PRIMARY KEY (user_id, badge_id)
-            );
-        """)
-        self.conn.commit()
-
-    def _migrate_schema(self):
-        cur = self.conn.cursor()
+            )""")
         new_cols = [
             ("total_correct",             "INTEGER DEFAULT 0"),
             ("games_played",              "INTEGER DEFAULT 0"),
@@ -374,23 +1051,23 @@ class DatabaseManager:
             ("daily_challenge_streak",    "INTEGER DEFAULT 0"),
             ("last_daily_date",           "TEXT DEFAULT ''"),
             ("quests_completed",          "INTEGER DEFAULT 0"),
-            ("modes_played_today",        "TEXT DEFAULT '[]'"),
-            ("session_modes_won",         "TEXT DEFAULT '[]'"),
+            ("modes_played_today",        "TEXT DEFAULT '[]'"),   # legacy: modes_played
+            ("session_modes_won",         "TEXT DEFAULT '[]'"),   # legacy: session_modes_won table
             ("timewarp_highscore",        "INTEGER DEFAULT 0"),
             ("timewarp_unlocked",         "INTEGER DEFAULT 0"),
             ("total_playtime_seconds",    "INTEGER DEFAULT 0"),
+            # legacy: power-up counts now live in user_powerups
             ("powerup_shield",            "INTEGER DEFAULT 0"),
             ("powerup_time_freeze",       "INTEGER DEFAULT 0"),
             ("powerup_peek",              "INTEGER DEFAULT 0"),
             ("powerup_skip",              "INTEGER DEFAULT 0"),
             ("powerup_double_points",     "INTEGER DEFAULT 0"),
         ]
-        existing = {r[1] for r in cur.execute("PRAGMA table_info(users)").fetchall()}
+        existing = self._columns(cur, "users")
         for col, typedef in new_cols:
             if col not in existing:
                 cur.execute(f"ALTER TABLE users ADD COLUMN {col} {typedef}")
 
-        # Create game_history table if it doesn't exist
         cur.execute("""
             CREATE TABLE IF NOT EXISTS game_history (
                 id                 INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -402,13 +1079,10 @@ class DatabaseManager:
                 timestamp          TEXT NOT NULL
             )
         """)
-        
-        # If table exists but doesn't have accuracy column, add it
-        try:
-            cur.execute("SELECT accuracy FROM game_history LIMIT 1")
-        except sqlite3.OperationalError:
+        # Very old files have game_history without the accuracy column
+        if "accuracy" not in self._columns(cur, "game_history"):
             cur.execute("ALTER TABLE game_history ADD COLUMN accuracy REAL DEFAULT 0")
-        
+
         # Card performance tracking
         cur.execute("""
             CREATE TABLE IF NOT EXISTS card_performance (
@@ -443,227 +1117,917 @@ class DatabaseManager:
                 UNIQUE(user_id, quest_id, date_str)
             )
         """)
-        self.conn.commit()
 
-    def _seed_badges(self):
-        cur = self.conn.cursor()
-        for name, desc, icon in ACHIEVEMENTS:
-            cur.execute(
-                "INSERT OR IGNORE INTO badges (badge_name, description, icon) VALUES (?,?,?)",
-                (name, desc, icon))
-        self.conn.commit()
+    def _schema_v2(self, cur):
+        """Materialized badge_count and the leaderboard index."""
+        if "badge_count" not in self._columns(cur, "users"):
+            cur.execute("ALTER TABLE users ADD COLUMN badge_count INTEGER DEFAULT 0")
+        # award_badges keeps it current from here on
+        cur.execute("""
+            UPDATE users SET badge_count=(
+                SELECT COUNT(*) FROM user_badges WHERE user_id=users.id)""")
+        # Leaderboard order, walked backwards for keyset pagination
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_users_leaderboard
+            ON users(endless_highscore, total_answered, id)""")
+
+    def _schema_v3(self, cur):
+        """Category on card_performance for the heatmap."""
+        if "category" not in self._columns(cur, "card_performance"):
+            cur.execute("ALTER TABLE card_performance ADD COLUMN category TEXT DEFAULT 'Misc'")
+        cur.executemany("UPDATE card_performance SET category=? WHERE card_term=?",
+                        [(cat, t) for t, cat in TERM_CATEGORY.items()])
+        # Covers the heatmap's GROUP BY category
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_card_perf_category
+            ON card_performance(user_id, category, correct, wrong)""")
+
+    def _schema_v4(self, cur):
+        """Per-user, per-day accuracy rollup maintained by save_game_history."""
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_game_history_user_time
+            ON game_history(user_id, timestamp)""")
+        cur.execute("DROP TABLE IF EXISTS daily_accuracy")
+        cur.execute("""
+            CREATE TABLE daily_accuracy (
+                user_id       INTEGER NOT NULL,
+                day           TEXT NOT NULL,
+                games         INTEGER DEFAULT 0,
+                accuracy_sum  REAL DEFAULT 0,
+                PRIMARY KEY (user_id, day)
+            ) WITHOUT ROWID
+        """)
+        # Backfill from the history recorded so far
+        cur.execute("""
+            INSERT INTO daily_accuracy(user_id, day, games, accuracy_sum)
+            SELECT user_id, DATE(timestamp), COUNT(*), SUM(accuracy)
+            FROM game_history WHERE questions_answered>0
+            GROUP BY user_id, DATE(timestamp)""")
+
+    def _schema_v5(self, cur):
+        """
+        Modes played per day (all_modes quest) and won this session
+        (Triple Threat); these replace the JSON blobs on users.
+        """
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS modes_played (
+                user_id   INTEGER NOT NULL,
+                date_str  TEXT NOT NULL,
+                mode      TEXT NOT NULL,
+                PRIMARY KEY (user_id, date_str, mode)
+            ) WITHOUT ROWID
+        """)
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS session_modes_won (
+                user_id  INTEGER NOT NULL,
+                mode     TEXT NOT NULL,
+                PRIMARY KEY (user_id, mode)
+            ) WITHOUT ROWID
+        """)
+        # Move today's entries out of the old blob
+        today = date.today().isoformat()
+        for uid, blob in cur.execute(
+                "SELECT id, modes_played_today FROM users "
+                "WHERE modes_played_today NOT IN ('', '[]')").fetchall():
+            try:
+                stored = json.loads(blob)
+            except ValueError:
+                continue
+            cur.executemany(
+                "INSERT OR IGNORE INTO modes_played(user_id, date_str, mode) VALUES(?,?,?)",
+                [(uid, d, m) for m, d in stored if d == today])
+        cur.execute("UPDATE users SET modes_played_today='[]', session_modes_won='[]'")
+
+    def _schema_v6(self, cur):
+        """Power-up inventory, one row per (user, power-up)."""
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS user_powerups (
+                user_id  INTEGER NOT NULL,
+                pup_id   TEXT NOT NULL,
+                qty      INTEGER NOT NULL DEFAULT 0 CHECK (qty >= 0),
+                PRIMARY KEY (user_id, pup_id)
+            ) WITHOUT ROWID
+        """)
+        # Move the per-power-up columns on users
+        for pup_id, *_ in POWERUPS:
+            cur.execute(f"""
+                INSERT INTO user_powerups(user_id, pup_id, qty)
+                SELECT id, ?, powerup_{pup_id} FROM users WHERE powerup_{pup_id}>0
+                ON CONFLICT(user_id, pup_id) DO UPDATE SET qty = qty + excluded.qty""",
+                (pup_id,))
+            cur.execute(f"UPDATE users SET powerup_{pup_id}=0")
+
+    def _schema_v7(self, cur):
+        """Key/value facts about the file itself, e.g. the seeded badge hash."""
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_meta (
+                key    TEXT PRIMARY KEY,
+                value  TEXT
+            )""")
+
+    def _schema_v8(self, cur):
+        """SM-2 spaced-repetition state on card_performance."""
+        have = self._columns(cur, "card_performance")
+        for col, decl in (("ease",          f"REAL DEFAULT {DeckScheduler.NEW_EASE}"),
+                          ("interval_days", "REAL DEFAULT 0"),
+                          ("reps",          "INTEGER DEFAULT 0"),
+                          ("due",           "REAL DEFAULT 0")):
+            if col not in have:
+                cur.execute(f"ALTER TABLE card_performance ADD COLUMN {col} {decl}")
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_card_perf_due
+            ON card_performance(user_id, due)""")
+
+    def _schema_v9(self, cur):
+        """Card store: decks and their cards, replacing the FLASHCARDS literal."""
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS decks (
+                id          TEXT PRIMARY KEY,
+                name        TEXT NOT NULL,
+                version     INTEGER NOT NULL DEFAULT 1,
+                categories  TEXT NOT NULL DEFAULT '[]',
+                card_count  INTEGER NOT NULL DEFAULT 0
+            )""")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS cards (
+                id          INTEGER PRIMARY KEY,
+                deck_id     TEXT NOT NULL REFERENCES decks(id),
+                term        TEXT NOT NULL,
+                definition  TEXT NOT NULL,
+                category    TEXT NOT NULL DEFAULT 'Misc',
+                UNIQUE(deck_id, term)
+            )""")
+
+    def _schema_v10(self, cur):
+        """Full-text index over card terms and definitions, if SQLite has FTS5."""
+        try:
+            cur.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS cards_fts USING fts5(
+                    term, definition, content='cards', content_rowid='id',
+                    prefix='2 3')""")
+        except sqlite3.OperationalError:
+            return   # no FTS5 in this build: search_cards uses Deck.search_index
+        cur.execute("""
+            CREATE TRIGGER IF NOT EXISTS cards_fts_ai AFTER INSERT ON cards BEGIN
+                INSERT INTO cards_fts(rowid, term, definition)
+                VALUES (new.id, new.term, new.definition);
+            END""")
+        cur.execute("""
+            CREATE TRIGGER IF NOT EXISTS cards_fts_ad AFTER DELETE ON cards BEGIN
+                INSERT INTO cards_fts(cards_fts, rowid, term, definition)
+                VALUES ('delete', old.id, old.term, old.definition);
+            END""")
+        cur.execute("""
+            CREATE TRIGGER IF NOT EXISTS cards_fts_au AFTER UPDATE ON cards BEGIN
+                INSERT INTO cards_fts(cards_fts, rowid, term, definition)
+                VALUES ('delete', old.id, old.term, old.definition);
+                INSERT INTO cards_fts(rowid, term, definition)
+                VALUES (new.id, new.term, new.definition);
+            END""")
+        cur.execute("INSERT INTO cards_fts(cards_fts) VALUES('rebuild')")
+
+    def _schema_v11(self, cur):
+        """Daily challenge cards, stored per deck and date once chosen."""
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS daily_challenges (
+                deck_id   TEXT NOT NULL,
+                date_str  TEXT NOT NULL,
+                terms     TEXT NOT NULL,
+                PRIMARY KEY (deck_id, date_str)
+            )""")
+
+    def _schema_v12(self, cur):
+        """
+        Per-deck card progress: card_performance gains deck_id and is keyed
+        on (user_id, deck_id, card_term), so decks sharing a term keep
+        separate counts and SM-2 state.  Existing rows belong to the
+        built-in deck.  SQLite can't change a UNIQUE constraint in place,
+        so the table is rebuilt.
+        """
+        cur.execute("""
+            CREATE TABLE card_performance_v12 (
+                id            INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id       INTEGER NOT NULL,
+                deck_id       TEXT NOT NULL DEFAULT 'cs',
+                card_term     TEXT NOT NULL,
+                correct       INTEGER DEFAULT 0,
+                wrong         INTEGER DEFAULT 0,
+                last_seen     TEXT DEFAULT '',
+                category      TEXT DEFAULT 'Misc',
+                ease          REAL DEFAULT 2.5,
+                interval_days REAL DEFAULT 0,
+                reps          INTEGER DEFAULT 0,
+                due           REAL DEFAULT 0,
+                UNIQUE(user_id, deck_id, card_term)
+            )""")
+        cur.execute("""
+            INSERT INTO card_performance_v12(id, user_id, deck_id, card_term, correct, wrong,
+                                             last_seen, category, ease, interval_days, reps, due)
+            SELECT id, user_id, ?, card_term, correct, wrong,
+                   last_seen, category, ease, interval_days, reps, due
+            FROM card_performance""", (DEFAULT_DECK,))
+        cur.execute("DROP TABLE card_performance")
+        cur.execute("ALTER TABLE card_performance_v12 RENAME TO card_performance")
+        cur.execute("""
+            CREATE INDEX idx_card_perf_category
+            ON card_performance(user_id, deck_id, category, correct, wrong)""")
+        cur.execute("""
+            CREATE INDEX idx_card_perf_due
+            ON card_performance(user_id, deck_id, due)""")
+
+    def _schema_v13(self, cur):
+        """
+        cards_fts gains a deck column so search_cards can filter on the deck
+        inside the MATCH.  It indexes one token per deck (fts_deck_token),
+        read through the cards_fts_content view since cards has no such
+        column; the triggers are replaced to write it.  Prefixes of up to
+        five characters are indexed, so a typed prefix is one doclist
+        rather than a merge of every word it expands to.
+        """
+        for trigger in ("cards_fts_ai", "cards_fts_ad", "cards_fts_au"):
+            cur.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        cur.execute("DROP TABLE IF EXISTS cards_fts")
+        cur.execute("""
+            CREATE VIEW IF NOT EXISTS cards_fts_content AS
+            SELECT id, term, definition, 'd' || hex(deck_id) AS deck FROM cards""")
+        try:
+            cur.execute("""
+                CREATE VIRTUAL TABLE cards_fts USING fts5(
+                    term, definition, deck, content='cards_fts_content',
+                    content_rowid='id', prefix='2 3 4 5')""")
+        except sqlite3.OperationalError:
+            return   # no FTS5 in this build: search_cards uses Deck.search_index
+        cur.execute("""
+            CREATE TRIGGER cards_fts_ai AFTER INSERT ON cards BEGIN
+                INSERT INTO cards_fts(rowid, term, definition, deck)
+                VALUES (new.id, new.term, new.definition, 'd' || hex(new.deck_id));
+            END""")
+        cur.execute("""
+            CREATE TRIGGER cards_fts_ad AFTER DELETE ON cards BEGIN
+                INSERT INTO cards_fts(cards_fts, rowid, term, definition, deck)
+                VALUES ('delete', old.id, old.term, old.definition, 'd' || hex(old.deck_id));
+            END""")
+        cur.execute("""
+            CREATE TRIGGER cards_fts_au AFTER UPDATE ON cards BEGIN
+                INSERT INTO cards_fts(cards_fts, rowid, term, definition, deck)
+                VALUES ('delete', old.id, old.term, old.definition, 'd' || hex(old.deck_id));
+                INSERT INTO cards_fts(rowid, term, definition, deck)
+                VALUES (new.id, new.term, new.definition, 'd' || hex(new.deck_id));
+            END""")
+        cur.execute("INSERT INTO cards_fts(cards_fts) VALUES('rebuild')")
+
+    @staticmethod
+    def _columns(cur, table):
+        return {r[1] for r in cur.execute(f"PRAGMA table_info({table})").fetchall()}
+
+    def _seed_badges(self, cur):
+        cur.executemany("""
+            INSERT INTO badges (badge_name, description, icon) VALUES (?,?,?)
+            ON CONFLICT(badge_name) DO UPDATE SET
+                description = excluded.description,
+                icon        = excluded.icon""", ACHIEVEMENTS)
+        cur.execute("INSERT OR REPLACE INTO schema_meta(key, value) VALUES('badge_hash', ?)",
+                    (BADGE_CATALOGUE_HASH,))
+
+    def _seed_builtin_deck(self, cur):
+        """Import FLASHCARDS / CARD_CATEGORIES as the "cs" deck."""
+        self._write_deck(cur, DEFAULT_DECK, "Computer Science",
+                         [(t, d, TERM_CATEGORY.get(t, "Misc")) for t, d in FLASHCARDS.items()],
+                         version=1, categories=list(CARD_CATEGORIES))
+        cur.execute("INSERT OR REPLACE INTO schema_meta(key, value) VALUES('deck_hash', ?)",
+                    (BUILTIN_DECK_HASH,))
+
+    @staticmethod
+    def _write_deck(cur, deck_id, name, cards, version, categories):
+        """
+        Replace a deck; returns its card count.  A repeated term keeps its
+        last definition (REPLACE would bypass the cards_fts delete trigger).
+        card_performance rows take their cards' new categories.
+        """
+        cards = {t: (d, cat) for t, d, cat in cards}
+        cur.execute("""
+            INSERT INTO decks(id, name, version, categories, card_count) VALUES(?,?,?,?,?)
+            ON CONFLICT(id) DO UPDATE SET
+                name = excluded.name, version = excluded.version,
+                categories = excluded.categories, card_count = excluded.card_count""",
+            (deck_id, name, version, json.dumps(list(categories)), len(cards)))
+        cur.execute("DELETE FROM cards WHERE deck_id=?", (deck_id,))
+        cur.executemany(
+            "INSERT INTO cards(deck_id, term, definition, category) VALUES(?,?,?,?)",
+            [(deck_id, t, d, cat) for t, (d, cat) in cards.items()])
+        cur.execute("""
+            UPDATE card_performance SET category=(
+                SELECT category FROM cards
+                WHERE deck_id=card_performance.deck_id AND term=card_performance.card_term)
+            WHERE deck_id=? AND card_term IN (SELECT term FROM cards WHERE deck_id=?)""",
+            (deck_id, deck_id))
+        return len(cards)
+
+    # ── Card store ───────────────────────────────────────────────────────────
+
+    def get_deck(self, deck_id=DEFAULT_DECK):
+        """The deck's Deck; loaded on first use, then served from memory."""
+        with self._user_lock:
+            deck = self._decks.get(deck_id)
+        if deck is not None:
+            return deck
+        deck = self._load_deck(deck_id)
+        with self._user_lock:
+            return self._decks.setdefault(deck_id, deck)
+    get_deck.db_kind = "read"
+
+    @_db_read
+    def _load_deck(self, deck_id):
+        row = self.conn.execute(
+            "SELECT name, categories FROM decks WHERE id=?", (deck_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"no deck {deck_id!r}")
+        rows = self.conn.execute(
+            "SELECT term, definition, category FROM cards WHERE deck_id=? ORDER BY id",
+            (deck_id,)).fetchall()
+        return Deck(deck_id, row[0], json.loads(row[1]), rows)
+
+    def _has_fts(self):
+        if self._fts is None:
+            self._fts = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name='cards_fts'").fetchone() is not None
+        return self._fts
+
+    @_db_read
+    def search_cards(self, deck_id, query, limit=SEARCH_LIMIT):
+        """
+        Terms of the deck matching every word of query (the last one as a
+        prefix while it's being typed), best search_scorer score first.
+        FTS5 hands over the first SEARCH_CANDIDATES matches unranked and
+        only those are scored: ranking every match of a broad word (bm25
+        or Python) is what costs on a 100k-card deck.
+        """
+        words, prefix = parse_search(query)
+        deck = self.get_deck(deck_id)
+        if not words or not len(deck):
+            return []
+        if not self._has_fts():
+            return deck.search_index.search(words, prefix, limit)
+        phrases = [f'"{w}"' for w in words]
+        if prefix:
+            phrases[-1] += "*"
+        match = (f"deck : {fts_deck_token(deck_id)} AND "
+                 f"{{term definition}} : ({' '.join(phrases)})")
+        rows = self.conn.execute("""
+            SELECT id, term, definition FROM cards WHERE id IN (
+                SELECT rowid FROM cards_fts WHERE cards_fts MATCH ? LIMIT ?)""",
+            (match, SEARCH_CANDIDATES)).fetchall()
+        score = search_scorer(words, prefix)
+        rows.sort(key=lambda r: (-score(r[1], r[2]), r[0]))
+        return [r[1] for r in rows[:limit]]
+
+    @_db_read
+    def list_decks(self):
+        """(id, name, version, card_count) for every deck."""
+        return self.conn.execute(
+            "SELECT id, name, version, card_count FROM decks ORDER BY name").fetchall()
+
+    @_db_write()
+    def import_deck(self, deck_id, name, cards, version=1, categories=()):
+        """Create or replace a deck from (term, definition, category) tuples."""
+        with self.conn:
+            count = self._write_deck(self.conn, deck_id, name, cards, version, categories)
+        with self._user_lock:
+            self._decks.pop(deck_id, None)
+        with self._journal_lock:
+            for key in [k for k in self._schedulers if k[1] == deck_id]:
+                del self._schedulers[key]
+            for key in [k for k in self._cat_stats if k[1] == deck_id]:
+                del self._cat_stats[key]
+        return count
 
     # ── User ─────────────────────────────────────────────────────────────────
 
+    @_db_read
     def user_exists(self, username):
         return self.conn.execute(
             "SELECT id FROM users WHERE username=?", (username,)).fetchone() is not None
 
+    @_db_read
     def verify_code(self, username, code):
         return self.conn.execute(
             "SELECT id FROM users WHERE username=? AND code=?",
             (username, code)).fetchone() is not None
 
+    @_db_write(wait=False)
     def create_user(self, username, code):
         self.conn.execute(
             "INSERT INTO users (username, code, last_play_time) VALUES (?,?,?)",
             (username, code, datetime.now().isoformat()))
         self.conn.commit()
 
+    @_db_read
     def get_user(self, username):
-        row = self.conn.execute(
-            "SELECT * FROM users WHERE username=?", (username,)).fetchone()
-        if not row:
-            return None
-        cols = [r[1] for r in self.conn.execute("PRAGMA table_info(users)").fetchall()]
-        return dict(zip(cols, row))
-
+        with self._user_lock:
+            user = self._users.get(self._user_ids.get(username))
+        if user is not None:
+            return user
+        return self._cache_user(self.conn.execute(
+            self._user_sql + "username=?", (username,)).fetchone())
+
+    @_db_read
     def get_user_by_id(self, user_id):
-        row = self.conn.execute("SELECT * FROM users WHERE id=?", (user_id,)).fetchone()
-        if not row: 
+        with self._user_lock:
+            user = self._users.get(user_id)
+        if user is not None:
+            return user
+        return self._cache_user(self.conn.execute(
+            self._user_sql + "id=?", (user_id,)).fetchone())
+
+    def _cache_user(self, row):
+        """Return the identity-mapped record for a row read with _user_sql."""
+        if row is None:
             return None
-        cols = [r[1] for r in self.conn.execute("PRAGMA table_info(users)").fetchall()]
-        return dict(zip(cols, row))
+        fresh = dict(zip(self._user_cols, row))
+        with self._user_lock:
+            user = self._users.setdefault(fresh["id"], fresh)
+            self._user_ids[user["username"]] = user["id"]
+        return user
+
+    def _patch_user(self, user_id, **values):
+        with self._user_lock:
+            user = self._users.get(user_id)
+            if user is not None:
+                user.update(values)
+
+    def _update_user(self, user_id, set_sql, params=(), cols=(), where="", where_params=()):
+        """
+        UPDATE one users row, commit, and patch the cached record with the
+        new values of cols (read back via RETURNING, never the whole row).
+        Returns the new values, or None if the WHERE clause matched nothing.
+        """
+        row = self._update_user_row(user_id, set_sql, params, cols, where, where_params)
+        self.conn.commit()
+        if row is not None:
+            self._patch_user(user_id, **dict(zip(cols, row)))
+        return row
+
+    def _update_user_row(self, user_id, set_sql, params=(), cols=(), where="", where_params=()):
+        """The UPDATE half of _update_user; the caller commits and patches."""
+        sql = f"UPDATE users SET {set_sql} WHERE id=?{where}"
+        args = (*params, user_id, *where_params)
+        if SQLITE_HAS_RETURNING:
+            rows = self.conn.execute(f"{sql} RETURNING {', '.join(cols)}", args).fetchall()
+            return rows[0] if rows else None
+        changed = self.conn.execute(sql, args).rowcount
+        return self.conn.execute(
+            f"SELECT {', '.join(cols)} FROM users WHERE id=?",
+            (user_id,)).fetchone() if changed else None
 
     def update_streak(self, user_id, correct):
-        if correct:
-            self.conn.execute("""
-                UPDATE users SET
-                    current_streak = current_streak + 1,
-                    longest_streak = MAX(longest_streak, current_streak + 1),
-                    total_correct  = total_correct + 1,
-                    last_play_time = ?
-                WHERE id = ?""", (datetime.now().isoformat(), user_id))
-        else:
-            self.conn.execute(
-                "UPDATE users SET current_streak=0, last_play_time=? WHERE id=?",
-                (datetime.now().isoformat(), user_id))
-        self.conn.commit()
+        """Buffered in the answer journal; one call per answer."""
+        c  = 1 if correct else 0
+        ts = datetime.now().isoformat()
+        with self._journal_lock:
+            self._journal.touch()
+            self._journal.streaks.append((c, c, c, ts, user_id))
+            self._journal.answers += 1
+        # Same arithmetic as the journal's UPDATE, applied to the cache now
+        with self._user_lock:
+            user = self._users.get(user_id)
+            if user is not None:
+                if correct:
+                    user["longest_streak"] = max(user["longest_streak"],
+                                                 user["current_streak"] + 1)
+                    user["current_streak"] += 1
+                    user["total_correct"]  += 1
+                else:
+                    user["current_streak"] = 0
+                user["last_play_time"] = ts
+        self.flush_journal_if_due()
 
+    @_db_write(wait=False)
     def increment_total_answered(self, user_id, count):
-        self.conn.execute(
-            "UPDATE users SET total_answered=total_answered+? WHERE id=?",
-            (count, user_id))
-        self.conn.commit()
+        self._update_user(user_id, "total_answered=total_answered+?", (count,),
+                          ("total_answered",))
 
+    @_db_write(wait=False)
     def increment_normal_questions(self, user_id, count):
-        self.conn.execute(
-            "UPDATE users SET normal_questions_answered=normal_questions_answered+? WHERE id=?",
-            (count, user_id))
-        self.conn.commit()
+        self._update_user(user_id,
+                          "normal_questions_answered=normal_questions_answered+?",
+                          (count,), ("normal_questions_answered",))
 
+    @_db_write(wait=False)
     def increment_games_played(self, user_id):
-        self.conn.execute(
-            "UPDATE users SET games_played=games_played+1 WHERE id=?", (user_id,))
-        self.conn.commit()
+        self._update_user(user_id, "games_played=games_played+1", (),
+                          ("games_played",))
 
+    @_db_write(wait=False)
     def add_playtime(self, user_id, seconds):
-        self.conn.execute(
-            "UPDATE users SET total_playtime_seconds=total_playtime_seconds+? WHERE id=?",
-            (int(seconds), user_id))
-        self.conn.commit()
+        self._update_user(user_id, "total_playtime_seconds=total_playtime_seconds+?",
+                          (int(seconds),), ("total_playtime_seconds",))
 
+    @_db_write(wait=False)
     def update_consecutive_games(self, user_id, n):
-        self.conn.execute(
-            "UPDATE users SET consecutive_games=? WHERE id=?", (n, user_id))
-        self.conn.commit()
+        self._update_user(user_id, "consecutive_games=?", (n,), ("consecutive_games",))
 
+    @_db_write()
     def check_and_unlock_speedrun(self, user_id):
-        row = self.conn.execute(
-            "SELECT normal_questions_answered, speedrun_unlocked FROM users WHERE id=?",
-            (user_id,)).fetchone()
-        if row and row[0] >= SPEEDRUN_UNLOCK_AT and not row[1]:
-            self.conn.execute(
-                "UPDATE users SET speedrun_unlocked=1 WHERE id=?", (user_id,))
-            self.conn.commit()
-            return True
-        return False
+        return self._update_user(
+            user_id, "speedrun_unlocked=1", (), ("speedrun_unlocked",),
+            " AND normal_questions_answered>=? AND NOT speedrun_unlocked",
+            (SPEEDRUN_UNLOCK_AT,)) is not None
 
+    @_db_write()
     def check_and_unlock_timewarp(self, user_id):
-        row = self.conn.execute(
-            "SELECT normal_questions_answered, timewarp_unlocked FROM users WHERE id=?",
-            (user_id,)).fetchone()
-        if row and row[0] >= TIMEWARP_UNLOCK_AT and not row[1]:
-            self.conn.execute(
-                "UPDATE users SET timewarp_unlocked=1 WHERE id=?", (user_id,))
-            self.conn.commit()
-            return True
-        return False
+        return self._update_user(
+            user_id, "timewarp_unlocked=1", (), ("timewarp_unlocked",),
+            " AND normal_questions_answered>=? AND NOT timewarp_unlocked",
+            (TIMEWARP_UNLOCK_AT,)) is not None
 
+    @_db_write(wait=False)
     def update_endless_highscore(self, user_id, score):
-        self.conn.execute(
-            "UPDATE users SET endless_highscore=? WHERE id=? AND endless_highscore<?",
-            (score, user_id, score))
-        self.conn.commit()
+        self._update_user(user_id, "endless_highscore=?", (score,),
+                          ("endless_highscore",), " AND endless_highscore<?", (score,))
 
+    @_db_write(wait=False)
     def update_speedrun_highscore(self, user_id, score):
-        self.conn.execute(
-            "UPDATE users SET speedrun_highscore=? WHERE id=? AND speedrun_highscore<?",
-            (score, user_id, score))
-        self.conn.commit()
+        self._update_user(user_id, "speedrun_highscore=?", (score,),
+                          ("speedrun_highscore",), " AND speedrun_highscore<?", (score,))
 
+    @_db_write(wait=False)
     def update_timewarp_highscore(self, user_id, score):
-        self.conn.execute(
-            "UPDATE users SET timewarp_highscore=? WHERE id=? AND timewarp_highscore<?",
-            (score, user_id, score))
-        self.conn.commit()
+        self._update_user(user_id, "timewarp_highscore=?", (score,),
+                          ("timewarp_highscore",), " AND timewarp_highscore<?", (score,))
 
+    @_db_write(wait=False)
     def save_game_history(self, user_id, mode, score, questions, accuracy=0.0):
-        self.conn.execute(
-            "INSERT INTO game_history(user_id,mode,score,questions_answered,accuracy,timestamp)"
-            " VALUES(?,?,?,?,?,?)",
-            (user_id, mode, score, questions, accuracy, datetime.now().isoformat()))
-        self.conn.commit()
+        now = datetime.now()
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO game_history(user_id,mode,score,questions_answered,accuracy,timestamp)"
+                " VALUES(?,?,?,?,?,?)",
+                (user_id, mode, score, questions, accuracy, now.isoformat()))
+            if questions > 0:
+                self.conn.execute("""
+                    INSERT INTO daily_accuracy(user_id, day, games, accuracy_sum)
+                    VALUES(?,?,1,?)
+                    ON CONFLICT(user_id, day) DO UPDATE SET
+                        games        = games + 1,
+                        accuracy_sum = accuracy_sum + excluded.accuracy_sum""",
+                    (user_id, now.date().isoformat(), accuracy))
 
     # ── Coins & Power-Ups ────────────────────────────────────────────────────
 
     def add_coins(self, user_id, amount):
-        self.conn.execute(
-            "UPDATE users SET coins=coins+?, coins_earned_total=coins_earned_total+? WHERE id=?",
-            (amount, amount, user_id))
-        self.conn.commit()
-
+        """Buffered in the answer journal; read paths flush it first."""
+        with self._journal_lock:
+            self._journal.touch()
+            self._journal.coins[user_id] = self._journal.coins.get(user_id, 0) + amount
+        with self._user_lock:
+            user = self._users.get(user_id)
+            if user is not None:
+                user["coins"]              += amount
+                user["coins_earned_total"] += amount
+
+    @_db_write()
     def spend_coins(self, user_id, amount):
-        row = self.conn.execute("SELECT coins FROM users WHERE id=?", (user_id,)).fetchone()
-        if row and row[0] >= amount:
-            self.conn.execute(
-                "UPDATE users SET coins=coins-?, coins_spent=coins_spent+? WHERE id=?",
-                (amount, amount, user_id))
-            self.conn.commit()
-            return True
-        return False
+        self.flush_journal()
+        return self._update_user(
+            user_id, "coins=coins-?, coins_spent=coins_spent+?", (amount, amount),
+            ("coins", "coins_spent"), " AND coins>=?", (amount,)) is not None
+
+    @_db_read
+    def get_powerups(self, user_id):
+        """The user's PowerUpInventory; loaded once, then kept current by writes."""
+        with self._user_lock:
+            inv = self._inventories.get(user_id)
+        if inv is not None:
+            return inv
+        rows = self.conn.execute(
+            "SELECT pup_id, qty FROM user_powerups WHERE user_id=?", (user_id,)).fetchall()
+        with self._user_lock:
+            return self._inventories.setdefault(user_id, PowerUpInventory(rows))
+    get_powerups.db_kind = "read"
+
+    def _set_powerup(self, user_id, pup_id, qty):
+        with self._user_lock:
+            inv = self._inventories.get(user_id)
+            if inv is not None:
+                inv.counts[pup_id] = qty
+
+    def _add_powerup_row(self, user_id, pup_id, qty):
+        self.conn.execute("""
+            INSERT INTO user_powerups(user_id, pup_id, qty) VALUES(?,?,?)
+            ON CONFLICT(user_id, pup_id) DO UPDATE SET qty = qty + excluded.qty""",
+            (user_id, pup_id, qty))
+        return self.conn.execute(
+            "SELECT qty FROM user_powerups WHERE user_id=? AND pup_id=?",
+            (user_id, pup_id)).fetchone()[0]
 
+    @_db_write(wait=False)
     def add_powerup(self, user_id, pup_id, qty=1):
-        col = f"powerup_{pup_id}"
-        self.conn.execute(f"UPDATE users SET {col}={col}+? WHERE id=?", (qty, user_id))
-        self.conn.commit()
+        with self.conn:
+            new_qty = self._add_powerup_row(user_id, pup_id, qty)
+        self._set_powerup(user_id, pup_id, new_qty)
+
+    @_db_write()
+    def buy_powerup(self, user_id, pup_id, cost, qty=1):
+        """Spend cost coins and add qty of pup_id in one transaction."""
+        self.flush_journal()
+        with self.conn:
+            paid = self._update_user_row(
+                user_id, "coins=coins-?, coins_spent=coins_spent+?", (cost, cost),
+                ("coins", "coins_spent"), " AND coins>=?", (cost,))
+            if paid is None:
+                return False
+            new_qty = self._add_powerup_row(user_id, pup_id, qty)
+        self._patch_user(user_id, coins=paid[0], coins_spent=paid[1])
+        self._set_powerup(user_id, pup_id, new_qty)
+        return True
 
+    @_db_write()
     def use_powerup(self, user_id, pup_id):
-        col = f"powerup_{pup_id}"
-        row = self.conn.execute(f"SELECT {col} FROM users WHERE id=?", (user_id,)).fetchone()
-        if row and row[0] > 0:
-            self.conn.execute(f"UPDATE users SET {col}={col}-1 WHERE id=?", (user_id,))
-            self.conn.commit()
-            return True
-        return False
+        cur = self.conn.execute(
+            "UPDATE user_powerups SET qty=qty-1 WHERE user_id=? AND pup_id=? AND qty>0",
+            (user_id, pup_id))
+        self.conn.commit()
+        if cur.rowcount != 1:
+            return False
+        with self._user_lock:
+            inv = self._inventories.get(user_id)
+            if inv is not None:
+                inv.counts[pup_id] -= 1
+        return True
 
     # ── Card Performance ─────────────────────────────────────────────────────
 
-    def record_card_result(self, user_id, card_term, correct):
-        now = datetime.now().isoformat()
-        self.conn.execute("""
-            INSERT INTO card_performance(user_id, card_term, correct, wrong, last_seen)
-            VALUES(?,?,?,?,?)
-            ON CONFLICT(user_id, card_term) DO UPDATE SET
-                correct  = correct  + ?,
-                wrong    = wrong    + ?,
-                last_seen = ?
-        """, (user_id, card_term, 1 if correct else 0, 0 if correct else 1, now,
-              1 if correct else 0, 0 if correct else 1, now))
-        self.conn.commit()
+    def record_card_result(self, user_id, card_term, correct, deck_id=DEFAULT_DECK):
+        """
+        Buffered in the answer journal; flushed with the streak updates,
+        when the card's SM-2 state is advanced from its stored row.  A
+        DeckScheduler is only advanced if one is loaded (a "spaced" game
+        asked for it); shuffle games never build one.
+        """
+        now = time.time()
+        cat = self.get_deck(deck_id).category(card_term)
+        with self._journal_lock:
+            sched = self._schedulers.get((user_id, deck_id))
+            if sched is not None:
+                sched.record(card_term, correct, now)
+            self._journal.touch()
+            self._journal.cards.append((user_id, deck_id, card_term, cat, bool(correct), now))
+            self._cat_stats.pop((user_id, deck_id), None)
+            self._card_writes[user_id] = self._card_writes.get(user_id, 0) + 1
+
+    # ── Answer journal ───────────────────────────────────────────────────────
+
+    def flush_journal(self):
+        """
+        Hand every buffered answer to the writer thread as one transaction
+        (one commit).  Returns the write's Future, or None if nothing was
+        buffered.
+        """
+        with self._journal_lock:
+            j = self._journal
+            if not j:
+                return None
+            self._journal = AnswerJournal()
+        return self._apply_journal(j)
+
+    @_db_write(wait=False)
+    def _apply_journal(self, j):
+        try:
+            self._write_journal(j)
+        except sqlite3.Error:
+            self._requeue_journal(j)
+            raise
+        # Coin badges are checked once the coins are in the users row, so
+        # no coin is counted both there and in a journal
+        for uid in j.coins:
+            self.check_coin_achievements(uid)
+
+    def _write_journal(self, j):
+        with self.conn:
+            if j.streaks:
+                self.conn.executemany("""
+                    UPDATE users SET
+                        current_streak = CASE WHEN ? THEN current_streak + 1 ELSE 0 END,
+                        longest_streak = CASE WHEN ? THEN MAX(longest_streak, current_streak + 1)
+                                              ELSE longest_streak END,
+                        total_correct  = total_correct + ?,
+                        last_play_time = ?
+                    WHERE id = ?""", j.streaks)
+            if j.cards:
+                self.conn.executemany("""
+                    INSERT INTO card_performance(user_id, deck_id, card_term, category,
+                                                 correct, wrong, last_seen,
+                                                 ease, interval_days, reps, due)
+                    VALUES(?,?,?,?,?,?,?,?,?,?,?)
+                    ON CONFLICT(user_id, deck_id, card_term) DO UPDATE SET
+                        correct       = correct + excluded.correct,
+                        wrong         = wrong   + excluded.wrong,
+                        last_seen     = excluded.last_seen,
+                        ease          = excluded.ease,
+                        interval_days = excluded.interval_days,
+                        reps          = excluded.reps,
+                        due           = excluded.due
+                """, self._card_rows(j.cards))
+            if j.coins:
+                self.conn.executemany(
+                    "UPDATE users SET coins=coins+?, coins_earned_total=coins_earned_total+? WHERE id=?",
+                    [(amt, amt, uid) for uid, amt in j.coins.items()])
+
+    def _card_rows(self, cards):
+        """
+        card_performance upsert params for journal answers: each card's SM-2
+        state is read once and advanced through its answers in order.
+        """
+        state = {}
+        rows  = []
+        for user_id, deck_id, term, cat, correct, now in cards:
+            key = (user_id, deck_id, term)
+            if key not in state:
+                state[key] = self.conn.execute("""
+                    SELECT ease, interval_days, reps, due FROM card_performance
+                    WHERE user_id=? AND deck_id=? AND card_term=?""", key).fetchone()
+            state[key] = DeckScheduler.advance(state[key], correct, now)
+            rows.append((*key, cat, int(correct), int(not correct),
+                         datetime.fromtimestamp(now).isoformat(), *state[key]))
+        return rows
 
-    def get_weak_spots(self, user_id, n=5):
-        """Return top-n cards with highest wrong count."""
+    def _requeue_journal(self, j):
+        """Put a failed flush back in front of the live journal for a retry."""
+        with self._journal_lock:
+            live = self._journal
+            live.streaks[:0] = j.streaks
+            live.cards[:0]   = j.cards
+            for uid, amt in j.coins.items():
+                live.coins[uid] = live.coins.get(uid, 0) + amt
+            live.answers += j.answers
+            live.first_at = min(filter(None, (live.first_at, j.first_at)), default=None)
+
+    def flush_journal_if_due(self):
+        """Flush after JOURNAL_FLUSH_EVERY answers or JOURNAL_FLUSH_SECONDS."""
+        if self._journal.is_due():
+            self.flush_journal()
+
+    @_db_read
+    def get_scheduler(self, user_id, deck_id=DEFAULT_DECK):
+        """The user's DeckScheduler for a deck; loaded once, then advanced by record_card_result."""
+        key = (user_id, deck_id)
+        with self._journal_lock:
+            sched = self._schedulers.get(key)
+        if sched is not None:
+            return sched
+        deck = self.get_deck(deck_id)
+        rows = self.conn.execute("""
+            SELECT card_term, ease, interval_days, reps, due
+            FROM card_performance WHERE user_id=? AND deck_id=?""",
+            (user_id, deck_id)).fetchall()
+        with self._journal_lock:
+            return self._schedulers.setdefault(key, DeckScheduler(deck.terms, rows))
+
+    @_db_read
+    def get_weak_spots(self, user_id, n=5, deck_id=DEFAULT_DECK):
+        """Return the deck's top-n cards with highest wrong count."""
         rows = self.conn.execute("""
             SELECT card_term, correct, wrong
             FROM card_performance
-            WHERE user_id=? AND wrong > 0
+            WHERE user_id=? AND deck_id=? AND wrong > 0
             ORDER BY wrong DESC, correct ASC
             LIMIT ?
-        """, (user_id, n)).fetchall()
+        """, (user_id, deck_id, n)).fetchall()
         return rows
 
-    def get_category_stats(self, user_id):
-        """Return dict: category -> (correct, wrong)."""
+    def get_category_stats(self, user_id, deck_id=DEFAULT_DECK):
+        """Return dict for one deck: category -> (correct, wrong)."""
+        key = (user_id, deck_id)
+        with self._journal_lock:
+            stats = self._cat_stats.get(key)
+            seen  = self._card_writes.get(user_id, 0)
+        if stats is not None:
+            return stats
+        stats = self._read_category_stats(user_id, deck_id)
+        with self._journal_lock:
+            # Only cache if no answer was recorded while we were reading
+            if self._card_writes.get(user_id, 0) == seen:
+                self._cat_stats[key] = stats
+        return stats
+    get_category_stats.db_kind = "read"
+
+    @_db_read
+    def _read_category_stats(self, user_id, deck_id):
         rows = self.conn.execute("""
-            SELECT card_term, correct, wrong FROM card_performance WHERE user_id=?
-        """, (user_id,)).fetchall()
-        stats = {cat: [0, 0] for cat in CARD_CATEGORIES}
-        stats["Misc"] = [0, 0]
-        term_to_cat = {}
-        for cat, terms in CARD_CATEGORIES.items():
-            for t in terms:
-                term_to_cat[t] = cat
-        for term, correct, wrong in rows:
-            cat = term_to_cat.get(term, "Misc")
+            SELECT category, SUM(correct), SUM(wrong) FROM card_performance
+            WHERE user_id=? AND deck_id=? GROUP BY category
+        """, (user_id, deck_id)).fetchall()
+        stats = {}
+        for cat, correct, wrong in rows:
+            stats.setdefault(cat, [0, 0])
             stats[cat][0] += correct
             stats[cat][1] += wrong
         return stats
 
+    @_db_read
     def get_accuracy_history(self, user_id, days=7):
-        """Return list of (date_str, accuracy) tuples for the last N days."""
-        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+        """Return list of (date_str, accuracy) tuples for the last N days (None = all)."""
+        cutoff = (date.today() - timedelta(days=days)).isoformat() if days else ""
         rows = self.conn.execute("""
-            SELECT DATE(timestamp), AVG(accuracy)
-            FROM game_history
-            WHERE user_id=? AND timestamp>=? AND questions_answered>0
-            GROUP BY DATE(timestamp)
-            ORDER BY DATE(timestamp) ASC
+            SELECT day, accuracy_sum / games
+            FROM daily_accuracy
+            WHERE user_id=? AND day>?
+            ORDER BY day ASC
         """, (user_id, cutoff)).fetchall()
         return rows
 
+    @_db_read
+    def get_monthly_accuracy(self, user_id):
+        """Return list of (YYYY-MM, accuracy) tuples, weighted by games played."""
+        return self.conn.execute("""
+            SELECT substr(day, 1, 7) AS month, SUM(accuracy_sum) / SUM(games)
+            FROM daily_accuracy
+            WHERE user_id=?
+            GROUP BY month
+            ORDER BY month ASC
+        """, (user_id,)).fetchall()
+
     # ── Daily Challenge ──────────────────────────────────────────────────────
 
+    def get_daily_cards(self, deck_id=DEFAULT_DECK, day=None):
+        """
+        The day's (default today's) challenge terms: from memory, else from
+        daily_challenges, else sampled and stored.  A stored challenge is
+        re-sampled only if one of its cards has left the deck.  Whatever
+        _store_daily leaves in the table is returned, so when two callers
+        race the first writer's cards win.
+        """
+        day = day or date.today()
+        key = (deck_id, day.isoformat())
+        with self._user_lock:
+            cards = self._daily.get(key)
+        if cards is None:
+            deck  = self.get_deck(deck_id)
+            stored = self._read_daily(*key)
+            cards  = stored
+            if cards is None or not all(t in deck for t in cards):
+                cards = self._store_daily(*key, sample_daily_cards(deck.terms, deck_id, day),
+                                          stale=stored)
+            with self._user_lock:
+                cards = self._daily.setdefault(key, cards)
+        return list(cards)
+    get_daily_cards.db_kind = "read"
+
+    @_db_read
+    def _read_daily(self, deck_id, date_str):
+        row = self.conn.execute(
+            "SELECT terms FROM daily_challenges WHERE deck_id=? AND date_str=?",
+            (deck_id, date_str)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    @_db_write()
+    def _store_daily(self, deck_id, date_str, terms, stale=None):
+        """
+        Store a challenge unless another caller got there first, and return
+        the stored terms.  stale is the challenge read before re-sampling;
+        it is only replaced if it's still the one in the table.
+        """
+        with self.conn:
+            if stale is None:
+                self.conn.execute("""
+                    INSERT OR IGNORE INTO daily_challenges(deck_id, date_str, terms)
+                    VALUES(?,?,?)""", (deck_id, date_str, json.dumps(terms)))
+            else:
+                self.conn.execute("""
+                    UPDATE daily_challenges SET terms=?
+                    WHERE deck_id=? AND date_str=? AND terms=?""",
+                    (json.dumps(terms), deck_id, date_str, json.dumps(stale)))
+        row = self.conn.execute(
+            "SELECT terms FROM daily_challenges WHERE deck_id=? AND date_str=?",
+            (deck_id, date_str)).fetchone()
+        return json.loads(row[0])
+
+    @_db_write()
+    def precompute_daily(self, deck_id=DEFAULT_DECK, days=365, start=None):
+        """
+        Choose and store the challenges for `days` dates from start (default
+        today) in one transaction, keeping any already stored.  Returns
+        {date_str: terms} for the whole range, e.g. for a kiosk to publish.
+        """
+        start = start or date.today()
+        deck  = self.get_deck(deck_id)
+        dates = [start + timedelta(days=n) for n in range(max(days, 1))]
+        stored = {d: json.loads(t) for d, t in self.conn.execute("""
+            SELECT date_str, terms FROM daily_challenges
+            WHERE deck_id=? AND date_str BETWEEN ? AND ?""",
+            (deck_id, dates[0].isoformat(), dates[-1].isoformat()))}
+        new = {d.isoformat(): sample_daily_cards(deck.terms, deck_id, d)
+               for d in dates if d.isoformat() not in stored}
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO daily_challenges(deck_id, date_str, terms) VALUES(?,?,?)",
+                [(deck_id, d, json.dumps(terms)) for d, terms in new.items()])
+        with self._user_lock:
+            for d, terms in new.items():
+                self._daily.setdefault((deck_id, d), terms)
+        return dict(sorted({**stored, **new}.items()))
+
+    @_db_write()
     def complete_daily_challenge(self, user_id, score):
         today = date.today().isoformat()
         try:
@@ -675,6 +2039,7 @@ class DatabaseManager:
         except sqlite3.IntegrityError:
             return False
 
+    @_db_read
     def has_completed_daily(self, user_id):
         today = date.today().isoformat()
         row = self.conn.execute(
@@ -682,6 +2047,7 @@ class DatabaseManager:
             (user_id, today)).fetchone()
         return row is not None
 
+    @_db_read
     def get_completed_dates(self, user_id):
         rows = self.conn.execute(
             "SELECT date_str FROM daily_challenge_completions WHERE user_id=? ORDER BY date_str",
@@ -690,6 +2056,7 @@ class DatabaseManager:
 
     # ── Daily Quests ──────────────────────────────────────────────────────────
 
+    @_db_read
     def get_quest_progress(self, user_id, quest_id):
         today = date.today().isoformat()
         row = self.conn.execute(
@@ -697,6 +2064,7 @@ class DatabaseManager:
             (user_id, quest_id, today)).fetchone()
         return row if row else (0, 0)
 
+    @_db_write(wait=False)
     def update_quest_progress(self, user_id, quest_id, new_progress, target):
         today = date.today().isoformat()
         completed = 1 if new_progress >= target else 0
@@ -709,6 +2077,7 @@ class DatabaseManager:
         """, (user_id, quest_id, today, new_progress, completed, new_progress, completed))
         self.conn.commit()
 
+    @_db_read
     def count_quests_completed_today(self, user_id):
         today = date.today().isoformat()
         row = self.conn.execute(
@@ -716,89 +2085,57 @@ class DatabaseManager:
             (user_id, today)).fetchone()
         return row[0] if row else 0
 
+    @_db_write(wait=False)
     def increment_quests_completed_total(self, user_id):
-        self.conn.execute(
-            "UPDATE users SET quests_completed=quests_completed+1 WHERE id=?", (user_id,))
-        self.conn.commit()
+        self._update_user(user_id, "quests_completed=quests_completed+1", (),
+                          ("quests_completed",))
 
     # ── Session Mode Tracking ─────────────────────────────────────────────────
 
+    @_db_write()
     def record_mode_won(self, user_id, mode):
-        user = self.get_user_by_id(user_id)
-        if not user: 
-            return []
-        modes = json.loads(user.get("session_modes_won") or "[]")
-        if mode not in modes:
-            modes.append(mode)
         self.conn.execute(
-            "UPDATE users SET session_modes_won=? WHERE id=?",
-            (json.dumps(modes), user_id))
+            "INSERT OR IGNORE INTO session_modes_won(user_id, mode) VALUES(?,?)",
+            (user_id, mode))
         self.conn.commit()
-        return modes
+        return [r[0] for r in self.conn.execute(
+            "SELECT mode FROM session_modes_won WHERE user_id=?", (user_id,)).fetchall()]
 
+    @_db_write(wait=False)
     def reset_session_modes(self, user_id):
-        self.conn.execute("UPDATE users SET session_modes_won='[]' WHERE id=?", (user_id,))
+        self.conn.execute("DELETE FROM session_modes_won WHERE user_id=?", (user_id,))
         self.conn.commit()
 
+    @_db_write()
     def record_mode_played_today(self, user_id, mode):
-        user = self.get_user_by_id(user_id)
-        if not user: 
-            return []
+        """Record mode as played today; returns every mode played today."""
         today = date.today().isoformat()
-        stored = json.loads(user.get("modes_played_today") or "[]")
-        # stored is [[mode, date], ...]
-        today_modes = [m for m, d in stored if d == today]
-        if mode not in today_modes:
-            stored.append([mode, today])
-            today_modes.append(mode)
-        self.conn.execute(
-            "UPDATE users SET modes_played_today=? WHERE id=?",
-            (json.dumps(stored), user_id))
-        self.conn.commit()
-        return today_modes
+        with self.conn:
+            # Only today's rows are ever read, so earlier days are pruned here
+            self.conn.execute(
+                "DELETE FROM modes_played WHERE user_id=? AND date_str<?",
+                (user_id, today))
+            self.conn.execute(
+                "INSERT OR IGNORE INTO modes_played(user_id, date_str, mode) VALUES(?,?,?)",
+                (user_id, today, mode))
+        return [r[0] for r in self.conn.execute(
+            "SELECT mode FROM modes_played WHERE user_id=? AND date_str=?",
+            (user_id, today)).fetchall()]
 
     # ── Badges ───────────────────────────────────────────────────────────────
 
-    def award_badge(self, user_id, badge_name):
-        cur = self.conn.cursor()
-        row = cur.execute(
-            "SELECT id FROM badges WHERE badge_name=?", (badge_name,)).fetchone()
-        if not row:
-            return False
-        badge_id = row[0]
-        if badge_name in BADGE_DEPENDENCIES:
-            for dep in BADGE_DEPENDENCIES[badge_name]:
-                dep_row = cur.execute(
-                    "SELECT id FROM badges WHERE badge_name=?", (dep,)).fetchone()
-                if not dep_row:
-                    return False
-                if not cur.execute(
-                        "SELECT 1 FROM user_badges WHERE user_id=? AND badge_id=?",
-                        (user_id, dep_row[0])).fetchone():
-                    return False
-        if cur.execute(
-                "SELECT 1 FROM user_badges WHERE user_id=? AND badge_id=?",
-                (user_id, badge_id)).fetchone():
-            return False
-        cur.execute("INSERT INTO user_badges(user_id,badge_id) VALUES(?,?)",
-                    (user_id, badge_id))
-        self.conn.commit()
-        self._check_badge_count(user_id)
-        return True
+    @_db_write()
+    def award_badges(self, user_id, candidates):
+        """Award the eligible candidates in one write; returns the new ones."""
+        new = self._badges.award(self.conn, user_id, candidates)
+        self._patch_user(user_id,
+                         badge_count=len(self._badges.earned_by(self.conn, user_id)))
+        return new
 
-    def _check_badge_count(self, user_id):
-        count = self.conn.execute(
-            "SELECT COUNT(*) FROM user_badges WHERE user_id=?",
-            (user_id,)).fetchone()[0]
-        if count >= 10: 
-            self.award_badge(user_id, "Root Access")
-        if count >= 20: 
-            self.award_badge(user_id, "System Administrator")
-        # Check Legendary (all other achievements unlocked)
-        total_badges = self.conn.execute("SELECT COUNT(*) FROM badges").fetchone()[0]
-        if count >= total_badges - 1:
-            self.award_badge(user_id, "Legendary")
+    def award_badge(self, user_id, badge_name):
+        return bool(self.award_badges(user_id, [badge_name]))
 
+    @_db_read
     def get_user_badge_names(self, user_id):
         rows = self.conn.execute("""
             SELECT b.badge_name FROM badges b
@@ -806,133 +2143,282 @@ class DatabaseManager:
             WHERE ub.user_id=?""", (user_id,)).fetchall()
         return {r[0] for r in rows}
 
+    @_db_read
     def get_all_badges(self):
         return self.conn.execute(
             "SELECT badge_name, description, icon FROM badges").fetchall()
 
+    @_db_read
+    def get_badge_overview(self, user_id):
+        """(earned badge names, all badges) in one round trip for RewardsScreen."""
+        return self.get_user_badge_names(user_id), self.get_all_badges()
+
+    @_db_write(wait=False)
     def check_progress_achievements(self, user_id):
         total = self.conn.execute(
             "SELECT total_answered FROM users WHERE id=?",
             (user_id,)).fetchone()[0]
-        if total >= 10:   self.award_badge(user_id, "First Steps")
-        if total >= 50:   self.award_badge(user_id, "Learning Curve")
-        if total >= 100:  self.award_badge(user_id, "Flash Master")
-        if total >= 250:  self.award_badge(user_id, "Knowledge Engine")
-        if total >= 404:  self.award_badge(user_id, "Stack Overflow")
-        if total >= 500:  self.award_badge(user_id, "Data Bank")
+        thresholds = [(10, "First Steps"), (50, "Learning Curve"), (100, "Flash Master"),
+                      (250, "Knowledge Engine"), (404, "Stack Overflow"), (500, "Data Bank")]
+        self.award_badges(user_id, [b for n, b in thresholds if total >= n])
 
+    @_db_write(wait=False)
     def check_coin_achievements(self, user_id):
+        """
+        Award the coin badges from the users row.  Coins still in the
+        journal count when it is flushed, which repeats this check.
+        """
         row = self.conn.execute(
             "SELECT coins_earned_total, coins_spent FROM users WHERE id=?",
             (user_id,)).fetchone()
         if not row: 
             return
         earned, spent = row
-        if earned >= 100: 
-            self.award_badge(user_id, "Coin Collector")
-        if spent >= 50:   
-            self.award_badge(user_id, "Big Spender")
+        candidates = []
+        if earned >= 100:
+            candidates.append("Coin Collector")
+        if spent >= 50:
+            candidates.append("Big Spender")
+        self.award_badges(user_id, candidates)
 
     # ── Leaderboard ──────────────────────────────────────────────────────────
 
-    def get_leaderboard(self):
-        return self.conn.execute("""
-            SELECT u.username,
-                   u.endless_highscore,
-                   u.speedrun_highscore,
-                   COUNT(ub.badge_id) AS badge_count,
-                   u.total_answered,
-                   u.coins
-            FROM users u
-            LEFT JOIN user_badges ub ON u.id=ub.user_id
-            GROUP BY u.id
-            ORDER BY u.endless_highscore DESC, u.total_answered DESC
-        """).fetchall()
+    # Rows are (id, username, endless, speedrun, badges, total_answered, coins);
+    # a page's last row is the keyset cursor for the next one.
+
+    @_db_read
+    def get_leaderboard(self, after=None, limit=LEADERBOARD_PAGE):
+        """One page of the leaderboard, starting below the row `after`."""
+        sql = """
+            SELECT id, username, endless_highscore, speedrun_highscore,
+                   badge_count, total_answered, coins
+            FROM users"""
+        params = ()
+        if after is not None:
+            sql += " WHERE (endless_highscore, total_answered, id) < (?,?,?)"
+            params = (after[2], after[5], after[0])
+        sql += """
+            ORDER BY endless_highscore DESC, total_answered DESC, id DESC
+            LIMIT ?"""
+        return self.conn.execute(sql, params + (limit,)).fetchall()
+
+    @_db_read
+    def get_leaderboard_rank(self, user_id):
+        """(rank, row) of one user in leaderboard order, or None."""
+        row = self.conn.execute("""
+            SELECT rnk, id, username, endless_highscore, speedrun_highscore,
+                   badge_count, total_answered, coins
+            FROM (SELECT *, ROW_NUMBER() OVER (
+                      ORDER BY endless_highscore DESC, total_answered DESC, id DESC
+                  ) AS rnk
+                  FROM users)
+            WHERE id=?""", (user_id,)).fetchone()
+        return (row[0], row[1:]) if row else None
 
     def close(self):
-        self.conn.close()
+        try:
+            self.flush_journal()
+        finally:
+            self._exec.close()
 
 # ══════════════════════════ ANIMATION HELPERS ════════════════════════════════
 
+class AnimationClock:
+    """
+    The one after() loop behind every animation.  add(widget, fn) calls
+    fn(dt) each frame, dt being the seconds since the previous frame, until
+    fn returns False or the widget is destroyed.  The timer only runs while
+    at least one animation is registered.
+    """
+
+    MAX_DT = 0.1   # a stalled frame shouldn't make things jump
+
+    def __init__(self, root, frame_ms=ANIM_FRAME_MS):
+        self._root     = root
+        self._frame_ms = frame_ms
+        self._anims    = {}      # token -> (widget, fn)
+        self._tokens   = 0
+        self._job      = None
+        self._last     = None
+        self.ticks     = 0
+        self.tick_times = collections.deque(maxlen=500)
+
+    def add(self, widget, fn):
+        """Register fn(dt) for widget; returns a token for remove()."""
+        self._tokens += 1
+        self._anims[self._tokens] = (widget, fn)
+        if self._job is None:
+            self._last = time.perf_counter()
+            self._job  = self._root.after(self._frame_ms, self._tick)
+        return self._tokens
+
+    def remove(self, token):
+        self._anims.pop(token, None)
+
+    @property
+    def active(self):
+        return len(self._anims)
+
+    def _tick(self):
+        start = time.perf_counter()
+        dt    = min(self.MAX_DT, start - self._last)
+        self._last = start
+        for token, (widget, fn) in list(self._anims.items()):
+            try:
+                keep = widget.winfo_exists() and fn(dt) is not False
+            except tk.TclError:
+                keep = False   # destroyed part-way through the frame
+            if not keep:
+                self._anims.pop(token, None)
+        self.ticks += 1
+        self.tick_times.append(time.perf_counter() - start)
+        if self._anims:
+            self._job = self._root.after(self._frame_ms, self._tick)
+        else:
+            self._job = None
+
+    def stats(self):
+        """Active animations plus per-tick work in milliseconds."""
+        times = sorted(self.tick_times)
+        def pct(q):
+            return round(times[min(len(times) - 1, int(q * len(times)))] * 1000, 3) if times else None
+        return {
+            "active":  self.active,
+            "ticks":   self.ticks,
+            "tick_ms": {"p50": pct(0.50), "p95": pct(0.95),
+                        "max": round(times[-1] * 1000, 3) if times else None},
+        }
+
+
+def animate(widget, fn):
+    """Register fn(dt) with the app's AnimationClock (see above)."""
+    return widget._root().anim.add(widget, fn)
+
+
 class FloatingText:
+    LIFE  = 0.75    # seconds on screen
+    SPEED = 73.0    # pixels risen per second
+
     def __init__(self, canvas, x, y, text, color, font=("Segoe UI", 20, "bold")):
         self.canvas = canvas
         self.item   = canvas.create_text(x, y, text=text, fill=color, font=font)
         self.y      = float(y)
-        self.life   = 26
-        self._step()
-
-    def _step(self):
-        self.life -= 1
-        if self.life <= 0:
-            try: self.canvas.delete(self.item)
-            except: pass
-            return
-        self.y -= 2.2
+        self.age    = 0.0
+        animate(canvas, self._step)
+
+    def _step(self, dt):
+        self.age += dt
+        if self.age >= self.LIFE:
+            self.canvas.delete(self.item)
+            return False
+        self.y -= self.SPEED * dt
         cx = (self.canvas.winfo_width() or 430) // 2
         self.canvas.coords(self.item, cx, self.y)
-        self.canvas.after(30, self._step)
 
 
 class ConfettiCanvas:
-    COLORS = ["#e94560","#ffd700","#00d4ff","#00d26a","#7b2fff","#ff6b6b"]
+    """
+    Falling confetti.  Particle state is kept in parallel arrays, each frame
+    moves every piece with a single Tcl script, and pieces that fall off
+    the bottom are reused at the top rather than recreated.  When frames
+    arrive slower than BUDGET_MS (on average), a quarter of the pieces are
+    dropped, down to MIN_PARTICLES.  Speeds are per FRAME_MS and scaled by
+    the clock's dt.
+    """
+    COLORS        = ["#e94560","#ffd700","#00d4ff","#00d26a","#7b2fff","#ff6b6b"]
+    PARTICLES     = 80
+    MIN_PARTICLES = 20
+    FRAME_MS      = 30
+    BUDGET_MS     = 45
 
-    def __init__(self, canvas, w, h):
+    def __init__(self, canvas, w, h, count=PARTICLES):
         self.canvas = canvas; self.w = w; self.h = h
-        self.parts  = []
-        self._spawn()
-
-    def _spawn(self):
-        for _ in range(80):
-            x     = random.randint(0, self.w)
-            y     = random.randint(-self.h, 0)
-            size  = random.randint(6, 14)
-            color = random.choice(self.COLORS)
-            item  = self.canvas.create_rectangle(
-                x, y, x+size, y+size, fill=color, outline="")
-            self.parts.append([x, y, size,
-                                random.uniform(3, 8),
-                                random.uniform(-2, 2),
-                                0.0,
-                                random.uniform(-5, 5),
-                                item])
-        self._animate()
-
-    def _animate(self):
-        for p in self.parts:
-            p[1] += p[3]; p[0] += p[4]; p[5] += p[6]
-            if p[1] > self.h:
-                p[1] = random.randint(-60, -10)
-                p[0] = random.randint(0, self.w)
-            rad = math.radians(p[5])
-            self.canvas.coords(p[7], p[0], p[1],
-                               p[0]+p[2]*math.cos(rad),
-                               p[1]+p[2]*math.sin(rad))
-        self.canvas.after(30, self._animate)
+        self.frame_ms = float(self.FRAME_MS)   # smoothed time between frames
+        self._spawn(count)
+
+    def _spawn(self, n):
+        uni = random.uniform
+        self.x     = array("d", [random.randint(0, self.w) for _ in range(n)])
+        self.y     = array("d", [random.randint(-self.h, 0) for _ in range(n)])
+        self.size  = array("d", [random.randint(6, 14) for _ in range(n)])
+        self.vy    = array("d", [uni(3, 8) for _ in range(n)])
+        self.vx    = array("d", [uni(-2, 2) for _ in range(n)])
+        self.angle = array("d", bytes(8 * n))
+        self.spin  = array("d", [uni(-5, 5) for _ in range(n)])
+        self.items = [self.canvas.create_rectangle(
+                          x, y, x+size, y+size,
+                          fill=random.choice(self.COLORS), outline="")
+                      for x, y, size in zip(self.x, self.y, self.size)]
+        self._draw()
+        animate(self.canvas, self._animate)
+
+    def _step(self, k=1.0):
+        """Advance every particle k frames; wrap the ones below the floor."""
+        self.x     = array("d", [x + v*k for x, v in zip(self.x, self.vx)])
+        self.y     = array("d", [y + v*k for y, v in zip(self.y, self.vy)])
+        self.angle = array("d", [a + v*k for a, v in zip(self.angle, self.spin)])
+        h = self.h
+        for i, y in enumerate(self.y):
+            if y > h:
+                self.y[i] = random.randint(-60, -10)
+                self.x[i] = random.randint(0, self.w)
+
+    def _draw(self):
+        path, cos, sin, rad = str(self.canvas), math.cos, math.sin, math.radians
+        self.canvas.tk.eval("\n".join(
+            f"{path} coords {item} {x:.1f} {y:.1f} "
+            f"{x + s*cos(rad(a)):.1f} {y + s*sin(rad(a)):.1f}"
+            for item, x, y, s, a in zip(self.items, self.x, self.y,
+                                        self.size, self.angle)))
+
+    def _shrink(self):
+        keep = max(self.MIN_PARTICLES, len(self.items) * 3 // 4)
+        if keep >= len(self.items):
+            return
+        self.canvas.delete(*self.items[keep:])
+        del self.items[keep:]
+        for arr in (self.x, self.y, self.size, self.vy, self.vx, self.angle, self.spin):
+            del arr[keep:]
+
+    def _animate(self, dt):
+        self.frame_ms += (dt * 1000 - self.frame_ms) * 0.2
+        if self.frame_ms > self.BUDGET_MS:
+            self._shrink()
+            self.frame_ms = float(self.FRAME_MS)
+        self._step(dt * 1000 / self.FRAME_MS)
+        self._draw()
 
 
 class GlowEffect:
+    STEP = 0.07     # seconds per pixel of border growth
+
     def __init__(self, widget, color=C["green"]):
         self.widget    = widget
         self.color     = color
         self.direction = 1
         self.thickness = 2
-        self._pulse()
+        self._wait     = 0.0
+        self._pulse(self.STEP)
+        animate(widget, self._pulse)
 
-    def _pulse(self):
+    def _pulse(self, dt):
+        self._wait += dt
+        if self._wait < self.STEP:
+            return
+        self._wait -= self.STEP
         self.thickness += self.direction
         if self.thickness >= 6 or self.thickness <= 2:
             self.direction *= -1
-        try:
-            self.widget.config(
-                highlightthickness=self.thickness,
-                highlightbackground=self.color,
-                highlightcolor=self.color)
-            self.widget.after(70, self._pulse)
-        except: pass
+        self.widget.config(
+            highlightthickness=self.thickness,
+            highlightbackground=self.color,
+            highlightcolor=self.color)
 
 
 class AchievementPopup(tk.Toplevel):
+    HOLD = 2.4      # seconds fully visible
+    FADE = 0.57     # seconds to fade out
+
     def __init__(self, master, badge_name):
         super().__init__(master)
         self.overrideredirect(True)
@@ -950,17 +2436,18 @@ class AchievementPopup(tk.Toplevel):
         mh = master.winfo_height(); my = master.winfo_y()
         pw = self.winfo_width();    ph = self.winfo_height()
         self.geometry(f"+{mx+mw-pw-20}+{my+mh-ph-60}")
-        self._alpha = 1.0
-        self.after(2400, self._fade)
+        self._age = 0.0
+        animate(self, self._fade)
 
-    def _fade(self):
-        self._alpha -= 0.07
-        if self._alpha <= 0:
-            self.destroy(); return
-        try:
-            self.attributes("-alpha", max(0, self._alpha))
-            self.after(40, self._fade)
-        except: pass
+    def _fade(self, dt):
+        self._age += dt
+        if self._age < self.HOLD:
+            return
+        alpha = 1.0 - (self._age - self.HOLD) / self.FADE
+        if alpha <= 0:
+            self.destroy()
+            return False
+        self.attributes("-alpha", alpha)
 
 
 def queue_popups(master, badges, delay=0):
@@ -1037,6 +2524,130 @@ def make_scrollable(parent, bg=C["bg"]):
     return outer, scv, inner
 
 
+class VirtualList(tk.Frame):
+    """
+    Scrolling list of fixed-height rows that only has widgets for the rows
+    in view plus `overscan` either side; rows scrolled out are reused for
+    the ones scrolled in.
+
+    make_row(parent) builds one empty row widget; fill_row(widget, index,
+    data) shows a row in it.  Data comes from fetch_page(page, last,
+    deliver), which must call deliver(rows) — at once or later, e.g. via
+    db_async — with up to page_size rows; a short page marks the end of the
+    list.  Pages are asked for in order as the view nears the last loaded
+    row, which is passed as `last` (None for page 0) for keyset paging.
+    """
+
+    def __init__(self, parent, row_height, make_row, fill_row, fetch_page,
+                 page_size, overscan=4, bg=C["bg"]):
+        super().__init__(parent, bg=bg)
+        self.row_height = row_height
+        self._make_row  = make_row
+        self._fill_row  = fill_row
+        self._fetch     = fetch_page
+        self._page_size = page_size
+        self._overscan  = overscan
+        self._canvas    = tk.Canvas(self, bg=bg, highlightthickness=0,
+                                    yscrollincrement=row_height)
+        self._sb        = tk.Scrollbar(self, orient="vertical",
+                                       command=self._canvas.yview)
+        self._canvas.configure(yscrollcommand=self._on_scroll)
+        self._sb.pack(side="right", fill="y")
+        self._canvas.pack(side="left", fill="both", expand=True)
+        self._canvas.bind("<Configure>", self._on_resize)
+        self._canvas.bind("<MouseWheel>", self._on_wheel)
+        self._free  = []    # (widget, canvas item) not showing a row
+        self._shown = {}    # row index -> (widget, canvas item)
+        self.reset()
+
+    # ── data ──────────────────────────────────────────────────────────────────
+
+    def reset(self):
+        """Forget every loaded row and start again from page 0."""
+        self._gen     = getattr(self, "_gen", 0) + 1   # ignores stale pages
+        self._rows    = []
+        self._done    = False
+        self._loading = False
+        for index in list(self._shown):
+            self._release(index)
+        self._canvas.yview_moveto(0)
+        self._load_next()
+
+    def _load_next(self):
+        if self._loading or self._done:
+            return
+        self._loading = True
+        gen = self._gen
+        self._fetch(len(self._rows) // self._page_size,
+                    self._rows[-1] if self._rows else None,
+                    lambda rows: self._deliver(gen, rows))
+
+    def _deliver(self, gen, rows):
+        if gen != self._gen:
+            return
+        self._loading = False
+        self._rows.extend(rows)
+        if len(rows) < self._page_size:
+            self._done = True
+        self._canvas.configure(
+            scrollregion=(0, 0, 0, len(self._rows) * self.row_height))
+        self._refresh_view()
+
+    # ── view ──────────────────────────────────────────────────────────────────
+
+    def _on_scroll(self, first, last):
+        self._sb.set(first, last)
+        self._refresh_view()
+
+    def _on_wheel(self, e):
+        self._canvas.yview_scroll(int(-1*(e.delta/120)), "units")
+
+    def _on_resize(self, e):
+        for _, item in self._shown.values():
+            self._canvas.itemconfig(item, width=e.width)
+        self._refresh_view()
+
+    def _release(self, index):
+        widget, item = self._shown.pop(index)
+        self._canvas.itemconfig(item, state="hidden")
+        self._free.append((widget, item))
+
+    def _acquire(self):
+        if self._free:
+            widget, item = self._free.pop()
+            self._canvas.itemconfig(item, state="normal")
+            return widget, item
+        widget = self._make_row(self._canvas)
+        item   = self._canvas.create_window(0, 0, anchor="nw", window=widget,
+                                            height=self.row_height,
+                                            width=self._canvas.winfo_width())
+        self._bind_wheel(widget)
+        return widget, item
+
+    def _bind_wheel(self, w):
+        w.bind("<MouseWheel>", self._on_wheel)
+        for child in w.winfo_children():
+            self._bind_wheel(child)
+
+    def _refresh_view(self):
+        """Place a row widget on every visible (or overscanned) index."""
+        h     = self.row_height
+        top   = int(self._canvas.canvasy(0))
+        first = max(0, top // h - self._overscan)
+        last  = min(len(self._rows),
+                    (top + self._canvas.winfo_height()) // h + 1 + self._overscan)
+        for index in [i for i in self._shown if not first <= i < last]:
+            self._release(index)
+        for index in range(first, last):
+            if index not in self._shown:
+                widget, item = self._acquire()
+                self._canvas.coords(item, 0, index * h)
+                self._fill_row(widget, index, self._rows[index])
+                self._shown[index] = (widget, item)
+        if last + self._overscan >= len(self._rows):
+            self._load_next()
+
+
 def is_prime(n):
     if n < 2: return False
     for i in range(2, int(n**0.5)+1):
@@ -1044,28 +2655,71 @@ def is_prime(n):
     return True
 
 
-# ══════════════════════════ SOUND MANAGER ════════════════════════════════════
-
-class SoundManager:
+def lttb(values, threshold, xs=None):
     """
-    Pure-stdlib audio engine.  Generates PCM tones entirely in Python and
-    plays them via:
-      • winsound  (Windows)
-      • afplay    (macOS)
-      • aplay     (Linux / ALSA)
-    Music is a gentle lo-fi loop built from layered sine tones.
-    All playback is non-blocking (threads) so the UI stays responsive.
+    Largest-triangle-three-buckets downsampling of a series whose points sit
+    at xs (default: evenly spaced).  Returns the indices of at most
+    `threshold` points that keep its shape (always including the first and
+    last).
+    """
+    n = len(values)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    if xs is None:
+        xs = range(n)
+    every  = (n - 2) / (threshold - 2)
+    picked = [0]
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third corner of the triangle
+        nxt_lo = int((i + 1) * every) + 1
+        nxt_hi = min(int((i + 2) * every) + 1, n)
+        avg_x  = sum(xs[nxt_lo:nxt_hi]) / (nxt_hi - nxt_lo)
+        avg_y  = sum(values[nxt_lo:nxt_hi]) / (nxt_hi - nxt_lo)
+        ax, ay = xs[a], values[a]
+        best, best_area = -1, -1.0
+        for j in range(int(i * every) + 1, nxt_lo):
+            area = abs((ax - avg_x) * (values[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        picked.append(best)
+        a = best
+    picked.append(n - 1)
+    return picked
+
+
+def period_offsets(keys):
+    """
+    Position of each YYYY-MM-DD (days) or YYYY-MM (months) key, counted
+    from the first one, so charts leave room for the days nobody played.
     """
+    if keys and len(keys[0]) == 7:
+        ords = [int(k[:4]) * 12 + int(k[5:7]) for k in keys]
+    else:
+        ords = [date.fromisoformat(k).toordinal() for k in keys]
+    return [o - ords[0] for o in ords]
 
-    SAMPLE_RATE = 22050
-    CHANNELS    = 1
-    SAMPWIDTH   = 2   # 16-bit
 
-    # ---------- waveform helpers ----------
+# ══════════════════════════ PCM SYNTHESIS ════════════════════════════════════
+#
+# 16-bit mono sample buffers with bulk operations.  Every backend exposes the
+# same static methods; PCM is the fastest one available.  Results match the
+# original per-sample code (ReferencePCM) exactly, except that NumPy's sin may
+# round differently in the last bit and move a sample by 1 LSB.
+
+class ReferencePCM:
+    """The original per-sample struct code; kept as the --bench-synth baseline."""
 
     @staticmethod
-    def _sine(freq, duration, volume=0.4, sample_rate=22050):
-        """Return raw 16-bit PCM bytes for a sine wave."""
+    def zeros(n):
+        return bytearray(n * 2)
+
+    @staticmethod
+    def length(buf):
+        return len(buf) // 2
+
+    @staticmethod
+    def sine(freq, duration, volume=0.4, sample_rate=22050):
         n      = int(sample_rate * duration)
         factor = 2 * math.pi * freq / sample_rate
         data   = bytearray(n * 2)
@@ -1074,26 +2728,14 @@ class SoundManager:
             env = min(1.0, min(i, n - i) / max(1, sample_rate * 0.008))
             val = int(volume * env * 32767 * math.sin(i * factor))
             struct.pack_into("<h", data, i * 2, max(-32768, min(32767, val)))
-        return bytes(data)
+        return data
 
     @staticmethod
-    def _mix(*pcm_list):
-        """Mix multiple equal-length PCM byte strings by averaging."""
-        n = len(pcm_list[0]) // 2
-        out = bytearray(len(pcm_list[0]))
-        for i in range(n):
-            total = sum(struct.unpack_from("<h", p, i * 2)[0] for p in pcm_list)
-            val   = max(-32768, min(32767, total // len(pcm_list)))
-            struct.pack_into("<h", out, i * 2, val)
-        return bytes(out)
-
-    @staticmethod
-    def _envelope(pcm, attack=0.02, release=0.05, sample_rate=22050):
-        """Apply attack/release envelope to PCM bytes."""
-        n        = len(pcm) // 2
-        atk_s    = int(sample_rate * attack)
-        rel_s    = int(sample_rate * release)
-        out      = bytearray(len(pcm))
+    def envelope(buf, attack=0.02, release=0.05, sample_rate=22050):
+        n     = len(buf) // 2
+        atk_s = int(sample_rate * attack)
+        rel_s = int(sample_rate * release)
+        out   = bytearray(len(buf))
         for i in range(n):
             if i < atk_s:
                 env = i / atk_s
@@ -1101,9 +2743,432 @@ class SoundManager:
                 env = (n - i) / rel_s
             else:
                 env = 1.0
-            val = int(struct.unpack_from("<h", pcm, i * 2)[0] * env)
+            val = int(struct.unpack_from("<h", buf, i * 2)[0] * env)
             struct.pack_into("<h", out, i * 2, max(-32768, min(32767, val)))
-        return bytes(out)
+        return out
+
+    @staticmethod
+    def tone(freq, duration, volume, attack, release, sample_rate, start, stop):
+        """Samples [start, stop) of envelope(sine(...)), without the rest."""
+        full = ReferencePCM.envelope(ReferencePCM.sine(freq, duration, volume, sample_rate),
+                                     attack, release, sample_rate)
+        return full[start * 2:stop * 2]
+
+    @staticmethod
+    def mix(*bufs):
+        n   = min(len(b) for b in bufs) // 2
+        out = bytearray(n * 2)
+        for i in range(n):
+            total = sum(struct.unpack_from("<h", b, i * 2)[0] for b in bufs)
+            struct.pack_into("<h", out, i * 2, max(-32768, min(32767, total // len(bufs))))
+        return out
+
+    @staticmethod
+    def add_at(dst, src, offset=0):
+        n = len(dst) // 2
+        for i in range(len(src) // 2):
+            idx = offset + i
+            if idx >= n: break
+            old = struct.unpack_from("<h", dst, idx * 2)[0]
+            new = struct.unpack_from("<h", src, i * 2)[0]
+            struct.pack_into("<h", dst, idx * 2, max(-32768, min(32767, old + new)))
+
+    @staticmethod
+    def concat(bufs):
+        return bytearray(b"".join(bufs))
+
+    @staticmethod
+    def to_bytes(buf):
+        return bytes(buf)
+
+
+class ArrayPCM:
+    """
+    array('h') buffers.  Still pure Python, but sample loops are list
+    comprehensions over native ints, and the sections a fade leaves at 1.0
+    are copied in bulk rather than recomputed.
+    """
+
+    @staticmethod
+    def zeros(n):
+        return array("h", bytes(n * 2))
+
+    @staticmethod
+    def length(buf):
+        return len(buf)
+
+    @staticmethod
+    def sine(freq, duration, volume=0.4, sample_rate=22050):
+        n      = int(sample_rate * duration)
+        factor = 2 * math.pi * freq / sample_rate
+        ramp   = max(1, sample_rate * 0.008)
+        edge   = min(n, int(ramp) + 1)       # samples the fade can touch
+        sin    = math.sin
+        amp    = volume * 32767              # == volume * 1.0 * 32767
+
+        def faded(i):
+            env = min(1.0, min(i, n - i) / ramp)
+            return int(volume * env * 32767 * sin(i * factor))
+
+        vals  = [faded(i) for i in range(edge)]
+        vals += [int(amp * sin(i * factor)) for i in range(edge, n - edge)]
+        vals += [faded(i) for i in range(max(edge, n - edge), n)]
+        if volume > 1:
+            vals = [max(-32768, min(32767, v)) for v in vals]
+        return array("h", vals)
+
+    @staticmethod
+    def envelope(buf, attack=0.02, release=0.05, sample_rate=22050):
+        n     = len(buf)
+        atk_s = int(sample_rate * attack)
+        rel_s = int(sample_rate * release)
+        out   = array("h", buf)
+        head  = min(atk_s, n)
+        out[:head] = array("h", [int(buf[i] * (i / atk_s)) for i in range(head)])
+        tail  = max(head, n - rel_s + 1)
+        out[tail:] = array("h", [int(buf[i] * ((n - i) / rel_s)) for i in range(tail, n)])
+        return out
+
+    @staticmethod
+    def tone(freq, duration, volume, attack, release, sample_rate, start, stop):
+        """
+        Samples [start, stop) of envelope(sine(...)), computed per index so
+        a long note can be rendered a window at a time.
+        """
+        n      = int(sample_rate * duration)
+        factor = 2 * math.pi * freq / sample_rate
+        ramp   = max(1, sample_rate * 0.008)
+        atk_s  = int(sample_rate * attack)
+        rel_s  = int(sample_rate * release)
+        sin    = math.sin
+
+        def sample(i):
+            env = min(1.0, min(i, n - i) / ramp)
+            val = max(-32768, min(32767, int(volume * env * 32767 * sin(i * factor))))
+            if i < atk_s:
+                return int(val * (i / atk_s))
+            if i > n - rel_s:
+                return int(val * ((n - i) / rel_s))
+            return val
+
+        return array("h", [sample(i) for i in range(start, stop)])
+
+    @staticmethod
+    def mix(*bufs):
+        k = len(bufs)
+        return array("h", [sum(t) // k for t in zip(*bufs)])
+
+    @staticmethod
+    def add_at(dst, src, offset=0):
+        end = min(len(dst), offset + len(src))
+        if end <= offset:
+            return
+        dst[offset:end] = array("h", [max(-32768, min(32767, a + b))
+                                      for a, b in zip(dst[offset:end], src)])
+
+    @staticmethod
+    def concat(bufs):
+        out = array("h")
+        for b in bufs:
+            out.extend(b)
+        return out
+
+    @staticmethod
+    def to_bytes(buf):
+        if sys.byteorder == "big":
+            buf = array("h", buf)
+            buf.byteswap()
+        return buf.tobytes()
+
+
+class NumpyPCM:
+    """int16 ndarray buffers; whole-buffer vector operations."""
+
+    @staticmethod
+    def zeros(n):
+        return np.zeros(n, dtype=np.int16)
+
+    @staticmethod
+    def length(buf):
+        return len(buf)
+
+    @staticmethod
+    def sine(freq, duration, volume=0.4, sample_rate=22050):
+        n      = int(sample_rate * duration)
+        factor = 2 * math.pi * freq / sample_rate
+        i      = np.arange(n)
+        env    = np.minimum(1.0, np.minimum(i, n - i) / max(1, sample_rate * 0.008))
+        val    = (volume * env * 32767 * np.sin(i * factor)).astype(np.int32)
+        return np.clip(val, -32768, 32767).astype(np.int16)
+
+    @staticmethod
+    def envelope(buf, attack=0.02, release=0.05, sample_rate=22050):
+        n     = len(buf)
+        atk_s = int(sample_rate * attack)
+        rel_s = int(sample_rate * release)
+        out   = buf.copy()
+        head  = min(atk_s, n)
+        i     = np.arange(head)
+        out[:head] = (buf[:head] * (i / atk_s)).astype(np.int16)
+        tail  = max(head, n - rel_s + 1)
+        i     = np.arange(tail, n)
+        out[tail:] = (buf[tail:] * ((n - i) / rel_s)).astype(np.int16)
+        return out
+
+    @staticmethod
+    def tone(freq, duration, volume, attack, release, sample_rate, start, stop):
+        """Samples [start, stop) of envelope(sine(...)), without the rest."""
+        n      = int(sample_rate * duration)
+        factor = 2 * math.pi * freq / sample_rate
+        atk_s  = int(sample_rate * attack)
+        rel_s  = int(sample_rate * release)
+        i      = np.arange(start, stop)
+        env    = np.minimum(1.0, np.minimum(i, n - i) / max(1, sample_rate * 0.008))
+        val    = (volume * env * 32767 * np.sin(i * factor)).astype(np.int32)
+        val    = np.clip(val, -32768, 32767).astype(np.int16)
+        fade   = np.where(i < atk_s, i / max(1, atk_s),
+                          np.where(i > n - rel_s, (n - i) / max(1, rel_s), 1.0))
+        return (val * fade).astype(np.int16)
+
+    @staticmethod
+    def mix(*bufs):
+        n = min(len(b) for b in bufs)
+        total = np.sum([b[:n].astype(np.int32) for b in bufs], axis=0)
+        return (total // len(bufs)).astype(np.int16)
+
+    @staticmethod
+    def add_at(dst, src, offset=0):
+        end = min(len(dst), offset + len(src))
+        if end <= offset:
+            return
+        seg = dst[offset:end].astype(np.int32) + src[:end - offset]
+        dst[offset:end] = np.clip(seg, -32768, 32767)
+
+    @staticmethod
+    def concat(bufs):
+        return np.concatenate(bufs)
+
+    @staticmethod
+    def to_bytes(buf):
+        return buf.astype("<i2").tobytes()
+
+
+PCM = NumpyPCM if np is not None else ArrayPCM
+
+
+# ══════════════════════════ AUDIO BACKENDS ═══════════════════════════════════
+
+class AudioBackend:
+    """One way of playing a sound file: a player binary (or winsound) and the formats it handles."""
+
+    def __init__(self, name, argv, formats, path=None, raw_args=None):
+        self.name     = name
+        self.argv     = argv      # command prefix; the file path is appended
+        self.formats  = formats   # e.g. {"wav", "mp3", "raw"}
+        self.path     = path      # where shutil.which found it
+        self.raw_args = raw_args  # arguments for raw PCM on stdin ("raw" only)
+
+    def can_play(self, fmt):
+        return fmt in self.formats
+
+    def command(self, path):
+        return self.argv + [path]
+
+    def raw_command(self, sample_rate, channels):
+        """Command that plays signed 16-bit little-endian PCM from stdin."""
+        return self.argv + [a.format(rate=sample_rate, channels=channels)
+                            for a in self.raw_args]
+
+    def __repr__(self):
+        return f"AudioBackend({self.name!r}, formats={sorted(self.formats)})"
+
+
+class AudioBackends:
+    """
+    Audio players probed once at startup with shutil.which and kept for the
+    session.  Both SFXPlayer and the music loop ask for a backend by format
+    rather than searching themselves.  AudioBackends.null() has no players,
+    so the game runs silently (and skips sound synthesis) e.g. in CI.
+    """
+
+    # (name, argv, formats, platforms), in order of preference per format
+    KNOWN = [
+        ("winsound", None, {"wav"}, {"win32"}),
+        ("afplay",   ["afplay"], {"wav", "mp3"}, {"darwin"}),
+        ("aplay",    ["aplay", "-q"], {"wav", "raw"}, {"linux"}),
+        ("paplay",   ["paplay"], {"wav", "raw"}, {"linux"}),
+        ("mpg123",   ["mpg123", "-q"], {"mp3"}, {"linux"}),
+        ("ffplay",   ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet"],
+                     {"wav", "mp3"}, {"linux", "darwin", "win32"}),
+        ("mpg321",   ["mpg321", "-q"], {"mp3"}, {"linux"}),
+        ("cvlc",     ["cvlc", "--play-and-exit", "--intf", "dummy"],
+                     {"wav", "mp3"}, {"linux"}),
+    ]
+
+    # Extra arguments for players that can read raw PCM from stdin
+    RAW_ARGS = {
+        "aplay":  ["-t", "raw", "-f", "S16_LE", "-r", "{rate}", "-c", "{channels}", "-"],
+        "paplay": ["--raw", "--format=s16le", "--rate={rate}", "--channels={channels}"],
+    }
+
+    def __init__(self, backends=()):
+        self.backends = list(backends)
+
+    @classmethod
+    def probe(cls):
+        platform = "linux" if sys.platform.startswith(("linux", "freebsd")) else sys.platform
+        found = []
+        for name, argv, formats, platforms in cls.KNOWN:
+            if platform not in platforms:
+                continue
+            if argv is None:
+                found.append(AudioBackend(name, None, formats))
+                continue
+            path = shutil.which(argv[0])
+            if path:
+                found.append(AudioBackend(name, argv, formats, path,
+                                          cls.RAW_ARGS.get(name)))
+        return cls(found)
+
+    @classmethod
+    def null(cls):
+        return cls()
+
+    @classmethod
+    def create(cls, kind="auto"):
+        """kind "auto" probes, "null" is silent; FLASHCARDS_AUDIO=null forces silence."""
+        if kind == "null" or os.environ.get("FLASHCARDS_AUDIO") == "null":
+            return cls.null()
+        return cls.probe()
+
+    @property
+    def is_null(self):
+        return not self.backends
+
+    def for_format(self, fmt):
+        """The preferred backend that can play fmt, or None."""
+        return next((b for b in self.backends if b.can_play(fmt)), None)
+
+    def describe(self):
+        return {b.name: sorted(b.formats) for b in self.backends}
+
+
+# ══════════════════════════ SOUND MANAGER ════════════════════════════════════
+
+class SFXPlayer:
+    """
+    One long-lived thread that starts sound effects from a bounded queue.
+    Each sound is a WAV file on disk, played by the session's WAV backend
+    and started without a shell; one not in files yet is rendered first
+    by render(name), so a cold cache delays a sound instead of losing it.  A sound that is already
+    waiting isn't queued twice, and sounds are dropped when the queue or
+    the voice limit is full, so a burst of answers can't build a backlog
+    of late sounds.  Latency is measured from play() to the player start.
+    """
+
+    def __init__(self, files, backend, render=None):
+        self._files     = files      # name -> WAV path
+        self._backend   = backend    # AudioBackend for "wav", or None
+        self._render    = render     # name -> WAV path (or None), for misses
+        self._queue     = queue.Queue(maxsize=SFX_QUEUE_MAX)
+        self._pending   = set()      # names waiting in the queue
+        self._lock      = threading.Lock()
+        self._voices    = []         # running player processes
+        self.player     = backend.name if backend else None
+        self.latencies  = collections.deque(maxlen=256)   # seconds
+        self.played     = 0
+        self.dropped    = 0
+        self.coalesced  = 0
+        self._thread    = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def play(self, name):
+        """Queue name for playback; returns False if it was coalesced or dropped."""
+        if self._backend is None or (name not in self._files and self._render is None):
+            return False
+        with self._lock:
+            if name in self._pending:
+                self.coalesced += 1
+                return False
+            try:
+                self._queue.put_nowait((name, time.perf_counter()))
+            except queue.Full:
+                self.dropped += 1
+                return False
+            self._pending.add(name)
+        return True
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            name, queued_at = item
+            with self._lock:
+                self._pending.discard(name)
+            try:
+                path    = self._files.get(name) or self._render(name)
+                started = path is not None and self._start(path)
+            except OSError:
+                started = False
+            if started:
+                self.played += 1
+                self.latencies.append(time.perf_counter() - queued_at)
+            else:
+                self.dropped += 1
+
+    def _start(self, path):
+        if self._backend.name == "winsound":
+            import winsound
+            winsound.PlaySound(path, winsound.SND_FILENAME | winsound.SND_ASYNC
+                               | winsound.SND_NODEFAULT)
+            return True
+        self._voices = [p for p in self._voices if p.poll() is None]
+        if len(self._voices) >= SFX_MAX_VOICES:
+            return False
+        self._voices.append(subprocess.Popen(
+            self._backend.command(path), stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL))
+        return True
+
+    def stats(self):
+        """Counts plus enqueue-to-start latency in milliseconds."""
+        lat = sorted(self.latencies)
+        def pct(q):
+            return round(lat[min(len(lat) - 1, int(q * len(lat)))] * 1000, 2) if lat else None
+        return {
+            "player":    self.player,
+            "played":    self.played,
+            "dropped":   self.dropped,
+            "coalesced": self.coalesced,
+            "latency_ms": {"p50": pct(0.50), "p95": pct(0.95),
+                           "max": round(lat[-1] * 1000, 2) if lat else None},
+        }
+
+    def close(self):
+        try:
+            self._queue.put(None, timeout=1)
+        except queue.Full:
+            pass
+        for p in self._voices:
+            try: p.terminate()
+            except OSError: pass
+
+
+class SoundManager:
+    """
+    Pure-stdlib audio engine.  Generates PCM tones entirely in Python and
+    plays them via:
+      • winsound  (Windows)
+      • afplay    (macOS)
+      • aplay     (Linux / ALSA)
+    Music is a gentle lo-fi loop built from layered sine tones.
+    All playback is non-blocking (threads) so the UI stays responsive.
+    """
+
+    SAMPLE_RATE = 22050
+    CHANNELS    = 1
+    SAMPWIDTH   = 2   # 16-bit
 
     @classmethod
     def _make_wav(cls, pcm):
@@ -1117,102 +3182,41 @@ class SoundManager:
         return buf.getvalue()
 
     # ---------- sound definitions ----------
-
-    @classmethod
-    def _build_sounds(cls):
-        sr = cls.SAMPLE_RATE
-        s  = cls._sine
-
-        sounds = {}
-
+    # Every parameter that shapes a sound lives in these tables, so a hash of
+    # a definition (plus the sample format) names its cached WAV file.
+    # Tones are (freq, seconds, volume); envelopes are (attack, release).
+    #   duet  — first tone from the start, second ending with the buffer
+    #   mix   — tones averaged, cut to the shortest
+    #   seq   — each tone enveloped, then played one after another
+    #   stack — tones summed (saturating) from the start
+
+    SFX_DEFS = {
         # Correct — bright ascending two-tone ding
-        t1 = s(880,  0.10, 0.55, sr)
-        t2 = s(1320, 0.14, 0.45, sr)
-        combined  = t1 + bytes(max(0, len(t2) - len(t1)))
-        combined2 = bytes(max(0, len(t1) - len(t2))) + t2
-        n = min(len(combined), len(combined2)) // 2
-        merged = bytearray(n * 2)
-        for i in range(n):
-            v1 = struct.unpack_from("<h", combined,  i * 2)[0]
-            v2 = struct.unpack_from("<h", combined2, i * 2)[0]
-            struct.pack_into("<h", merged, i * 2, max(-32768, min(32767, v1 + v2)))
-        sounds["correct"] = cls._make_wav(cls._envelope(bytes(merged)))
-
+        "correct":     ("duet",  [(880, 0.10, 0.55), (1320, 0.14, 0.45)], (0.02, 0.05)),
         # Wrong — descending dissonant buzz
-        b1 = s(220, 0.12, 0.5, sr)
-        b2 = s(196, 0.18, 0.4, sr)
-        n  = min(len(b1), len(b2)) // 2
-        bz = bytearray(n * 2)
-        for i in range(n):
-            v1 = struct.unpack_from("<h", b1, i * 2)[0]
-            v2 = struct.unpack_from("<h", b2, i * 2)[0]
-            struct.pack_into("<h", bz, i * 2, max(-32768, min(32767, (v1 + v2) // 2)))
-        sounds["wrong"] = cls._make_wav(cls._envelope(bytes(bz), attack=0.005, release=0.1))
-
-        # Achievement — triumphant 4-note fanfare
-        notes  = [523, 659, 784, 1047]   # C5 E5 G5 C6
-        frames = b""
-        for freq in notes:
-            frames += cls._envelope(s(freq, 0.13, 0.5, sr), attack=0.01, release=0.04)
-        sounds["achievement"] = cls._make_wav(frames)
-
+        "wrong":       ("mix",   [(220, 0.12, 0.5), (196, 0.18, 0.4)], (0.005, 0.1)),
+        # Achievement — triumphant 4-note fanfare, C5 E5 G5 C6
+        "achievement": ("seq",   [(f, 0.13, 0.5) for f in (523, 659, 784, 1047)], (0.01, 0.04)),
         # Click — very short tick
-        sounds["click"] = cls._make_wav(cls._envelope(s(1200, 0.03, 0.25, sr),
-                                                       attack=0.001, release=0.01))
-
+        "click":       ("seq",   [(1200, 0.03, 0.25)], (0.001, 0.01)),
         # Reveal — soft whoosh (detuned saw approximated with 8 harmonics)
-        whoosh = bytearray(int(sr * 0.18) * 2)
-        for h in range(1, 9):
-            tone = s(300 * h, 0.18, 0.08 / h, sr)
-            for i in range(len(whoosh) // 2):
-                v  = struct.unpack_from("<h", whoosh, i * 2)[0]
-                v2 = struct.unpack_from("<h", tone,   i * 2)[0] if i * 2 < len(tone) else 0
-                struct.pack_into("<h", whoosh, i * 2, max(-32768, min(32767, v + v2)))
-        sounds["reveal"] = cls._make_wav(cls._envelope(bytes(whoosh), attack=0.02, release=0.08))
-
+        "reveal":      ("stack", [(300 * h, 0.18, 0.08 / h) for h in range(1, 9)], (0.02, 0.08)),
         # Cashout — coin jingle (three quick pings)
-        coin = b""
-        for freq in [1047, 1175, 1319]:
-            coin += cls._envelope(s(freq, 0.08, 0.45, sr), attack=0.005, release=0.04)
-        sounds["cashout"] = cls._make_wav(coin)
-
-        return sounds
-
-    @classmethod
-    def _build_music_loop(cls, duration=8.0):
-        """
-        Generate a ~8 second lo-fi study beat loop:
-        - Slow bass note (root)
-        - Mid pad chord (root + fifth)
-        - Gentle high melody motif
-        All soft, blended, loopable.
-        """
-        sr  = cls.SAMPLE_RATE
-        n   = int(sr * duration)
-        s   = cls._sine
-        buf = bytearray(n * 2)
-
-        def _add(freq, vol, dur, offset_s=0.0):
-            tone  = cls._envelope(s(freq, dur, vol, sr), attack=0.15, release=0.2)
-            start = int(offset_s * sr)
-            for i in range(len(tone) // 2):
-                idx = start + i
-                if idx >= n: break
-                old = struct.unpack_from("<h", buf, idx * 2)[0]
-                new = struct.unpack_from("<h", tone, i * 2)[0]
-                struct.pack_into("<h", buf, idx * 2,
-                                 max(-32768, min(32767, old + new)))
-
-        # Bass pulses every 2 s  (A2 = 110 Hz)
-        for t in [0, 2.0, 4.0, 6.0]:
-            _add(110, 0.18, 1.4, t)
-
-        # Pad chord (A3 + E4 + A4)
-        for freq, vol in [(220, 0.10), (330, 0.08), (440, 0.07)]:
-            _add(freq, vol, duration - 0.3, 0.0)
-
-        # Melody motif — gentle 8-note phrase repeated
-        melody = [
+        "cashout":     ("seq",   [(f, 0.08, 0.45) for f in (1047, 1175, 1319)], (0.005, 0.04)),
+    }
+
+    # ~8 second lo-fi study loop: slow bass root, mid pad chord (root +
+    # fifth), gentle high melody motif.  All soft, blended, loopable.
+    # Notes are (freq, volume, seconds, offset) and are added in this order.
+    MUSIC_LOOP = {
+        "duration": 8.0,
+        "envelope": (0.15, 0.2),
+        "notes": [
+            # Bass pulses every 2 s  (A2 = 110 Hz)
+            *[(110, 0.18, 1.4, t) for t in (0, 2.0, 4.0, 6.0)],
+            # Pad chord (A3 + E4 + A4), held to 0.3 s before the loop point
+            *[(f, v, 8.0 - 0.3, 0.0) for f, v in ((220, 0.10), (330, 0.08), (440, 0.07))],
+            # Melody motif — gentle 8-note phrase repeated
             (660, 0.30, 0.14, 0.0),
             (587, 0.25, 0.14, 0.5),
             (523, 0.28, 0.18, 1.0),
@@ -1225,11 +3229,157 @@ class SoundManager:
             (523, 0.28, 0.22, 5.6),
             (440, 0.20, 0.30, 6.4),
             (494, 0.25, 0.24, 7.0),
-        ]
-        for freq, vol, dur, off in melody:
-            _add(freq, vol, dur, off)
+        ],
+    }
+
+    # Both builders take the PCM backend to synthesise with (default: PCM).
+
+    @classmethod
+    def _build_sfx(cls, name, P=None):
+        """Synthesise one SFX_DEFS entry; returns WAV bytes."""
+        P  = P or PCM
+        sr = cls.SAMPLE_RATE
+        kind, tones, (attack, release) = cls.SFX_DEFS[name]
+        bufs = [P.sine(freq, dur, vol, sr) for freq, dur, vol in tones]
+
+        def env(buf):
+            return P.envelope(buf, attack=attack, release=release, sample_rate=sr)
+
+        if kind == "seq":
+            pcm = P.concat([env(b) for b in bufs])
+        elif kind == "mix":
+            pcm = env(P.mix(*bufs))
+        else:
+            n   = max(P.length(b) for b in bufs)
+            pcm = P.zeros(n)
+            for i, b in enumerate(bufs):
+                offset = n - P.length(b) if kind == "duet" and i == 1 else 0
+                P.add_at(pcm, b, offset)
+            pcm = env(pcm)
+        return cls._make_wav(P.to_bytes(pcm))
+
+    @classmethod
+    def _build_sounds(cls, P=None):
+        return {name: cls._build_sfx(name, P) for name in cls.SFX_DEFS}
+
+    @classmethod
+    def _build_music_loop(cls, P=None):
+        P   = P or PCM
+        sr  = cls.SAMPLE_RATE
+        attack, release = cls.MUSIC_LOOP["envelope"]
+        buf = P.zeros(int(sr * cls.MUSIC_LOOP["duration"]))
+        for freq, vol, dur, offset_s in cls.MUSIC_LOOP["notes"]:
+            tone = P.envelope(P.sine(freq, dur, vol, sr),
+                              attack=attack, release=release, sample_rate=sr)
+            P.add_at(buf, tone, int(offset_s * sr))
+        return cls._make_wav(P.to_bytes(buf))
+
+    @classmethod
+    def _stream_music_loop(cls, chunk=MUSIC_CHUNK, P=None):
+        """
+        Endless raw PCM for MUSIC_LOOP, yielded chunk samples at a time.
+        Each chunk adds the overlapping part of every note in the same
+        order as _build_music_loop, so the samples (and their clipping)
+        are identical; only one chunk is ever held in memory.
+        """
+        P   = P or PCM
+        sr  = cls.SAMPLE_RATE
+        attack, release = cls.MUSIC_LOOP["envelope"]
+        total = int(sr * cls.MUSIC_LOOP["duration"])
+        notes = [(int(offset_s * sr), int(sr * dur), freq, dur, vol)
+                 for freq, vol, dur, offset_s in cls.MUSIC_LOOP["notes"]]
+        while True:
+            for start in range(0, total, chunk):
+                stop = min(total, start + chunk)
+                buf  = P.zeros(stop - start)
+                for offset, n, freq, dur, vol in notes:
+                    lo, hi = max(start, offset), min(stop, offset + n)
+                    if lo < hi:
+                        tone = P.tone(freq, dur, vol, attack, release, sr,
+                                      lo - offset, hi - offset)
+                        P.add_at(buf, tone, lo - start)
+                yield P.to_bytes(buf)
+
+    # ---------- WAV cache ----------
+    # Rendered sounds are kept as <name>-<hash>.wav, where the hash covers the
+    # definition and sample format; editing a definition changes the name,
+    # so stale files are never read and are removed when replaced.
+
+    @staticmethod
+    def _cache_dir():
+        if sys.platform == "win32":
+            base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+        else:
+            base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        return os.path.join(base, "flashcardsgame", "sounds")
+
+    @classmethod
+    def _cache_key(cls, name, definition):
+        spec = repr((name, definition, cls.SAMPLE_RATE, cls.CHANNELS, cls.SAMPWIDTH))
+        return hashlib.sha1(spec.encode()).hexdigest()[:16]
+
+    @classmethod
+    def _cache_path(cls, name, definition):
+        return os.path.join(cls._cache_dir(), f"{name}-{cls._cache_key(name, definition)}.wav")
 
-        return cls._make_wav(bytes(buf))
+    @classmethod
+    def _cached_wav(cls, name, definition, build):
+        """
+        Path of the WAV file for name, rendering and storing it on a miss.
+        If the cache can't be written the WAV goes to a temp file instead;
+        returns (path, is_temp).
+        """
+        folder = cls._cache_dir()
+        path   = cls._cache_path(name, definition)
+        if os.path.isfile(path):
+            return path, False
+        wav = build()
+        try:
+            os.makedirs(folder, exist_ok=True)
+            for old in os.listdir(folder):
+                if old.startswith(f"{name}-") and old.endswith(".wav"):
+                    os.unlink(os.path.join(folder, old))
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(wav)
+            os.replace(tmp, path)
+            return path, False
+        except OSError:
+            # read-only home etc.: render again next launch
+            return cls._write_tmp(wav), True
+
+    def load_sounds(self):
+        """Render every SFX missing from the WAV cache (see _sound_path)."""
+        for name in self.SFX_DEFS:
+            self._sound_path(name)
+
+    def _sound_path(self, name):
+        """
+        WAV path of SFX name, rendering and caching it first if needed, or
+        None if that fails.  Called by the preloading thread and by the SFX
+        worker for a sound played before the preload reached it; the lock
+        keeps the two from writing the same file.  Temp files are removed
+        by shutdown.
+        """
+        with self._render_lock:
+            path = self._sounds.get(name)
+            if path is not None:
+                return path
+            try:
+                path, is_temp = self._cached_wav(name, self.SFX_DEFS[name],
+                                                 lambda: self._build_sfx(name))
+            except Exception:
+                return None   # silently degrade if audio generation fails
+            if is_temp:
+                self._temp_files.append(path)
+            self._sounds[name] = path
+            return path
+
+    def load_music_loop(self):
+        path, is_temp = self._cached_wav("music", self.MUSIC_LOOP, self._build_music_loop)
+        if is_temp:
+            self._temp_files.append(path)
+        return path
 
     # ---------- playback ----------
 
@@ -1242,46 +3392,37 @@ class SoundManager:
         os.close(fd)
         return path
 
-    @classmethod
-    def _play_wav_bytes(cls, wav_bytes):
-        """Play wav_bytes non-blocking. Returns immediately."""
-        def _worker():
-            path = cls._write_tmp(wav_bytes)
-            try:
-                if sys.platform == "win32":
-                    import winsound
-                    winsound.PlaySound(path, winsound.SND_FILENAME)
-                elif sys.platform == "darwin":
-                    os.system(f'afplay "{path}" 2>/dev/null')
-                else:
-                    os.system(f'aplay -q "{path}" 2>/dev/null || '
-                              f'paplay "{path}" 2>/dev/null || '
-                              f'ffplay -nodisp -autoexit -loglevel quiet "{path}" 2>/dev/null')
-            finally:
-                try: os.unlink(path)
-                except: pass
-        threading.Thread(target=_worker, daemon=True).start()
-
     # ---------- public API ----------
 
     # Names of the lo-fi MP3 files (must sit in the same folder as this script).
     MUSIC_FILES = ["music/lofi1.mp3", "music/lofi2.mp3", "music/lofi3.mp3"]
 
-    def __init__(self):
+    def __init__(self, backends=None):
+        self.backends       = backends or AudioBackends.create()
         self._sfx_enabled   = True
         self._music_enabled = True
         self._music_thread  = None
         self._music_stop    = threading.Event()
-        self._music_proc    = None   # subprocess handle so we can kill mid-track
-        self._sounds        = {}
-        # Build SFX in background so startup is instant
-        threading.Thread(target=self._preload, daemon=True).start()
-
-    def _preload(self):
-        try:
-            self._sounds = self._build_sounds()
-        except Exception:
-            pass   # silently degrade if audio generation fails
+        self._music_proc    = None   # subprocess handle so we can stop mid-track
+        self._music_wav     = None   # path of the synthesised loop's WAV
+        self._temp_files    = []
+        # SFX already in the WAV cache are ready for the very first click.
+        # Misses (a cold cache or a changed definition) are rendered on a
+        # background thread; one played before that gets to it is rendered
+        # by the SFX worker on the spot (a few ms), so it is late, not lost.
+        # With no WAV player there is nothing to render them for.
+        wav_backend  = self.backends.for_format("wav")
+        self._sounds = {}
+        self._render_lock = threading.Lock()
+        if wav_backend:
+            for name, d in self.SFX_DEFS.items():
+                path = self._cache_path(name, d)
+                if os.path.isfile(path):
+                    self._sounds[name] = path
+            if len(self._sounds) < len(self.SFX_DEFS):
+                threading.Thread(target=self.load_sounds,
+                                 name="sfx-render", daemon=True).start()
+        self._sfx = SFXPlayer(self._sounds, wav_backend, self._sound_path)
 
     @staticmethod
     def _script_dir():
@@ -1307,100 +3448,134 @@ class SoundManager:
     def play(self, name):
         """Play a named SFX if enabled. Non-blocking."""
         if not self._sfx_enabled: return
-        wav = self._sounds.get(name)
-        if wav:
-            self._play_wav_bytes(wav)
+        self._sfx.play(name)
+
+    def sfx_stats(self):
+        return self._sfx.stats()
+
+    def shutdown(self):
+        """Stop music and SFX and remove any temp WAV files."""
+        self.stop_music()
+        self._sfx.close()
+        for path in self._temp_files:
+            try: os.unlink(path)
+            except OSError: pass
 
     # -- Music --
 
     def start_music(self):
         """Start shuffling through the lofi MP3s in a daemon thread."""
-        if not self._music_enabled: return
+        if not self._music_enabled or self.backends.is_null: return
         if self._music_thread and self._music_thread.is_alive(): return
         self._music_stop.clear()
         self._music_thread = threading.Thread(target=self._music_loop, daemon=True)
         self._music_thread.start()
 
     def stop_music(self):
-        """Stop playback immediately: signal the loop AND kill the player process."""
+        """
+        Stop playback immediately: signal the loop AND terminate the player
+        process.  Never waits for it; the music thread reaps it.
+        """
         self._music_stop.set()
-        self._kill_music_proc()
-
-    def _kill_music_proc(self):
-        """Terminate the current player subprocess if running."""
         proc = self._music_proc
-        if proc is None:
-            return
+        if proc is not None:
+            try:
+                proc.terminate()
+            except OSError:
+                pass
+
+    def _wait_music_proc(self, proc):
+        """
+        Block the music thread until proc exits: at the end of its track,
+        or once stop_music has terminated it.
+        """
+        while True:
+            try:
+                proc.wait(timeout=0.5)
+                return
+            except subprocess.TimeoutExpired:
+                if self._music_stop.is_set():
+                    self._end_music_proc(proc)
+                    return
+
+    @staticmethod
+    def _end_music_proc(proc):
+        """Terminate proc and reap it, killing it if it lingers; music thread only."""
         try:
             proc.terminate()
             proc.wait(timeout=1)
         except Exception:
             try:
                 proc.kill()
+                proc.wait(timeout=1)
             except Exception:
                 pass
-        self._music_proc = None
 
-    def _play_mp3_blocking(self, path):
+    def _play_file_blocking(self, path, fmt):
         """
-        Play an MP3 file, blocking until it finishes or stop_music() is called.
-        Uses the best available player on each platform.
-        Stores the subprocess in self._music_proc so stop_music can kill it.
+        Play a sound file, blocking until it finishes or stop_music() is
+        called, with the session's backend for fmt.  Stores the subprocess
+        in self._music_proc so stop_music can terminate it.
         """
-        import subprocess
-
-        if sys.platform == "win32":
-            # Windows: use Windows Media Player via PowerShell (handles MP3)
-            cmd = [
-                "powershell", "-WindowStyle", "Hidden", "-Command",
-                f'(New-Object Media.SoundPlayer).PlaySync; '
-                f'Add-Type -AssemblyName presentationCore; '
-                f'$mp = New-Object system.windows.media.mediaplayer; '
-                f'$mp.open("{path}"); $mp.Play(); '
-                f'Start-Sleep -s 600'
-            ]
-            # Simpler fallback: ffplay (if installed via ffmpeg)
-            cmd = ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet", path]
-        elif sys.platform == "darwin":
-            cmd = ["afplay", path]
-        else:
-            # Linux: try mpg123 first (lightweight), then ffplay, then mpg321
-            for player in ["mpg123", "ffplay", "mpg321", "cvlc"]:
-                result = subprocess.run(["which", player],
-                                        capture_output=True)
-                if result.returncode == 0:
-                    if player == "ffplay":
-                        cmd = ["ffplay", "-nodisp", "-autoexit",
-                               "-loglevel", "quiet", path]
-                    elif player == "cvlc":
-                        cmd = ["cvlc", "--play-and-exit", "--intf",
-                               "dummy", path]
-                    else:
-                        cmd = [player, path]
-                    break
-            else:
-                # No MP3 player found — sleep to avoid busy-loop
-                time.sleep(30)
-                return
-
+        backend = self.backends.for_format(fmt)
+        if backend is None:
+            # No player for this format — sleep to avoid busy-loop
+            self._music_stop.wait(30)
+            return
+        if backend.name == "winsound":
+            import winsound
+            winsound.PlaySound(path, winsound.SND_FILENAME)
+            return
         try:
-            proc = subprocess.Popen(cmd,
+            proc = subprocess.Popen(backend.command(path),
+                                    stdin=subprocess.DEVNULL,
                                     stdout=subprocess.DEVNULL,
                                     stderr=subprocess.DEVNULL)
             self._music_proc = proc
-            proc.wait()   # blocks until track ends or process is killed
-        except FileNotFoundError:
-            # Player binary not found
-            time.sleep(30)
-        except Exception:
-            pass
+            self._wait_music_proc(proc)
+        except OSError:
+            # Player vanished since startup
+            self._music_stop.wait(30)
+        finally:
+            self._music_proc = None
+
+    def _stream_music(self, backend):
+        """
+        Synthesise the loop chunk by chunk into the player's stdin, so it
+        repeats without a gap.  Blocks until stop_music() kills the player,
+        which is checked between chunks.
+        """
+        try:
+            proc = subprocess.Popen(
+                backend.raw_command(self.SAMPLE_RATE, self.CHANNELS),
+                stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL, bufsize=0)
+        except OSError:
+            self._music_stop.wait(30)
+            return
+        self._music_proc = proc
+        try:
+            for data in self._stream_music_loop():
+                if self._music_stop.is_set():
+                    break
+                proc.stdin.write(data)
+        except (OSError, ValueError):
+            # Player killed by stop_music, or exited on its own
+            if not self._music_stop.is_set():
+                self._music_stop.wait(5)
         finally:
             self._music_proc = None
+            self._end_music_proc(proc)
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
 
     def _music_loop(self):
         """
         Continuously shuffle and play all found lofi MP3s.
-        Falls back to the synthesised WAV loop if no MP3s are present.
+        Falls back to the synthesised loop if no MP3s are present: streamed
+        into a raw-PCM player when there is one, else the cached WAV file.
         """
         while not self._music_stop.is_set():
             tracks = self._find_music_files()
@@ -1408,32 +3583,23 @@ class SoundManager:
                 for path in tracks:
                     if self._music_stop.is_set():
                         return
-                    self._play_mp3_blocking(path)
+                    self._play_file_blocking(path, "mp3")
+            elif self.backends.for_format("raw"):
+                # Fallback: stream the synthesised loop into the player
+                self._stream_music(self.backends.for_format("raw"))
             else:
-                # Fallback: synthesised loop (build it on demand)
-                if not hasattr(self, "_music_wav") or not self._music_wav:
+                # Fallback: cached synthesised loop, replayed as a file
+                if not self._music_wav:
                     try:
-                        self._music_wav = self._build_music_loop(duration=8.0)
+                        self._music_wav = self.load_music_loop()
                     except Exception:
                         time.sleep(5)
                         continue
-                wav = getattr(self, "_music_wav", None)
-                if not wav:
+                tmp = self._music_wav
+                if not tmp:
                     time.sleep(1)
                     continue
-                tmp = self._write_tmp(wav)
-                try:
-                    if sys.platform == "win32":
-                        import winsound
-                        winsound.PlaySound(tmp, winsound.SND_FILENAME)
-                    elif sys.platform == "darwin":
-                        os.system(f'afplay "{tmp}" 2>/dev/null')
-                    else:
-                        os.system(f'aplay -q "{tmp}" 2>/dev/null || '
-                                  f'paplay "{tmp}" 2>/dev/null')
-                finally:
-                    try: os.unlink(tmp)
-                    except: pass
+                self._play_file_blocking(tmp, "wav")
                 if self._music_stop.is_set():
                     return
 
@@ -1455,7 +3621,7 @@ class SoundManager:
 # ══════════════════════════ MAIN APPLICATION ═════════════════════════════════
 
 class FlashcardApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, db_path="flashcard_game.db", audio="auto", deck_id=DEFAULT_DECK):
         super().__init__()
         self.title("CS Flashcard Game — Extended Edition v2.0")
         self.geometry("960x700")
@@ -1464,15 +3630,32 @@ class FlashcardApp(tk.Tk):
         self.minsize(720, 560)
         self._fullscreen    = False
         self._current_frame = None
+        # Reusable screens: class -> hidden frame, least recently shown first
+        self._screens       = collections.OrderedDict()
+        self._screens_uid   = None
         # Session tracking across modes for Triple Threat
         self._session_modes_won = set()
+        # Card selection for game modes: "shuffle" or "spaced" (DeckScheduler)
+        self.deck_mode = "shuffle"
+        # Deck played by every mode; loaded from the card store on first use
+        self.deck_id   = deck_id
         self.bind("<F11>",    lambda e: self.toggle_fullscreen())
         self.bind("<Escape>", lambda e: self.exit_fullscreen())
-        self.db    = DatabaseManager()
+        self.db    = DatabaseManager(db_path)
         self.user  = None
-        self.sound = SoundManager()
+        self.sound = SoundManager(AudioBackends.create(audio))
+        self.anim  = AnimationClock(self)
+        self._db_results = queue.Queue()
+        self.after(DB_POLL_MS, self._pump_db_results)
+        self.after(JOURNAL_FLUSH_SECONDS * 1000, self._journal_tick)
+        # Load the deck on a reader while the player logs in
+        self.db.submit(self.db.get_deck, deck_id)
         self.show_login()
 
+    @property
+    def deck(self):
+        return self.db.get_deck(self.deck_id)
+
     def toggle_fullscreen(self):
         self._fullscreen = not self._fullscreen
         self.attributes("-fullscreen", self._fullscreen)
@@ -1482,10 +3665,38 @@ class FlashcardApp(tk.Tk):
             self._fullscreen = False
             self.attributes("-fullscreen", False)
 
+    @staticmethod
+    def _poolable(FrameClass):
+        """Screens that can be reused: they have refresh() and don't opt out."""
+        return (getattr(FrameClass, "cacheable", True)
+                and callable(getattr(FrameClass, "refresh", None)))
+
     def show_frame(self, FrameClass, **kwargs):
-        if self._current_frame:
-            self._current_frame.destroy()
-        frame = FrameClass(self, **kwargs)
+        """
+        Show a screen.  Poolable screens are built once, hidden with
+        pack_forget when left, and brought back through refresh(**kwargs);
+        the rest are destroyed and rebuilt each time.
+        """
+        uid = self.user["id"] if self.user else None
+        if uid != self._screens_uid:
+            self.clear_screen_pool()
+            self._screens_uid = uid
+        old = self._current_frame
+        if old:
+            if self._screens.get(type(old)) is old:
+                old.pack_forget()
+            else:
+                old.destroy()
+        frame = self._screens.get(FrameClass)
+        if frame is not None and frame.winfo_exists():
+            self._screens.move_to_end(FrameClass)
+            frame.refresh(**kwargs)
+        else:
+            frame = FrameClass(self, **kwargs)
+            if self._poolable(FrameClass):
+                self._screens[FrameClass] = frame
+                while len(self._screens) > SCREEN_POOL_SIZE:
+                    self._screens.popitem(last=False)[1].destroy()
         frame.pack(fill="both", expand=True)
         self._current_frame = frame
         # Music: play during game modes, stop on menu/lobby screens
@@ -1504,6 +3715,13 @@ class FlashcardApp(tk.Tk):
         except Exception:
             pass
 
+    def clear_screen_pool(self):
+        """Drop every pooled screen (they show the old user's data)."""
+        while self._screens:
+            frame = self._screens.popitem()[1]
+            if frame is not self._current_frame:
+                frame.destroy()
+
     def show_login(self):           self.show_frame(LoginScreen)
     def show_menu(self):            self.show_frame(MainMenu)
     def show_normal_mode(self):     self.show_frame(NormalModeScreen)
@@ -1517,6 +3735,7 @@ class FlashcardApp(tk.Tk):
     def show_daily_quests(self):    self.show_frame(DailyQuestsScreen)
     def show_multiplayer(self):     self.show_frame(MultiplayerSetupScreen)
     def show_stats(self):           self.show_frame(StatsScreen)
+    def show_search(self):          self.show_frame(SearchScreen)
 
     def show_timewarp_mode(self):
         if self.user and self.user.get("timewarp_unlocked", 0):
@@ -1533,10 +3752,51 @@ class FlashcardApp(tk.Tk):
     def show_speedrun_mode(self, mode_type):
         self.show_frame(SpeedrunModeScreen, mode_type=mode_type)
 
+    def db_async(self, future, callback, errback=None):
+        """
+        Deliver a DB Future's result to callback on the Tk thread (via the
+        after() pump below), so screens never wait on SQLite themselves.
+        A failure goes to errback(exception), or is reported like any other
+        Tk callback error if there is none.
+        """
+        future.add_done_callback(
+            lambda f: self._db_results.put((f, callback, errback)))
+
+    def _pump_db_results(self):
+        while True:
+            try:
+                fut, callback, errback = self._db_results.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                exc = fut.exception()
+                if exc is None:
+                    callback(fut.result())
+                elif errback:
+                    errback(exc)
+                else:
+                    self.report_callback_exception(type(exc), exc, exc.__traceback__)
+            except tk.TclError:
+                pass   # the screen that asked was destroyed meanwhile
+            except Exception as e:
+                # Keep pumping: one failing callback mustn't strand the rest
+                self.report_callback_exception(type(e), e, e.__traceback__)
+        self.after(DB_POLL_MS, self._pump_db_results)
+
+    def _journal_tick(self):
+        """Flush answers left in the journal when the player goes idle."""
+        try:
+            self.db.flush_journal_if_due()
+        except sqlite3.Error:
+            pass   # retried on the next tick / at game end
+        self.after(JOURNAL_FLUSH_SECONDS * 1000, self._journal_tick)
+
     def on_close(self):
-        self.sound.stop_music()
-        self.db.close()
-        self.destroy()
+        self.sound.shutdown()
+        try:
+            self.db.close()   # flushes the answer journal first
+        finally:
+            self.destroy()
 
 
 # ══════════════════════════ LOGIN ════════════════════════════════════════════
@@ -1567,13 +3827,26 @@ class LoginScreen(tk.Frame):
         self._msg = tk.StringVar()
         tk.Label(panel, textvariable=self._msg, bg=C["panel"],
                  fg="#ff6b6b", font=FONT_SMALL).pack()
+        self._checking = False   # a user_exists lookup is in flight
 
     def _proceed(self):
         username = self._uvar.get().strip()
         if not username:
             self._msg.set("Please enter a username."); return
-        CodeDialog(self.master, username,
-                   new_user=not self.master.db.user_exists(username))
+        if self._checking: return
+        self._checking = True
+        db = self.master.db
+        self.master.db_async(db.submit(db.user_exists, username),
+                             lambda exists: self._ask_code(username, exists),
+                             self._check_failed)
+
+    def _ask_code(self, username, exists):
+        self._checking = False
+        CodeDialog(self.master, username, new_user=not exists)
+
+    def _check_failed(self, exc):
+        self._checking = False
+        self.master.report_callback_exception(type(exc), exc, exc.__traceback__)
 
 
 class CodeDialog(tk.Toplevel):
@@ -1583,6 +3856,7 @@ class CodeDialog(tk.Toplevel):
         self.title("Set Code" if new_user else "Enter Code")
         self.geometry("380x260"); self.resizable(False, False)
         self.configure(bg=C["panel"]); self.grab_set()
+        self._busy = False   # a sign-in is in flight
         self._build()
 
     def _build(self):
@@ -1607,30 +3881,73 @@ class CodeDialog(tk.Toplevel):
         code = self._cv.get().strip()
         if len(code) != 4 or not code.isdigit():
             self._err.config(text="Code must be exactly 4 digits."); return
+        if self._busy: return
+        self._busy = True
         db = self.master.db
+        self.master.db_async(db.submit(self._sign_in, db, code), self._signed_in,
+                             self._sign_in_failed)
+
+    def _sign_in(self, db, code):
+        """Create or check the user on the DB writer thread; None on a wrong code."""
         if self.new_user:
             db.create_user(self.username, code)
         elif not db.verify_code(self.username, code):
+            return None
+        return db.get_user(self.username)
+
+    def _signed_in(self, user):
+        self._busy = False
+        if user is None:
             self._err.config(text="Wrong code. Try again."); return
-        self.master.user = db.get_user(self.username)
+        self.master.user = user
         self.destroy()
         self.master.show_menu()
 
+    def _sign_in_failed(self, exc):
+        self._busy = False
+        self.master.report_callback_exception(type(exc), exc, exc.__traceback__)
+
 
 # ══════════════════════════ MAIN MENU ════════════════════════════════════════
 
 class MainMenu(tk.Frame):
     def __init__(self, master):
         super().__init__(master, bg=C["bg"])
-        # Refresh user data to get latest unlock status
-        self.master.user = self.master.db.get_user(self.master.user["username"])
         self._build()
+        self._reload_user()
 
-    def _build(self):
-        user = self.master.user
-        make_label(self, f"Welcome, {user['username']}  👋",
-                   font=FONT_TITLE, fg=C["cyan"]).pack(pady=(20, 2))
+    def refresh(self):
+        self._show_user(self.master.user)
+        self._reload_user()
 
+    def _reload_user(self):
+        """Re-read the user once pending writes landed, for the latest unlocks."""
+        db = self.master.db
+        self.master.db_async(db.submit(db.get_user, self.master.user["username"]),
+                             self._show_user)
+
+    def _show_user(self, user):
+        """Update the changing labels; rebuild only if an unlock changed."""
+        if user is None: return
+        self.master.user = user
+        status = self._status(user)
+        if status[0] != self._unlocks:
+            for w in self.winfo_children():
+                w.destroy()
+            self._build()
+            return
+        _, stats, sr_text, _, tw_text, _ = status
+        self._stats_lbl.config(text=stats)
+        self._sr_btn.config(text=sr_text)
+        self._tw_btn.config(text=tw_text)
+        self._fs_btn.config(text=self._fs_label())
+        self._deck_btn.config(text=self._deck_label())
+        self._sfx_btn.config(text=self._sfx_label())
+        self._music_btn.config(text=self._music_label())
+
+    @staticmethod
+    def _status(user):
+        """(unlock flags, stats line, speedrun text/colour, time warp text/colour)."""
         sr_unlocked = user.get("speedrun_unlocked", 0)
         tw_unlocked = user.get("timewarp_unlocked", 0)
         normal_q    = user.get("normal_questions_answered", 0)
@@ -1651,12 +3968,23 @@ class MainMenu(tk.Frame):
             stats = (f"Endless HS: {user['endless_highscore']}  |  "
                      f"🪙 {coins} coins  |  " + "  |  ".join(unlock_info))
 
-        make_label(self, stats, font=FONT_SMALL, fg=C["yellow"]).pack(pady=(0, 12))
-
         sr_text  = "⚡  Speedrun Mode" if sr_unlocked else f"⚡  Speedrun 🔒 ({needed_sr} Qs)"
         sr_color = C["orange"] if sr_unlocked else C["muted"]
         tw_text  = "🌀  Time Warp Mode" if tw_unlocked else f"🌀  Time Warp 🔒 ({needed_tw} Qs)"
         tw_color = C["teal"] if tw_unlocked else C["muted"]
+        return ((bool(sr_unlocked), bool(tw_unlocked)), stats,
+                sr_text, sr_color, tw_text, tw_color)
+
+    def _build(self):
+        user = self.master.user
+        make_label(self, f"Welcome, {user['username']}  👋",
+                   font=FONT_TITLE, fg=C["cyan"]).pack(pady=(20, 2))
+
+        (self._unlocks, stats,
+         sr_text, sr_color, tw_text, tw_color) = self._status(user)
+
+        self._stats_lbl = make_label(self, stats, font=FONT_SMALL, fg=C["yellow"])
+        self._stats_lbl.pack(pady=(0, 12))
 
         # Two-column button layout
         cols = tk.Frame(self, bg=C["bg"])
@@ -1684,8 +4012,13 @@ class MainMenu(tk.Frame):
         ]
 
         for text, color, cmd in left_btns:
-            make_button(left, text, cmd, bg=color,
-                        font=FONT_MED, pad=(24, 10), width=24).pack(pady=4)
+            btn = make_button(left, text, cmd, bg=color,
+                              font=FONT_MED, pad=(24, 10), width=24)
+            btn.pack(pady=4)
+            if cmd == self.master.show_speedrun_menu:
+                self._sr_btn = btn
+            elif cmd == self.master.show_timewarp_mode:
+                self._tw_btn = btn
 
         for text, color, cmd, fg in right_btns:
             make_button(right, text, cmd, bg=color, fg=fg,
@@ -1696,6 +4029,11 @@ class MainMenu(tk.Frame):
         self._fs_btn = make_button(fs_row, self._fs_label(), self._toggle_fs,
                                    bg="#2a2a3e", font=FONT_SMALL, pad=(16, 7))
         self._fs_btn.pack(side="left", padx=4)
+        self._deck_btn = make_button(fs_row, self._deck_label(), self._toggle_deck,
+                                     bg="#2a2a3e", font=FONT_SMALL, pad=(16, 7))
+        self._deck_btn.pack(side="left", padx=4)
+        make_button(fs_row, "🔍  Search Cards", self.master.show_search,
+                    bg="#2a2a3e", font=FONT_SMALL, pad=(16, 7)).pack(side="left", padx=4)
 
         # ── Audio controls ────────────────────────────────────────────────────
         audio_row = tk.Frame(self, bg=C["bg"])
@@ -1722,6 +4060,13 @@ class MainMenu(tk.Frame):
         self.master.toggle_fullscreen()
         self._fs_btn.config(text=self._fs_label())
 
+    def _deck_label(self):
+        return "🧠 Cards: Spaced" if self.master.deck_mode == "spaced" else "🔀 Cards: Shuffle"
+
+    def _toggle_deck(self):
+        self.master.deck_mode = "shuffle" if self.master.deck_mode == "spaced" else "spaced"
+        self._deck_btn.config(text=self._deck_label())
+
     def _sfx_label(self):
         return "🔊 SFX: ON" if self.master.sound._sfx_enabled else "🔇 SFX: OFF"
 
@@ -1837,9 +4182,17 @@ class PowerUpHUD(tk.Frame):
         super().__init__(parent, bg=bg)
         self.user = user
         self.db   = db
+        self.app  = self.winfo_toplevel()
+        self.inv  = PowerUpInventory()   # all zero until the real one loads
         self._active = {}   # pup_id -> bool (whether active this turn)
         self._callbacks = {}
         self._build()
+        self.app.db_async(db.submit(db.get_powerups, user["id"]), self._loaded)
+
+    def _loaded(self, inv):
+        self.inv = inv
+        for pup_id, *_ in POWERUPS:
+            self._refresh(pup_id)
 
     def _build(self):
         make_label(self, "Power-Ups:", font=("Segoe UI", 10, "bold"),
@@ -1847,60 +4200,64 @@ class PowerUpHUD(tk.Frame):
         self._btns = {}
         self._qty_labels = {}
         for pup_id, name, desc, cost in POWERUPS:
-            qty = self.user.get(f"powerup_{pup_id}", 0)
             f = tk.Frame(self, bg=self["bg"])
             f.pack(side="left", padx=4)
             icon = name.split()[0]
             btn = tk.Label(f, text=icon, font=("Segoe UI", 14),
-                           bg=C["card"] if qty > 0 else C["panel"],
-                           fg=C["white"] if qty > 0 else C["muted"],
-                           padx=6, pady=2, relief="flat",
-                           cursor="hand2" if qty > 0 else "arrow")
+                           padx=6, pady=2, relief="flat")
             btn.pack()
-            ql = tk.Label(f, text=f"×{qty}", font=("Segoe UI", 8),
-                          bg=self["bg"], fg=C["yellow"] if qty > 0 else C["muted"])
+            ql = tk.Label(f, font=("Segoe UI", 8), bg=self["bg"])
             ql.pack()
-            if qty > 0:
-                pid = pup_id
-                btn.bind("<ButtonRelease-1>", lambda e, p=pid: self._use(p))
+            btn.bind("<ButtonRelease-1>", lambda e, p=pup_id: self._use(p))
             self._btns[pup_id] = btn
             self._qty_labels[pup_id] = ql
+            self._refresh(pup_id)
 
     def register_callback(self, pup_id, cb):
         self._callbacks[pup_id] = cb
 
     def _use(self, pup_id):
-        qty = self.user.get(f"powerup_{pup_id}", 0)
-        if qty <= 0: return
-        if self.db.use_powerup(self.user["id"], pup_id):
-            self.user[f"powerup_{pup_id}"] = qty - 1
-            self._refresh(pup_id)
-            if pup_id in self._callbacks:
-                self._callbacks[pup_id]()
+        if self.inv[pup_id] <= 0: return
+        self.app.db_async(self.db.submit(self.db.use_powerup, self.user["id"], pup_id),
+                          lambda used: self._used(pup_id, used))
+
+    def _used(self, pup_id, used):
+        if not used: return
+        self._refresh(pup_id)
+        if pup_id in self._callbacks:
+            self._callbacks[pup_id]()
 
     def _refresh(self, pup_id):
-        qty = self.user.get(f"powerup_{pup_id}", 0)
+        qty = self.inv[pup_id]
         btn = self._btns[pup_id]
         ql  = self._qty_labels[pup_id]
-        ql.config(text=f"×{qty}")
         if qty > 0:
+            ql.config(text=f"×{qty}", fg=C["yellow"])
             btn.config(bg=C["card"], fg=C["white"], cursor="hand2")
         else:
+            ql.config(text=f"×{qty}", fg=C["muted"])
             btn.config(bg=C["panel"], fg=C["muted"], cursor="arrow")
-            btn.unbind("<ButtonRelease-1>")
 
 
 # ══════════════════════════ BASE GAME SCREEN ══════════════════════════════════
 # ══════════════════════════ BASE GAME SCREEN ══════════════════════════════════
 
 class BaseGameScreen(tk.Frame):
-    def __init__(self, master, mode):
+    cacheable = False   # a game is always started fresh by show_frame
+
+    def __init__(self, master, mode, selection=None, terms=None):
         super().__init__(master, bg=C["bg"])
         self.mode             = mode
         self.score            = 0
         self.questions        = 0
         self.correct_streak   = 0
-        self._deck            = list(FLASHCARDS.keys())
+        # "shuffle" walks a shuffled deck; "spaced" asks the DeckScheduler
+        self.selection        = selection or master.deck_mode
+        self.deck             = master.deck
+        # terms= drills a subset (e.g. search results), always shuffled
+        self._scheduler       = (master.db.get_scheduler(master.user["id"], self.deck.id)
+                                 if self.selection == "spaced" and not terms else None)
+        self._deck            = list(terms or self.deck.terms)
         random.shuffle(self._deck)
         self._deck_idx        = 0
         self._revealed        = False
@@ -1940,9 +4297,12 @@ class BaseGameScreen(tk.Frame):
             self._pb_canvas = tk.Canvas(self, height=22, bg=C["bg"],
                                         highlightthickness=0)
             self._pb_canvas.pack(fill="x", padx=20, pady=(0, 10))
-            self._pb_value  = 0.0
-            self._pb_target = 0.0
-            self._pb_color  = C["green"]
+            self._pb_value   = 0.0
+            self._pb_target  = 0.0
+            self._pb_filling = False
+            self._pb_shaking = None   # AnimationClock token of the running shake
+            self._pb_restore = None   # after() id of the return to green
+            self._pb_color   = C["green"]
             self._pb_canvas.bind("<Configure>", lambda e: self._pb_draw(self._pb_value))
 
         self.canvas = tk.Canvas(self, bg=C["bg"], highlightthickness=0,
@@ -2024,7 +4384,7 @@ class BaseGameScreen(tk.Frame):
 
     def _activate_peek(self):
         if not self._revealed:
-            ans = FLASHCARDS.get(self._current_term, "")
+            ans = self.deck.definition(self._current_term)
             first = ans[0] if ans else "?"
             self.canvas.itemconfig(self.ans_text, text=f"Starts with: {first}...")
         self._status_var.set("👁 Peek used!")
@@ -2050,11 +4410,14 @@ class BaseGameScreen(tk.Frame):
         self.correct_btn.pack_forget()
         self.wrong_btn.pack_forget()
         self._status_var.set("")
-        if self._deck_idx >= len(self._deck):
-            random.shuffle(self._deck)
-            self._deck_idx = 0
-        term = self._deck[self._deck_idx]
-        self._deck_idx += 1
+        if self._scheduler is not None:
+            term = self._scheduler.next()
+        else:
+            if self._deck_idx >= len(self._deck):
+                random.shuffle(self._deck)
+                self._deck_idx = 0
+            term = self._deck[self._deck_idx]
+            self._deck_idx += 1
         self._current_term = term
         self._session_cards.add(term)
         self.canvas.itemconfig(self.term_text, text=term)
@@ -2064,7 +4427,7 @@ class BaseGameScreen(tk.Frame):
         if self._revealed: return
         self._revealed = self._reveal_used = True
         self._no_reveal_run = False
-        self.canvas.itemconfig(self.ans_text, text=FLASHCARDS[self._current_term])
+        self.canvas.itemconfig(self.ans_text, text=self.deck.definition(self._current_term))
         self.master.sound.play("reveal")
         self.reveal_btn.pack_forget()
         self.correct_btn.pack(side="left", padx=10)
@@ -2078,14 +4441,14 @@ class BaseGameScreen(tk.Frame):
         # Tortoise achievement: 120+ seconds on one card
         card_time = time.time() - self._card_start_time
         if card_time >= 120:
-            self.master.db.award_badge(self.master.user["id"], "Tortoise")
+            self.master.db.submit(self.master.db.award_badge, self.master.user["id"], "Tortoise")
 
         self.questions += 1
         self.q_lbl.config(text=f"Questions answered: {self.questions}")
         db  = self.master.db
         uid = self.master.user["id"]
         db.update_streak(uid, correct)
-        db.record_card_result(uid, self._current_term, correct)
+        db.record_card_result(uid, self._current_term, correct, self.deck.id)
 
         # Hare: 3 cards in under 10 seconds total (tracked via session)
         if not hasattr(self, "_hare_times"):
@@ -2094,7 +4457,7 @@ class BaseGameScreen(tk.Frame):
         if len(self._hare_times) >= 3:
             span = self._hare_times[-1] - self._hare_times[-3]
             if span < 10:
-                db.award_badge(uid, "Hare")
+                db.submit(db.award_badge, uid, "Hare")
 
         if correct:
             pts = 2 if self._double_active else 1
@@ -2104,12 +4467,10 @@ class BaseGameScreen(tk.Frame):
             self._float(f"+{pts}", C["green"])
             self.master.sound.play("correct")
             if self.correct_streak >= 20:
-                db.award_badge(uid, "CPU Overclocked")
+                db.submit(db.award_badge, uid, "CPU Overclocked")
             # Earn 1 coin per correct answer
             db.add_coins(uid, 1)
-            self.master.user["coins"] = self.master.user.get("coins", 0) + 1
             self.coin_lbl.config(text=f"🪙 {self.master.user['coins']}")
-            db.check_coin_achievements(uid)
         else:
             if self._shield_active:
                 self._shield_active = False
@@ -2129,13 +4490,13 @@ class BaseGameScreen(tk.Frame):
             self._was_at_zero = True
 
         if not self._reveal_used and self.questions == 10:
-            db.award_badge(uid, "Human Cache")
+            db.submit(db.award_badge, uid, "Human Cache")
         if self.questions >= 5 and (time.time() - self._start_time) < 30:
-            db.award_badge(uid, "Lightning Brain")
+            db.submit(db.award_badge, uid, "Lightning Brain")
 
         # Puzzle Master: 30 unique cards
         if len(self._session_cards) >= 30:
-            db.award_badge(uid, "Puzzle Master")
+            db.submit(db.award_badge, uid, "Puzzle Master")
 
         # Check win condition before next card
         self._check_win()
@@ -2163,16 +4524,20 @@ class BaseGameScreen(tk.Frame):
             self._pb_target = max(0.0, float(self.score))
             if wrong:
                 self._pb_color = C["accent"]
-                self._pb_animate_fill()
-                self._pb_shake(6, 0)
-                self.after(2000, self._pb_restore_green)
+                self._pb_start_fill()
+                # Another miss mid-shake restarts the running shake
+                self._shake_t = 0.0
+                if self._pb_shaking is None:
+                    self._pb_shaking = animate(self._pb_canvas, self._pb_shake)
+                if self._pb_restore is not None:
+                    self.after_cancel(self._pb_restore)
+                self._pb_restore = self.after(2000, self._pb_restore_green)
             else:
                 self._pb_color = C["green"]
-                self._pb_animate_fill()
+                self._pb_start_fill()
 
     def _back_to_menu(self):
-        self.master.user = self.master.db.get_user(self.master.user["username"])
-        self.master.show_menu()
+        self.master.show_menu()   # MainMenu re-reads the user itself
 
     # ── Progress bar ──────────────────────────────────────────────────────────
 
@@ -2194,72 +4559,88 @@ class BaseGameScreen(tk.Frame):
             x = int((i/11)*W)+offset
             c.create_line(x, 3, x, H-3, fill=C["bg"], width=2)
 
-    def _pb_animate_fill(self):
+    def _pb_start_fill(self):
+        # One fill animation chases _pb_target, however often it moves
+        if not self._pb_filling:
+            self._pb_filling = True
+            animate(self._pb_canvas, self._pb_animate_fill)
+
+    def _pb_animate_fill(self, dt):
         diff = self._pb_target - self._pb_value
         if abs(diff) < 0.01:
-            self._pb_value = self._pb_target
+            self._pb_value   = self._pb_target
+            self._pb_filling = False
             self._pb_draw(self._pb_value)
-            return
-        self._pb_value += diff * 0.18
+            return False
+        # Closes 18% of the gap per 16 ms, whatever the actual frame time
+        self._pb_value += diff * (1 - 0.82 ** (dt / 0.016))
         self._pb_draw(self._pb_value)
-        self.after(16, self._pb_animate_fill)
 
-    def _pb_shake(self, remaining, direction):
-        if remaining <= 0:
+    def _pb_shake(self, dt):
+        self._shake_t += dt
+        step = int(self._shake_t / 0.04)   # six 40 ms jolts
+        if step >= 6:
+            self._pb_shaking = None
             self._pb_draw(self._pb_value)
-            return
-        self._pb_draw(self._pb_value, 7*(1 if direction%2==0 else -1))
-        self.after(40, lambda: self._pb_shake(remaining-1, direction+1))
+            return False
+        self._pb_draw(self._pb_value, 7*(1 if step%2==0 else -1))
 
     def _pb_restore_green(self):
+        self._pb_restore = None
         self._pb_color = C["green"]
         self._pb_draw(self._pb_value)
 
     # ── Common end-of-game helpers ────────────────────────────────────────────
 
-    def _common_end_checks(self, db, uid, new_badges):
+    def _save_failed(self, show, fallback):
+        """errback for the end-of-game save: report it, then show(fallback) anyway."""
+        def errback(exc):
+            self.master.report_callback_exception(type(exc), exc, exc.__traceback__)
+            show(fallback)
+        return errback
+
+    def _common_end_checks(self, db, uid, candidates):
+        """Add the badges every mode checks, award them all, return the new ones."""
         now   = datetime.now()
         h     = now.hour
         dow   = now.weekday()   # 1 = Tuesday
         # Night Coder (midnight-5am)
-        if h < 5 and db.award_badge(uid, "Night Coder"):
-            new_badges.append("Night Coder")
+        if h < 5:
+            candidates.append("Night Coder")
         # Owl (3-4am)
-        if h == 3 and db.award_badge(uid, "Owl"):
-            new_badges.append("Owl")
+        if h == 3:
+            candidates.append("Owl")
         # Nostalgia (Tuesday)
-        if dow == 1 and db.award_badge(uid, "Nostalgia"):
-            new_badges.append("Nostalgia")
+        if dow == 1:
+            candidates.append("Nostalgia")
         # Wizard: completed mode without ever using reveal
-        if self._no_reveal_run and db.award_badge(uid, "Wizard"):
-            new_badges.append("Wizard")
+        if self._no_reveal_run:
+            candidates.append("Wizard")
         # Joker: won after being at 0
-        if self._was_at_zero and db.award_badge(uid, "Joker"):
-            new_badges.append("Joker")
+        if self._was_at_zero:
+            candidates.append("Joker")
         # Balance: exactly 21 points
-        if self.score == 21 and db.award_badge(uid, "Balance"):
-            new_badges.append("Balance")
+        if self.score == 21:
+            candidates.append("Balance")
         # Omniscient: answered all unique cards correctly
-        if self._correct_cards >= set(FLASHCARDS.keys()):
-            if db.award_badge(uid, "Omniscient"):
-                new_badges.append("Omniscient")
+        if self._correct_cards >= self.deck.cards.keys():
+            candidates.append("Omniscient")
         # Consecutive games
         consec = (self.master.user.get("consecutive_games", 0) or 0) + 1
         db.update_consecutive_games(uid, consec)
-        if consec >= 5 and db.award_badge(uid, "Addicted"):
-            new_badges.append("Addicted")
+        if consec >= 5:
+            candidates.append("Addicted")
         # Triple Threat (session)
         session_modes = self.master._session_modes_won
         if len(session_modes) >= 3:
-            if db.award_badge(uid, "Triple Threat"):
-                new_badges.append("Triple Threat")
-        return new_badges
+            candidates.append("Triple Threat")
+        return db.award_badges(uid, candidates)
 
 # ══════════════════════════ NORMAL MODE ══════════════════════════════════════
 
 class NormalModeScreen(BaseGameScreen):
-    def __init__(self, master):
-        super().__init__(master, "normal")
+    def __init__(self, master, terms=None):
+        super().__init__(master, "normal", terms=terms)
 
     def _on_wrong(self):
         self.score = max(0, self.score - 2)
@@ -2287,6 +4668,14 @@ class NormalModeScreen(BaseGameScreen):
         
         db = self.master.db
         uid = self.master.user["id"]
+        db.flush_journal()
+        # Record mode won for Triple Threat
+        self.master._session_modes_won.add("normal")
+        self.master.db_async(db.submit(self._save_result, db, uid), self._show_result,
+                             self._save_failed(self._show_result, ([], self.master.user)))
+
+    def _save_result(self, db, uid):
+        """DB side of the game end; runs on the DB writer thread."""
         acc = ((self.questions - self._mistakes) / max(1, self.questions)) * 100
 
         db.increment_total_answered(uid, self.questions)
@@ -2301,8 +4690,6 @@ class NormalModeScreen(BaseGameScreen):
         # Check and unlock timewarp
         db.check_and_unlock_timewarp(uid)
 
-        # Record mode won for Triple Threat
-        self.master._session_modes_won.add("normal")
         db.record_mode_won(uid, "normal")
 
         # Daily quest: all_modes
@@ -2314,26 +4701,21 @@ class NormalModeScreen(BaseGameScreen):
         if self.questions <= 12:
             db.update_quest_progress(uid, "normal_12", 1, 1)
 
-        new_badges = []
-        if db.award_badge(uid, "First Time"):        
-            new_badges.append("First Time")
-        if self.questions < 15 and db.award_badge(uid, "Fast Learner"):
-            new_badges.append("Fast Learner")
-        if self._mistakes == 0 and db.award_badge(uid, "Flawless"):
-            new_badges.append("Flawless")
-        if self._mistakes == 0 and db.award_badge(uid, "Bullseye"):
-            new_badges.append("Bullseye")
-        if self._no_reveal_run and db.award_badge(uid, "Memory Palace"):
-            new_badges.append("Memory Palace")
-        if len(self._session_cards) >= len(FLASHCARDS):
-            if db.award_badge(uid, "Database Brain"):
-                new_badges.append("Database Brain")
-
-        new_badges = self._common_end_checks(db, uid, new_badges)
-        
-        # Update user data
-        self.master.user = db.get_user(self.master.user["username"])
-        
+        candidates = ["First Time"]
+        if self.questions < 15:
+            candidates.append("Fast Learner")
+        if self._mistakes == 0:
+            candidates += ["Flawless", "Bullseye"]
+        if self._no_reveal_run:
+            candidates.append("Memory Palace")
+        if len(self._session_cards) >= len(self.deck):
+            candidates.append("Database Brain")
+
+        new_badges = self._common_end_checks(db, uid, candidates)
+        return new_badges, db.get_user_by_id(uid)
+
+    def _show_result(self, result):
+        new_badges, self.master.user = result
         # Show victory screen
         queue_popups(self.master, new_badges, delay=400)
         self.after(200, lambda: self.master.show_frame(
@@ -2353,6 +4735,12 @@ class EndlessModeScreen(BaseGameScreen):
         self._ended = True
         db  = self.master.db
         uid = self.master.user["id"]
+        db.flush_journal()
+        self.master.db_async(db.submit(self._save_wrong, db, uid), self._show_wrong,
+                             self._save_failed(self._show_wrong, self.master.user))
+
+    def _save_wrong(self, db, uid):
+        """DB side of a lost run; runs on the DB writer thread."""
         acc = (self.questions - self._mistakes) / max(1, self.questions) * 100
 
         db.increment_total_answered(uid, self.questions)
@@ -2360,14 +4748,16 @@ class EndlessModeScreen(BaseGameScreen):
         db.add_playtime(uid, time.time() - self._start_time)
         db.save_game_history(uid, "endless_wrong", self.score, self.questions, acc)
         db.check_progress_achievements(uid)
-        self._award_endless_badges(db, uid, [])
+        db.award_badges(uid, self._endless_badges())
 
         today_modes = db.record_mode_played_today(uid, "endless")
         if len(today_modes) >= 3:
             db.update_quest_progress(uid, "all_modes", 3, 3)
+        return db.get_user_by_id(uid)
 
+    def _show_wrong(self, user):
         prev_hs = self.master.user["endless_highscore"]
-        self.master.user = db.get_user(self.master.user["username"])
+        self.master.user = user
         self.after(120, lambda: self.master.show_frame(
             EndlessResultScreen, score=self.score, prev_hs=prev_hs,
             new_hs=False, cashout=False))
@@ -2378,6 +4768,15 @@ class EndlessModeScreen(BaseGameScreen):
         self.master.sound.play("cashout")
         db  = self.master.db
         uid = self.master.user["id"]
+        db.flush_journal()
+        self.master._session_modes_won.add("endless")
+        user = self.master.user
+        self.master.db_async(db.submit(self._save_cashout, db, uid), self._show_cashout,
+                             self._save_failed(self._show_cashout,
+                                               ([], user["endless_highscore"], False, user)))
+
+    def _save_cashout(self, db, uid):
+        """DB side of a cash out; runs on the DB writer thread."""
         acc = (self.questions - self._mistakes) / max(1, self.questions) * 100
 
         db.increment_total_answered(uid, self.questions)
@@ -2386,14 +4785,13 @@ class EndlessModeScreen(BaseGameScreen):
         db.save_game_history(uid, "endless_cashout", self.score, self.questions, acc)
         db.check_progress_achievements(uid)
 
-        new_badges = []
-        new_badges = self._award_endless_badges(db, uid, new_badges)
+        candidates = self._endless_badges()
 
         # Risk achievements
-        if self.score == 1   and db.award_badge(uid, "Gambler"):     new_badges.append("Gambler")
-        if self.score >= 20  and db.award_badge(uid, "Risk Taker"):  new_badges.append("Risk Taker")
-        if self.score >= 100 and db.award_badge(uid, "Diamond Hands"):new_badges.append("Diamond Hands")
-        if is_prime(self.score) and db.award_badge(uid, "High Roller"):new_badges.append("High Roller")
+        if self.score == 1:       candidates.append("Gambler")
+        if self.score >= 20:      candidates.append("Risk Taker")
+        if self.score >= 100:     candidates.append("Diamond Hands")
+        if is_prime(self.score):  candidates.append("High Roller")
 
         today_modes = db.record_mode_played_today(uid, "endless")
         if len(today_modes) >= 3:
@@ -2403,32 +4801,30 @@ class EndlessModeScreen(BaseGameScreen):
         if self.score >= 50:
             db.update_quest_progress(uid, "endless_50", self.score, 50)
 
-        self.master._session_modes_won.add("endless")
         db.record_mode_won(uid, "endless")
 
-        new_badges = self._common_end_checks(db, uid, new_badges)
+        new_badges = self._common_end_checks(db, uid, candidates)
 
         prev_hs = self.master.user["endless_highscore"]
         new_hs  = self.score > prev_hs
         if new_hs:
             db.update_endless_highscore(uid, self.score)
-        self.master.user = db.get_user(self.master.user["username"])
+        return new_badges, prev_hs, new_hs, db.get_user_by_id(uid)
 
+    def _show_cashout(self, result):
+        new_badges, prev_hs, new_hs, self.master.user = result
         queue_popups(self.master, new_badges)
         self.after(120, lambda: self.master.show_frame(
             EndlessResultScreen, score=self.score, prev_hs=prev_hs,
             new_hs=new_hs, cashout=True))
 
-    def _award_endless_badges(self, db, uid, new_badges):
+    def _endless_badges(self):
         pairs = [
             (10, "Endless 10"), (15, "Survivor"), (25, "Endless 25"),
             (30, "Untouchable"), (32, "Binary Master"), (50, "Endless 50"),
             (75, "Legend"), (100, "Infinity"),
         ]
-        for threshold, badge in pairs:
-            if self.score >= threshold and db.award_badge(uid, badge):
-                new_badges.append(badge)
-        return new_badges
+        return [badge for threshold, badge in pairs if self.score >= threshold]
 
 
 # ══════════════════════════ SPEEDRUN MODE ════════════════════════════════════
@@ -2501,9 +4897,18 @@ class SpeedrunModeScreen(BaseGameScreen):
             self.time_left = 10
 
     def _end_speedrun(self):
+        if self._ended: return
+        self._ended = True
         self.timer_running = False
         db  = self.master.db
         uid = self.master.user["id"]
+        db.flush_journal()
+        self.master._session_modes_won.add("speedrun")
+        self.master.db_async(db.submit(self._save_result, db, uid), self._show_result,
+                             self._save_failed(self._show_result, ([], self.master.user)))
+
+    def _save_result(self, db, uid):
+        """DB side of the run end; runs on the DB writer thread."""
         acc = (self.questions - self._mistakes) / max(1, self.questions) * 100
 
         db.increment_total_answered(uid, self.questions)
@@ -2518,26 +4923,28 @@ class SpeedrunModeScreen(BaseGameScreen):
         if len(today_modes) >= 3:
             db.update_quest_progress(uid, "all_modes", 3, 3)
 
-        self.master._session_modes_won.add("speedrun")
         db.record_mode_won(uid, "speedrun")
 
-        new_badges = []
+        candidates = []
         if   self.speedrun_type == "60s"     and self.score     >= 20:  nb = "Blitz Master"
         elif self.speedrun_type == "60s"     and self.questions >= 50:  nb = "Lightning Rod"
         elif self.speedrun_type == "marathon" and self.score    >= 100:  nb = "Marathon Runner"
         elif self.speedrun_type == "marathon" and self.score    >= 150:  nb = "Ultramarathon"
         elif self.speedrun_type == "reflex"   and self.questions >= 30:  nb = "Reflex God"
         else: nb = None
-        if nb and db.award_badge(uid, nb): new_badges.append(nb)
+        if nb: candidates.append(nb)
 
         # Sharpshooter: reflex 20+ answers 100% accuracy
         if (self.speedrun_type == "reflex" and self.questions >= 20
-                and self._reflex_wrong == 0 and db.award_badge(uid, "Sharpshooter")):
-            new_badges.append("Sharpshooter")
+                and self._reflex_wrong == 0):
+            candidates.append("Sharpshooter")
+
+        new_badges = self._common_end_checks(db, uid, candidates)
+        return new_badges, db.get_user_by_id(uid)
 
-        new_badges = self._common_end_checks(db, uid, new_badges)
+    def _show_result(self, result):
+        new_badges, self.master.user = result
         queue_popups(self.master, new_badges)
-        self.master.user = db.get_user(self.master.user["username"])
         self.after(100, lambda: self.master.show_frame(
             SpeedrunResultScreen, score=self.score,
             mode_type=self.speedrun_type, questions=self.questions))
@@ -2616,9 +5023,17 @@ class TimeWarpModeScreen(BaseGameScreen):
     def _check_win(self): pass  # no win condition, survive as long as possible
 
     def _end_timewarp(self):
+        if self._ended: return
+        self._ended = True
         self.timer_running = False
         db  = self.master.db
         uid = self.master.user["id"]
+        db.flush_journal()
+        self.master.db_async(db.submit(self._save_result, db, uid), self._show_result,
+                             self._save_failed(self._show_result, ([], self.master.user)))
+
+    def _save_result(self, db, uid):
+        """DB side of the run end; runs on the DB writer thread."""
         acc = (self.questions - self._mistakes) / max(1, self.questions) * 100
 
         db.increment_total_answered(uid, self.questions)
@@ -2628,15 +5043,18 @@ class TimeWarpModeScreen(BaseGameScreen):
         db.update_timewarp_highscore(uid, self.score)
         db.check_progress_achievements(uid)
 
-        new_badges = []
-        if self._elapsed_total >= 180 and db.award_badge(uid, "Time Bender"):
-            new_badges.append("Time Bender")
-        if self.score >= 30 and db.award_badge(uid, "Chrono Master"):
-            new_badges.append("Chrono Master")
+        candidates = []
+        if self._elapsed_total >= 180:
+            candidates.append("Time Bender")
+        if self.score >= 30:
+            candidates.append("Chrono Master")
+
+        new_badges = self._common_end_checks(db, uid, candidates)
+        return new_badges, db.get_user_by_id(uid)
 
-        new_badges = self._common_end_checks(db, uid, new_badges)
+    def _show_result(self, result):
+        new_badges, self.master.user = result
         queue_popups(self.master, new_badges)
-        self.master.user = db.get_user(self.master.user["username"])
         self.after(100, lambda: self.master.show_frame(
             TimeWarpResultScreen, score=self.score,
             elapsed=self._elapsed_total, questions=self.questions))
@@ -2699,6 +5117,8 @@ class MultiplayerSetupScreen(tk.Frame):
 
 
 class MultiplayerDuelScreen(tk.Frame):
+    cacheable = False
+
     def __init__(self, master, p1_name, p2_name, cards_per_player):
         super().__init__(master, bg=C["bg"])
         self.p1_name         = p1_name
@@ -2709,7 +5129,10 @@ class MultiplayerDuelScreen(tk.Frame):
         self.p1_cards        = 0
         self.p2_cards        = 0
         self.current_player  = 1
-        self._deck           = list(FLASHCARDS.keys())
+        # Always shuffled: two players share the deck, so one user's
+        # spaced-repetition schedule doesn't apply
+        self.deck            = master.deck
+        self._deck           = list(self.deck.terms)
         random.shuffle(self._deck)
         self._deck_idx       = 0
         self._revealed       = False
@@ -2839,7 +5262,7 @@ class MultiplayerDuelScreen(tk.Frame):
     def _reveal(self):
         if self._revealed: return
         self._revealed = True
-        self.canvas.itemconfig(self.ans_text, text=FLASHCARDS[self._current_term])
+        self.canvas.itemconfig(self.ans_text, text=self.deck.definition(self._current_term))
         self.reveal_btn.pack_forget()
         self.correct_btn.pack(side="left", padx=10)
         self.wrong_btn.pack(side="left", padx=10)
@@ -2873,17 +5296,24 @@ class MultiplayerDuelScreen(tk.Frame):
         p1_won = self.p1_score > self.p2_score
         margin = abs(self.p1_score - self.p2_score)
 
-        if p1_won or self.p1_score == self.p2_score:
-            if p1_won and db.award_badge(uid, "Duelist"):
-                queue_popups(self.master, ["Duelist"])
-            if p1_won and margin >= 5 and db.award_badge(uid, "Dominant"):
-                queue_popups(self.master, ["Dominant"], delay=800)
+        if p1_won:
+            badges = ["Duelist", "Dominant"] if margin >= 5 else ["Duelist"]
+            self.master.db_async(db.submit(db.award_badges, uid, badges),
+                                 functools.partial(self._popup_badges, self.master))
 
         self.master.show_frame(
             DuelResultScreen,
             p1_name=self.p1_name, p2_name=self.p2_name,
             p1_score=self.p1_score, p2_score=self.p2_score)
 
+    @staticmethod
+    def _popup_badges(master, won):
+        # Static: the duel screen is gone by the time the award lands
+        if "Duelist" in won:
+            queue_popups(master, ["Duelist"])
+        if "Dominant" in won:
+            queue_popups(master, ["Dominant"], delay=800)
+
     def _back(self):
         self.master.show_menu()
 
@@ -2936,23 +5366,33 @@ class DuelResultScreen(tk.Frame):
 # ══════════════════════════ DAILY CHALLENGE ══════════════════════════════════
 
 class DailyChallengeScreen(tk.Frame):
+    cacheable = False
+
     def __init__(self, master):
         super().__init__(master, bg=C["bg"])
-        self._cards       = get_daily_cards()
+        self.deck         = master.deck
         self._idx         = 0
         self._score       = 0
         self._revealed    = False
         self._done        = False
-        self._already     = master.db.has_completed_daily(master.user["id"])
+        today = date.today().strftime("%A, %d %B %Y")
+        make_label(self, f"📅  Daily Challenge — {today}",
+                   font=FONT_TITLE, fg=C["yellow"]).pack(pady=(20, 4))
+        db = master.db
+        master.db_async(db.submit(self._load, db, master.user["id"]), self._loaded)
+
+    def _load(self, db, uid):
+        """Today's cards, whether uid has played them, and the calendar's dates."""
+        return (db.get_daily_cards(self.deck.id), db.has_completed_daily(uid),
+                db.get_completed_dates(uid))
+
+    def _loaded(self, result):
+        self._cards, self._already, self._completed = result
         self._build()
         if not self._already:
             self._show_card()
 
     def _build(self):
-        today = date.today().strftime("%A, %d %B %Y")
-        make_label(self, f"📅  Daily Challenge — {today}",
-                   font=FONT_TITLE, fg=C["yellow"]).pack(pady=(20, 4))
-
         if self._already:
             make_label(self, "✅ You've already completed today's challenge!",
                        font=FONT_LARGE, fg=C["green"]).pack(pady=20)
@@ -3013,7 +5453,7 @@ class DailyChallengeScreen(tk.Frame):
     def _reveal(self):
         if self._revealed: return
         self._revealed = True
-        self.canvas.itemconfig(self.ans_text, text=FLASHCARDS[self._current_term])
+        self.canvas.itemconfig(self.ans_text, text=self.deck.definition(self._current_term))
         self.reveal_btn.pack_forget()
         self.correct_btn.pack(side="left", padx=10)
         self.wrong_btn.pack(side="left", padx=10)
@@ -3025,14 +5465,23 @@ class DailyChallengeScreen(tk.Frame):
         self.after(200, self._show_card)
 
     def _finish(self):
-        db  = self.master.db
-        uid = self.master.user["id"]
+        if self._done: return
+        self._done = True
+        db = self.master.db
+        self.master.db_async(db.submit(self._save_result, db, self.master.user["id"]),
+                             self._show_result)
+
+    def _save_result(self, db, uid):
+        """DB side of finishing; runs on the DB writer thread."""
         db.complete_daily_challenge(uid, self._score)
         # Reward: bonus coins
-        bonus = self._score * 3
-        db.add_coins(uid, bonus)
+        db.add_coins(uid, self._score * 3)
         db.award_badge(uid, "Daily Champion")
-        self.master.user = db.get_user(self.master.user["username"])
+        return db.get_user_by_id(uid), db.get_completed_dates(uid)
+
+    def _show_result(self, result):
+        self.master.user, self._completed = result
+        bonus = self._score * 3
 
         # Clear widgets and show result
         for w in self.winfo_children(): w.destroy()
@@ -3050,9 +5499,7 @@ class DailyChallengeScreen(tk.Frame):
                     bg=C["purple"], pad=(16, 8)).pack(side="left", padx=8)
 
     def _show_calendar(self):
-        db  = self.master.db
-        uid = self.master.user["id"]
-        completed = db.get_completed_dates(uid)
+        completed = self._completed
 
         make_label(self, "📆  Challenge Calendar (last 30 days)",
                    font=FONT_MED, fg=C["cyan"]).pack(pady=(16, 6))
@@ -3157,10 +5604,20 @@ class PowerUpShopScreen(tk.Frame):
         self._coin_var = tk.StringVar(value=f"🪙 Your Coins: {self.master.user.get('coins',0)}")
         make_label(self, "", font=FONT_LARGE, fg=C["yellow"],
                    textvariable=self._coin_var).pack(pady=(0, 16))
+        self._rows = tk.Frame(self, bg=C["bg"])
+        self._rows.pack(fill="x")
+
+        make_button(self, "← Back to Menu", self.master.show_menu,
+                    bg=C["accent2"], pad=(20, 8)).pack(pady=16)
+
+        db = self.master.db
+        self.master.db_async(db.submit(db.get_powerups, self.master.user["id"]),
+                             self._build_rows)
 
+    def _build_rows(self, inv):
         for pup_id, name, desc, cost in POWERUPS:
-            qty = self.master.user.get(f"powerup_{pup_id}", 0)
-            row = tk.Frame(self, bg=C["card"], padx=24, pady=14)
+            qty = inv[pup_id]
+            row = tk.Frame(self._rows, bg=C["card"], padx=24, pady=14)
             row.pack(fill="x", padx=80, pady=6)
             icon = name.split()[0]
             tk.Label(row, text=icon, font=("Segoe UI", 28),
@@ -3177,25 +5634,24 @@ class PowerUpShopScreen(tk.Frame):
             self._qty_lbl = tk.Label(right, text=f"Owned: {qty}",
                                      font=FONT_SMALL, fg=C["yellow"], bg=C["card"])
             self._qty_lbl.pack()
-            pid = pup_id; pname = name; pcost = cost
+            pid = pup_id; pcost = cost
             ql = self._qty_lbl
 
-            def _buy(pid=pid, pname=pname, pcost=pcost, ql=ql):
-                if self.master.db.spend_coins(self.master.user["id"], pcost):
-                    self.master.db.add_powerup(self.master.user["id"], pid)
-                    self.master.user = self.master.db.get_user(self.master.user["username"])
-                    new_qty = self.master.user.get(f"powerup_{pid}", 0)
-                    ql.config(text=f"Owned: {new_qty}")
+            def _bought(ok, pid=pid, ql=ql):
+                if ok:
+                    ql.config(text=f"Owned: {inv[pid]}")
                     self._coin_var.set(f"🪙 Your Coins: {self.master.user.get('coins',0)}")
                     self.master.db.check_coin_achievements(self.master.user["id"])
 
+            def _buy(pid=pid, pcost=pcost, bought=_bought):
+                db = self.master.db
+                self.master.db_async(
+                    db.submit(db.buy_powerup, self.master.user["id"], pid, pcost), bought)
+
             make_button(right, f"Buy — {cost} 🪙", _buy,
                         bg=C["orange"], fg=C["bg"],
                         font=FONT_SMALL, pad=(12, 6)).pack(pady=4)
 
-        make_button(self, "← Back to Menu", self.master.show_menu,
-                    bg=C["accent2"], pad=(20, 8)).pack(pady=16)
-
 
 # ══════════════════════════ STATS / HEATMAP / GRAPH ══════════════════════════
 
@@ -3216,6 +5672,8 @@ class StatsScreen(tk.Frame):
 
         self._content = tk.Frame(self, bg=C["bg"])
         self._content.pack(fill="both", expand=True)
+        self._curve_data  = {}       # range key -> rows, fetched once
+        self._curve_range = "days"
 
         tabs = [("🗺 Heatmap", self._show_heatmap),
                 ("📈 Learning Curve", self._show_curve),
@@ -3228,16 +5686,33 @@ class StatsScreen(tk.Frame):
                     bg=C["accent2"], pad=(20, 8)).pack(side="bottom", pady=10)
         self._show_heatmap()
 
+    def refresh(self):
+        """Reload the open tab; the tab bar and frame are kept."""
+        self._curve_data = {}
+        self._tab()
+
     def _clear_content(self):
+        self._tab_token = getattr(self, "_tab_token", 0) + 1
         for w in self._content.winfo_children():
             w.destroy()
 
+    def _load(self, then, method, *args):
+        """Fetch off the Tk thread; drop the result if the tab changed meanwhile."""
+        token = self._tab_token
+
+        def _deliver(result):
+            if token == self._tab_token:
+                then(result)
+        self.master.db_async(self.master.db.submit(method, *args), _deliver)
+
     def _show_heatmap(self):
+        self._tab = self._show_heatmap
         self._clear_content()
         db  = self.master.db
         uid = self.master.user["id"]
-        cat_stats = db.get_category_stats(uid)
+        self._load(self._draw_heatmap, db.get_category_stats, uid, self.master.deck_id)
 
+    def _draw_heatmap(self, cat_stats):
         make_label(self._content, "📊  Topic Heatmap",
                    font=FONT_LARGE, fg=C["cyan"], bg=C["bg"]).pack(pady=(12, 8))
         make_label(self._content, "Green = strong  |  Yellow = medium  |  Red = struggling",
@@ -3246,7 +5721,7 @@ class StatsScreen(tk.Frame):
         grid_frame = tk.Frame(self._content, bg=C["bg"])
         grid_frame.pack(padx=40)
 
-        categories = list(CARD_CATEGORIES.keys())
+        categories = self.master.deck.categories
         for i, cat in enumerate(categories):
             correct, wrong = cat_stats.get(cat, [0, 0])
             total = correct + wrong
@@ -3278,32 +5753,75 @@ class StatsScreen(tk.Frame):
             tk.Label(cell, text=pct, font=("Segoe UI", 13, "bold"),
                      fg=C["bg"], bg=color).pack()
 
+    # (key, button text, chart title)
+    CURVE_RANGES = [
+        ("days",   "30 days",   "📈  Learning Curve (last 30 days)"),
+        ("months", "Per month", "📈  Learning Curve (per month)"),
+        ("all",    "All time",  "📈  Learning Curve (all time)"),
+    ]
+
     def _show_curve(self):
+        self._tab = self._show_curve
         self._clear_content()
+        self._curve_title = make_label(self._content, "", font=FONT_LARGE,
+                                       fg=C["cyan"], bg=C["bg"])
+        self._curve_title.pack(pady=(12, 4))
+        bar = tk.Frame(self._content, bg=C["bg"])
+        bar.pack()
+        for key, text, _ in self.CURVE_RANGES:
+            make_button(bar, text, lambda k=key: self._set_curve_range(k),
+                        bg=C["panel"], font=FONT_SMALL, pad=(12, 4)).pack(side="left", padx=3)
+
+        # Sized by the layout; drawn only when that size or the range changes
+        self._curve = tk.Canvas(self._content, height=300,
+                                bg=C["card"], highlightthickness=0)
+        self._curve.pack(fill="x", pady=10, padx=40)
+        self._curve_size = None
+        self._curve.bind("<Configure>", self._on_curve_resize)
+        self._curve_latest = make_label(self._content, "", font=FONT_MED, bg=C["bg"])
+        self._curve_latest.pack()
+        self._set_curve_range(self._curve_range)
+
+    def _set_curve_range(self, key):
+        self._curve_range = key
+        self._curve_title.config(
+            text=next(t for k, _, t in self.CURVE_RANGES if k == key))
+        if key in self._curve_data:
+            self._draw_curve()
+            return
+
+        def _got(rows):
+            self._curve_data[key] = rows
+            if key == self._curve_range:
+                self._draw_curve()
         db  = self.master.db
         uid = self.master.user["id"]
+        if key == "months":
+            self._load(_got, db.get_monthly_accuracy, uid)
+        else:
+            self._load(_got, db.get_accuracy_history, uid, 30 if key == "days" else None)
+
+    def _on_curve_resize(self, e):
+        if (e.width, e.height) != self._curve_size:
+            self._curve_size = (e.width, e.height)
+            self._draw_curve()
+
+    def _draw_curve(self):
+        c    = self._curve
+        data = self._curve_data.get(self._curve_range)
+        W, H = c.winfo_width(), c.winfo_height()
+        if data is None or W < 2:
+            return   # the fetch or the first <Configure> will call back
+        c.delete("all")
 
-        make_label(self._content, "📈  Learning Curve (last 30 days)",
-                   font=FONT_LARGE, fg=C["cyan"], bg=C["bg"]).pack(pady=(12, 6))
-
-        data = db.get_accuracy_history(uid, days=30)
         if not data:
-            make_label(self._content,
-                       "No game history yet. Play some games to see your progress!",
-                       font=FONT_MED, fg=C["muted"], bg=C["bg"]).pack(pady=40)
+            c.create_text(W // 2, H // 2,
+                          text="No game history yet. Play some games to see your progress!",
+                          fill=C["muted"], font=FONT_MED)
+            self._curve_latest.config(text="")
             return
 
-        # Draw line chart on canvas
-        W, H = 700, 300
-        c = tk.Canvas(self._content, width=W, height=H,
-                      bg=C["card"], highlightthickness=0)
-        c.pack(pady=10, padx=40)
-
         pad = 60
-        dates  = [r[0] for r in data]
-        values = [float(r[1]) for r in data]
-        n = len(values)
-
         c.create_line(pad, pad, pad, H-pad, fill=C["muted"], width=1)
         c.create_line(pad, H-pad, W-pad, H-pad, fill=C["muted"], width=1)
 
@@ -3314,46 +5832,46 @@ class StatsScreen(tk.Frame):
             c.create_text(pad-8, y, text=f"{pct}%",
                           fill=C["muted"], font=("Segoe UI", 8), anchor="e")
 
-        # Plot
+        # At most one point per pixel column, drawn as a single line item;
+        # x is the day (or month) offset, so gaps in play show as gaps
+        values = [float(r[1]) for r in data]
+        xs     = period_offsets([r[0] for r in data])
+        n      = len(values)
+        keep   = lttb(values, max(3, W - 2*pad), xs)
+        step   = (W - 2*pad) / max(1, xs[-1])
+        coords = []
+        for i in keep:
+            coords += (pad + xs[i] * step, H - pad - (values[i]/100) * (H - 2*pad))
         if n > 1:
-            pts = []
-            for i, v in enumerate(values):
-                x = pad + i * ((W - 2*pad) / (n-1))
-                y = H - pad - (v/100) * (H - 2*pad)
-                pts.append((x, y))
-            for i in range(len(pts)-1):
-                c.create_line(pts[i][0], pts[i][1],
-                              pts[i+1][0], pts[i+1][1],
-                              fill=C["cyan"], width=2)
-            for x, y in pts:
-                c.create_oval(x-4, y-4, x+4, y+4, fill=C["cyan"], outline="")
-        elif n == 1:
-            x = (W) // 2
-            y = H - pad - (values[0]/100) * (H - 2*pad)
+            c.create_line(*coords, fill=C["cyan"], width=2)
+            if len(keep) <= 40:
+                for x, y in zip(coords[0::2], coords[1::2]):
+                    c.create_oval(x-4, y-4, x+4, y+4, fill=C["cyan"], outline="")
+        else:
+            x = W // 2
+            y = coords[1]
             c.create_oval(x-5, y-5, x+5, y+5, fill=C["cyan"], outline="")
 
-        # X labels (every other date)
-        for i, d in enumerate(dates):
-            if i % max(1, n//6) == 0:
-                x = pad + i * ((W - 2*pad) / max(1, n-1))
-                label = d[5:]  # MM-DD
-                c.create_text(x, H-pad+14, text=label,
-                              fill=C["muted"], font=("Segoe UI", 8), angle=0)
+        # About six X labels, at kept points
+        short = (lambda d: d[5:]) if self._curve_range == "days" else (lambda d: d[:7])
+        for k, i in enumerate(keep):
+            if k % max(1, len(keep)//6) == 0:
+                c.create_text(pad + xs[i] * step, H-pad+14, text=short(data[i][0]),
+                              fill=C["muted"], font=("Segoe UI", 8))
 
         # Latest value
-        if values:
-            last_val = values[-1]
-            color = C["green"] if last_val >= 75 else C["yellow"] if last_val >= 45 else C["accent"]
-            make_label(self._content,
-                       f"Latest accuracy: {last_val:.1f}%",
-                       font=FONT_MED, fg=color, bg=C["bg"]).pack()
+        last_val = values[-1]
+        color = C["green"] if last_val >= 75 else C["yellow"] if last_val >= 45 else C["accent"]
+        self._curve_latest.config(text=f"Latest accuracy: {last_val:.1f}%", fg=color)
 
     def _show_weak_spots(self):
+        self._tab = self._show_weak_spots
         self._clear_content()
         db  = self.master.db
         uid = self.master.user["id"]
-        weak = db.get_weak_spots(uid, n=5)
+        self._load(self._draw_weak_spots, db.get_weak_spots, uid, 5, self.master.deck_id)
 
+    def _draw_weak_spots(self, weak):
         make_label(self._content, "🎯  Weak Spots — Cards to Practice",
                    font=FONT_LARGE, fg=C["accent"], bg=C["bg"]).pack(pady=(12, 6))
 
@@ -3379,7 +5897,7 @@ class StatsScreen(tk.Frame):
             tk.Label(info, text=f"#{rank}  {term}",
                      font=("Segoe UI", 14, "bold"),
                      fg=C["text"], bg=C["card"], anchor="w").pack(anchor="w")
-            tk.Label(info, text=FLASHCARDS.get(term, ""),
+            tk.Label(info, text=self.master.deck.definition(term),
                      font=FONT_SMALL, fg=C["muted"], bg=C["card"],
                      anchor="w", wraplength=500).pack(anchor="w")
 
@@ -3454,7 +5972,8 @@ class EndlessResultScreen(tk.Frame):
         self._hs_txt = c.create_text(W//2, 285, text="0",
                                      fill=C["cyan"], font=("Segoe UI", 72, "bold"))
         self._c = c
-        self._count_up()
+        self._count_wait = 0.0
+        animate(c, self._count_up)
         bf = tk.Frame(c, bg=C["bg"])
         c.create_window(W//2, 430, window=bf)
         make_button(bf, "▶ Play Again", self.master.show_endless_mode,
@@ -3462,12 +5981,16 @@ class EndlessResultScreen(tk.Frame):
         make_button(bf, "🏠 Menu", self.master.show_menu,
                     bg=C["accent2"], pad=(20, 10)).pack(side="left", padx=10)
 
-    def _count_up(self):
-        if self._displayed < self.score:
-            step = max(1, (self.score - self._displayed) // 8)
-            self._displayed = min(self._displayed + step, self.score)
-            self._c.itemconfig(self._hs_txt, text=str(self._displayed))
-            self.after(40, self._count_up)
+    def _count_up(self, dt):
+        if self._displayed >= self.score:
+            return False
+        self._count_wait += dt
+        if self._count_wait < 0.04:
+            return
+        self._count_wait = 0.0
+        step = max(1, (self.score - self._displayed) // 8)
+        self._displayed = min(self._displayed + step, self.score)
+        self._c.itemconfig(self._hs_txt, text=str(self._displayed))
 
     def _build_normal(self):
         if self.cashout:
@@ -3549,6 +6072,9 @@ class TimeWarpResultScreen(tk.Frame):
 # ══════════════════════════ REWARDS SCREEN ═══════════════════════════════════
 
 class RewardsScreen(tk.Frame):
+    ROW_HEIGHT = 54
+    PAGE       = 20
+
     def __init__(self, master):
         super().__init__(master, bg=C["bg"])
         self._build()
@@ -3556,20 +6082,41 @@ class RewardsScreen(tk.Frame):
     def _build(self):
         make_label(self, "🏅  Badges & Rewards",
                    font=FONT_TITLE, fg=C["yellow"]).pack(pady=(14, 4))
-
-        db     = self.master.db
-        uid    = self.master.user["id"]
-        earned = db.get_user_badge_names(uid)
-        all_b  = db.get_all_badges()
+        make_button(self, "← Back to Menu", self.master.show_menu,
+                    bg=C["accent2"], pad=(20, 8)).pack(side="bottom", pady=10)
 
         sf = tk.Frame(self, bg=C["panel"], pady=8, padx=20)
         sf.pack(fill="x", padx=40, pady=(0, 6))
-        make_label(sf, f"Total Questions: {self.master.user['total_answered']}",
-                   font=FONT_MED, fg=C["cyan"], bg=C["panel"]).pack(side="left")
-        make_label(sf, f"  |  Badges: {len(earned)} / {len(all_b)}",
-                   font=FONT_MED, fg=C["yellow"], bg=C["panel"]).pack(side="left")
-        make_label(sf, f"  |  🪙 {self.master.user.get('coins',0)} coins",
-                   font=FONT_MED, fg=C["orange"], bg=C["panel"]).pack(side="left")
+        self._summary_lbls = []
+        for fg in (C["cyan"], C["yellow"], C["orange"]):
+            lbl = make_label(sf, "", font=FONT_MED, fg=fg, bg=C["panel"])
+            lbl.pack(side="left")
+            self._summary_lbls.append(lbl)
+        self._summary_lbls[0].config(text="Loading…")
+
+        # Category headers and badges share one list of rows
+        self._entries = []
+        self._list = VirtualList(self, self.ROW_HEIGHT, self._make_row,
+                                 self._fill_row, self._fetch_page, self.PAGE)
+        self._list.pack(fill="both", expand=True, padx=40)
+        self._load()
+
+    def refresh(self):
+        self._load()
+
+    def _load(self):
+        db = self.master.db
+        self.master.db_async(db.submit(db.get_badge_overview, self.master.user["id"]),
+                             self._fill)
+
+    def _fill(self, overview):
+        earned, all_b = overview
+        user = self.master.user
+        for lbl, text in zip(self._summary_lbls,
+                             (f"Total Questions: {user['total_answered']}",
+                              f"  |  Badges: {len(earned)} / {len(all_b)}",
+                              f"  |  🪙 {user.get('coins',0)} coins")):
+            lbl.config(text=text)
 
         CATEGORIES = [
             ("🏆 Original",      ["First Time","Fast Learner","Flash Master","Endless 10","Endless 25","Endless 50"]),
@@ -3589,61 +6136,64 @@ class RewardsScreen(tk.Frame):
         ]
 
         badge_lookup = {row[0]: (row[1], row[2]) for row in all_b}
-
-        # Scrollable container — FIXED bidirectional scrolling
-        outer, scv, inner = make_scrollable(self)
-        outer.pack(fill="both", expand=True, padx=40)
-
+        entries = []
         for cat_name, badge_list in CATEGORIES:
-            hf = tk.Frame(inner, bg=C["accent2"])
-            hf.pack(fill="x", pady=(10, 3))
-            tk.Label(hf, text=cat_name, font=("Segoe UI", 12, "bold"),
-                     fg=C["white"], bg=C["accent2"], pady=4
-                     ).pack(anchor="w", padx=12)
-
+            entries.append((cat_name,))
             for name in badge_list:
                 if name not in badge_lookup: continue
                 desc, icon = badge_lookup[name]
-                unlocked   = name in earned
-                row = tk.Frame(inner,
-                               bg=C["card"] if unlocked else C["panel"],
-                               pady=6, padx=14)
-                row.pack(fill="x", pady=2)
-
-                # Bind scroll on every sub-widget too
-                def _bind_scroll(w, _scv=scv):
-                    def _on_wheel(e, s=_scv):
-                        s.yview_scroll(int(-1*(e.delta/120)), "units")
-                    w.bind("<MouseWheel>", _on_wheel)
-                    for child in w.winfo_children():
-                        _bind_scroll(child)
-
-                tk.Label(row, text=icon if unlocked else "🔒",
-                         font=("Segoe UI", 18), bg=row["bg"],
-                         fg=C["yellow"] if unlocked else C["muted"]
-                         ).pack(side="left", padx=(0, 10))
-                info = tk.Frame(row, bg=row["bg"])
-                info.pack(side="left", fill="x", expand=True)
-                tk.Label(info, text=name, font=("Segoe UI", 11, "bold"),
-                         bg=row["bg"],
-                         fg=C["text"] if unlocked else C["muted"],
-                         anchor="w").pack(anchor="w")
-                tk.Label(info, text=desc, font=FONT_SMALL, bg=row["bg"],
-                         fg=C["muted"], anchor="w").pack(anchor="w")
-                tk.Label(row, text="✓ Unlocked" if unlocked else "Locked",
-                         font=("Segoe UI", 10, "bold"), bg=row["bg"],
-                         fg=C["green"] if unlocked else C["muted"]
-                         ).pack(side="right")
-
-                _bind_scroll(row)
+                entries.append((name, desc, icon, name in earned))
+        self._entries = entries
+        self._list.reset()
 
-        make_button(self, "← Back to Menu", self.master.show_menu,
-                    bg=C["accent2"], pad=(20, 8)).pack(pady=10)
+    def _fetch_page(self, page, last, deliver):
+        deliver(self._entries[page * self.PAGE:(page + 1) * self.PAGE])
+
+    @staticmethod
+    def _make_row(parent):
+        row  = tk.Frame(parent, pady=6, padx=14)
+        icon = tk.Label(row, font=("Segoe UI", 18))
+        icon.pack(side="left", padx=(0, 10))
+        info = tk.Frame(row)
+        info.pack(side="left", fill="x", expand=True)
+        name = tk.Label(info, font=("Segoe UI", 11, "bold"), anchor="w")
+        name.pack(anchor="w")
+        desc = tk.Label(info, font=FONT_SMALL, fg=C["muted"], anchor="w")
+        desc.pack(anchor="w")
+        state = tk.Label(row, font=("Segoe UI", 10, "bold"))
+        state.pack(side="right")
+        row.cells = (info, icon, name, desc, state)
+        return row
+
+    @staticmethod
+    def _fill_row(row, index, entry):
+        info, icon, name, desc, state = row.cells
+        if len(entry) == 1:
+            # Category header
+            bg = C["accent2"]
+            icon.config(text="")
+            name.config(text=entry[0], font=("Segoe UI", 12, "bold"), fg=C["white"])
+            desc.config(text="")
+            state.config(text="")
+        else:
+            badge, text, emoji, unlocked = entry
+            bg = C["card"] if unlocked else C["panel"]
+            icon.config(text=emoji if unlocked else "🔒",
+                        fg=C["yellow"] if unlocked else C["muted"])
+            name.config(text=badge, font=("Segoe UI", 11, "bold"),
+                        fg=C["text"] if unlocked else C["muted"])
+            desc.config(text=text)
+            state.config(text="✓ Unlocked" if unlocked else "Locked",
+                         fg=C["green"] if unlocked else C["muted"])
+        for w in (row,) + row.cells:
+            w.config(bg=bg)
 
 
 # ══════════════════════════ LEADERBOARD ══════════════════════════════════════
 
 class LeaderboardScreen(tk.Frame):
+    ROW_HEIGHT = 34
+
     def __init__(self, master):
         super().__init__(master, bg=C["bg"])
         self._build()
@@ -3651,8 +6201,11 @@ class LeaderboardScreen(tk.Frame):
     def _build(self):
         make_label(self, "📊  Leaderboard",
                    font=FONT_TITLE, fg=C["cyan"]).pack(pady=(20, 14))
+        make_button(self, "← Back", self.master.show_menu,
+                    bg=C["accent2"], pad=(20, 8)).pack(side="bottom", pady=14)
+        self._rank_lbl = make_label(self, "", font=FONT_SMALL, fg=C["muted"])
+        self._rank_lbl.pack(pady=(0, 8))
 
-        rows = self.master.db.get_leaderboard()
         outer = tk.Frame(self, bg=C["bg"])
         outer.pack(fill="both", expand=True, padx=40)
 
@@ -3676,59 +6229,179 @@ class LeaderboardScreen(tk.Frame):
                      padx=6, pady=7, anchor="center"
                      ).grid(row=0, column=col_i, sticky="ew")
 
-        body_wrap = tk.Frame(outer, bg=C["bg"])
-        body_wrap.pack(fill="both", expand=True)
-        scv = tk.Canvas(body_wrap, bg=C["bg"], highlightthickness=0)
-        sb  = tk.Scrollbar(body_wrap, orient="vertical", command=scv.yview)
-        scv.configure(yscrollcommand=sb.set)
-        sb.pack(side="right", fill="y")
-        scv.pack(side="left", fill="both", expand=True)
-
-        body = tk.Frame(scv, bg=C["bg"])
-        win  = scv.create_window(0, 0, anchor="nw", window=body)
-        body.bind("<Configure>", lambda e: scv.configure(scrollregion=scv.bbox("all")))
-        scv.bind("<Configure>",  lambda e: scv.itemconfig(win, width=e.width))
-
-        def _on_wheel(e):
-            scv.yview_scroll(int(-1*(e.delta/120)), "units")
-        scv.bind("<MouseWheel>", _on_wheel)
-        body.bind("<MouseWheel>", _on_wheel)
-
-        def _configure_row_cols(frame):
-            for col_i, (_, w, flex) in enumerate(COLS):
-                frame.grid_columnconfigure(col_i, weight=flex, minsize=w)
-
-        MEDALS   = {1: "🥇", 2: "🥈", 3: "🥉"}
-        MEDAL_FG = {1: C["yellow"], 2: "#c0c0c0", 3: "#cd7f32"}
-
-        for i, row_data in enumerate(rows, 1):
-            uname, hs, sp, bc, tq, coins = row_data
-            bg_c      = C["card"] if i % 2 == 0 else C["panel"]
-            medal     = MEDALS.get(i, f"#{i}")
-            medal_clr = MEDAL_FG.get(i, C["text"])
-            name_fg   = C["yellow"] if i <= 3 else C["text"]
-
-            drow = tk.Frame(body, bg=bg_c)
-            drow.pack(fill="x")
-            _configure_row_cols(drow)
-
-            cells = [
-                (medal,    "center", medal_clr),
-                (uname,    "w",      name_fg),
-                (str(hs),  "center", C["green"]  if hs > 0 else C["muted"]),
-                (str(sp),  "center", C["orange"] if sp > 0 else C["muted"]),
-                (str(bc),  "center", C["yellow"] if bc > 0 else C["muted"]),
-                (str(tq),  "center", C["cyan"]   if tq > 0 else C["muted"]),
-                (str(coins),"center",C["orange"] if coins > 0 else C["muted"]),
-            ]
-            for col_i, (val, anc, fg) in enumerate(cells):
-                tk.Label(drow, text=val, anchor=anc,
-                         font=FONT_SMALL, bg=bg_c, fg=fg,
-                         padx=6, pady=7
-                         ).grid(row=0, column=col_i, sticky="ew")
+        self._cols = COLS
+        self._list = VirtualList(outer, self.ROW_HEIGHT, self._make_row,
+                                 self._fill_row, self._fetch_page, LEADERBOARD_PAGE)
+        self._list.pack(fill="both", expand=True)
+        self._load_rank()
 
-        make_button(self, "← Back", self.master.show_menu,
-                    bg=C["accent2"], pad=(20, 8)).pack(pady=14)
+    def refresh(self):
+        self._list.reset()
+        self._load_rank()
+
+    def _load_rank(self):
+        db = self.master.db
+        if self.master.user:
+            self.master.db_async(
+                db.submit(db.get_leaderboard_rank, self.master.user["id"]),
+                self._show_rank)
+
+    def _fetch_page(self, page, last, deliver):
+        db = self.master.db
+        self.master.db_async(db.submit(db.get_leaderboard, last), deliver)
+
+    def _show_rank(self, result):
+        if result:
+            rank, row = result
+            self._rank_lbl.config(
+                text=f"Your rank: #{rank}   ·   Endless best: {row[2]}")
+
+    def _make_row(self, parent):
+        drow = tk.Frame(parent)
+        for col_i, (_, w, flex) in enumerate(self._cols):
+            drow.grid_columnconfigure(col_i, weight=flex, minsize=w)
+        drow.cells = []
+        for col_i, (_, _, flex) in enumerate(self._cols):
+            lbl = tk.Label(drow, anchor="w" if flex else "center",
+                           font=FONT_SMALL, padx=6, pady=7)
+            lbl.grid(row=0, column=col_i, sticky="ew")
+            drow.cells.append(lbl)
+        return drow
+
+    MEDALS   = {1: "🥇", 2: "🥈", 3: "🥉"}
+    MEDAL_FG = {1: C["yellow"], 2: "#c0c0c0", 3: "#cd7f32"}
+
+    def _fill_row(self, drow, index, row_data):
+        i = index + 1
+        _, uname, hs, sp, bc, tq, coins = row_data
+        bg_c = C["card"] if i % 2 == 0 else C["panel"]
+        cells = [
+            (self.MEDALS.get(i, f"#{i}"), self.MEDAL_FG.get(i, C["text"])),
+            (uname,      C["yellow"] if i <= 3 else C["text"]),
+            (str(hs),    C["green"]  if hs > 0 else C["muted"]),
+            (str(sp),    C["orange"] if sp > 0 else C["muted"]),
+            (str(bc),    C["yellow"] if bc > 0 else C["muted"]),
+            (str(tq),    C["cyan"]   if tq > 0 else C["muted"]),
+            (str(coins), C["orange"] if coins > 0 else C["muted"]),
+        ]
+        drow.config(bg=bg_c)
+        for lbl, (val, fg) in zip(drow.cells, cells):
+            lbl.config(text=val, bg=bg_c, fg=fg)
+
+
+# ══════════════════════════ CARD SEARCH ══════════════════════════════════════
+
+class SearchScreen(tk.Frame):
+    """
+    Search-as-you-type over the deck's terms and definitions.  Each pause
+    in typing runs one DatabaseManager.search_cards off the Tk thread;
+    answers to older queries are dropped.  The results can be drilled as
+    a Normal Mode game.
+    """
+    ROW_HEIGHT = 52
+    PAGE       = 50
+
+    def __init__(self, master):
+        super().__init__(master, bg=C["bg"])
+        self.deck      = master.deck
+        self._results  = []
+        self._pending  = None   # after() id of the debounced query
+        self._query_no = 0
+        self._build()
+
+    def _build(self):
+        make_label(self, "🔍  Search Cards",
+                   font=FONT_TITLE, fg=C["cyan"]).pack(pady=(20, 10))
+
+        bottom = tk.Frame(self, bg=C["bg"])
+        bottom.pack(side="bottom", pady=14)
+        make_button(bottom, "← Back", self.master.show_menu,
+                    bg=C["accent2"], pad=(20, 8)).pack(side="left", padx=6)
+        self._drill_btn = make_button(bottom, "▶  Drill these results", self._drill,
+                                      bg=C["muted"], pad=(20, 8))
+        self._drill_btn.pack(side="left", padx=6)
+
+        self._qvar = tk.StringVar()
+        self._entry = tk.Entry(self, textvariable=self._qvar, font=FONT_MED,
+                               bg=C["card"], fg=C["text"], insertbackground=C["text"],
+                               relief="flat", width=40)
+        self._entry.pack(ipady=8)
+        self._entry.focus()
+        self._entry.bind("<Return>", lambda _: self._run_query())
+        self._qvar.trace_add("write", lambda *_: self._schedule_query())
+
+        self._count_lbl = make_label(self, f"{len(self.deck)} cards in {self.deck.name}",
+                                     font=FONT_SMALL, fg=C["muted"])
+        self._count_lbl.pack(pady=(6, 8))
+
+        self._list = VirtualList(self, self.ROW_HEIGHT, self._make_row,
+                                 self._fill_row, self._fetch_page, self.PAGE)
+        self._list.pack(fill="both", expand=True, padx=40)
+
+    def refresh(self):
+        self._entry.focus()
+        self._entry.select_range(0, "end")
+
+    # ── querying ──────────────────────────────────────────────────────────────
+
+    def _schedule_query(self):
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+        self._pending = self.after(SEARCH_DEBOUNCE_MS, self._run_query)
+
+    def _run_query(self):
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+            self._pending = None
+        self._query_no += 1
+        query_no = self._query_no
+        db = self.master.db
+
+        def _deliver(terms):
+            if query_no == self._query_no:
+                self._show_results(terms)
+        self.master.db_async(db.submit(db.search_cards, self.deck.id, self._qvar.get()),
+                             _deliver)
+
+    def _show_results(self, terms):
+        self._results = terms
+        if not self._qvar.get().strip():
+            text = f"{len(self.deck)} cards in {self.deck.name}"
+        elif len(terms) >= SEARCH_LIMIT:
+            text = f"Top {len(terms)} matches"
+        else:
+            text = f"{len(terms)} match{'es' if len(terms) != 1 else ''}"
+        self._count_lbl.config(text=text)
+        self._drill_btn.config(bg=C["green"] if terms else C["muted"])
+        self._list.reset()
+
+    def _drill(self):
+        if self._results:
+            self.master.show_frame(NormalModeScreen, terms=self._results)
+
+    # ── rows ──────────────────────────────────────────────────────────────────
+
+    def _fetch_page(self, page, last, deliver):
+        deliver(self._results[page * self.PAGE:(page + 1) * self.PAGE])
+
+    def _make_row(self, parent):
+        row = tk.Frame(parent, padx=10)
+        row.term = tk.Label(row, font=("Segoe UI", 12, "bold"), anchor="w")
+        row.cat  = tk.Label(row, font=FONT_SMALL, fg=C["muted"], anchor="e")
+        row.defn = tk.Label(row, font=FONT_SMALL, fg=C["muted"], anchor="w")
+        row.grid_columnconfigure(0, weight=1)
+        row.term.grid(row=0, column=0, sticky="ew", pady=(5, 0))
+        row.cat.grid(row=0, column=1, sticky="e", pady=(5, 0))
+        row.defn.grid(row=1, column=0, columnspan=2, sticky="ew")
+        return row
+
+    def _fill_row(self, row, index, term):
+        card = self.deck[term]
+        bg_c = C["card"] if index % 2 == 0 else C["panel"]
+        row.config(bg=bg_c)
+        row.term.config(text=card.term, fg=C["cyan"], bg=bg_c)
+        row.cat.config(text=card.category, bg=bg_c)
+        row.defn.config(text=card.definition, bg=bg_c)
 
 
 # ══════════════════════════ WEAK SPOTS (standalone) ══════════════════════════
@@ -3748,9 +6421,201 @@ class HeatmapScreen(tk.Frame):
         self.master.show_stats()
 
 
+# ══════════════════════════ BENCHMARKS ═══════════════════════════════════════
+
+def bench_synth(repeat=3):
+    """
+    Time building every SFX plus the music loop on each available PCM
+    backend, against ReferencePCM, and report the largest sample difference.
+    Raises if a backend is off by more than 1 LSB or changes a length.
+    """
+    backends = [ReferencePCM, ArrayPCM] + ([NumpyPCM] if np is not None else [])
+    results  = {}
+    for P in backends:
+        best = float("inf")
+        for _ in range(repeat if P is not ReferencePCM else 1):
+            t0 = time.perf_counter()
+            sounds = SoundManager._build_sounds(P)
+            sounds["music"] = SoundManager._build_music_loop(P=P)
+            best = min(best, time.perf_counter() - t0)
+        results[P.__name__] = (best, sounds)
+
+    ref_time, ref = results["ReferencePCM"]
+    print(f"{'backend':<14}{'seconds':>10}{'speedup':>10}{'max diff (LSB)':>16}")
+    for name, (secs, sounds) in results.items():
+        diff = 0
+        for key, wav in sounds.items():
+            a, b = array("h", ref[key][44:]), array("h", wav[44:])
+            if len(a) != len(b):
+                raise RuntimeError(f"bench: {name} {key} has {len(b)} samples, not {len(a)}")
+            diff = max(diff, max((abs(x - y) for x, y in zip(a, b)), default=0))
+        print(f"{name:<14}{secs:>10.3f}{ref_time / secs:>9.1f}x{diff:>16}")
+        if diff > 1:
+            raise RuntimeError(f"bench: {name} is {diff} LSB off ReferencePCM")
+
+
+def _percentiles(samples):
+    """p50/p95/p99/max of a list of seconds, in milliseconds."""
+    xs = sorted(samples)
+    if not xs:
+        return {}
+    def pct(q):
+        return round(xs[min(len(xs) - 1, int(q * len(xs)))] * 1000, 3)
+    return {"p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99),
+            "max": round(xs[-1] * 1000, 3)}
+
+
+def bench_game(answers=2000, seed=0):
+    """
+    Play scripted games headlessly and time each answer end to end.
+
+    Builds a FlashcardApp on a temporary database with the null audio
+    backend and its window withdrawn, then reveals and answers `answers`
+    cards in each timed mode.  Per answer it reports total latency, the
+    time spent in DatabaseManager calls on the Tk thread, and the rest
+    (widgets, sound, game logic) as widget time.  A finished game is
+    played out to its result screen and a new one started; the timed modes
+    run their clock out after `per_game` answers, since real time barely
+    passes while scripted answers are timed.
+    """
+    import tempfile
+    rng = random.Random(seed)
+    random.seed(seed)
+    tmp = tempfile.mkdtemp(prefix="flashcards-bench-")
+    app = FlashcardApp(db_path=os.path.join(tmp, "bench.db"), audio="null")
+    app.withdraw()
+
+    # Time DB calls made on the Tk thread (nested calls count once)
+    db, main = app.db, threading.main_thread()
+    db_time, depth = [0.0], [0]
+
+    def timed(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if threading.current_thread() is not main or depth[0]:
+                return fn(*args, **kwargs)
+            depth[0] += 1
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                db_time[0] += time.perf_counter() - t0
+                depth[0] -= 1
+        if hasattr(fn, "db_kind"):
+            wrapper.db_kind = fn.db_kind
+        return wrapper
+
+    for name in dir(DatabaseManager):
+        if not name.startswith("_") and callable(getattr(DatabaseManager, name)):
+            setattr(db, name, timed(getattr(db, name)))
+
+    db.create_user("bench", "0000")
+    app.user = db.get_user("bench")
+
+    def pump_until(cond, timeout=10.0):
+        end = time.perf_counter() + timeout
+        while not cond() and time.perf_counter() < end:
+            app.update()
+            time.sleep(0.001)
+
+    # (label, screen class, kwargs, chance a scripted answer is correct,
+    #  answers before a timed mode's clock is run out)
+    per_game = 200
+    modes = [
+        ("normal",   NormalModeScreen,   {},                          0.8,  None),
+        ("endless",  EndlessModeScreen,  {},                          0.95, None),
+        ("speedrun", SpeedrunModeScreen, {"mode_type": "marathon"},   0.8,  per_game),
+        ("timewarp", TimeWarpModeScreen, {},                          0.8,  per_game),
+    ]
+    report = {"answers_per_mode": answers, "sqlite": sqlite3.sqlite_version,
+              "modes": {}}
+    try:
+        for label, cls, kwargs, p_correct, game_answers in modes:
+            latency, db_ms, widget_ms = [], [], []
+            games  = 0
+            screen = None
+            for i in range(answers):
+                if game_answers and screen is not None and in_game >= game_answers:
+                    screen.time_left = 1
+                    screen._tick()   # the clock runs out, which ends the game
+                if screen is None or getattr(screen, "_ended", False):
+                    if screen is not None:
+                        # Let the end-of-game DB work and result screen finish
+                        pump_until(lambda: app._current_frame is not screen)
+                    app.show_frame(cls, **kwargs)
+                    screen = app._current_frame
+                    games += 1
+                    in_game = 0
+                in_game += 1
+                correct = rng.random() < p_correct
+                db_time[0] = 0.0
+                t0 = time.perf_counter()
+                screen._reveal()
+                screen._answer(correct)
+                app.update_idletasks()
+                total = time.perf_counter() - t0
+                latency.append(total)
+                db_ms.append(db_time[0])
+                widget_ms.append(total - db_time[0])
+                if i % 50 == 49:
+                    app.update()   # deliver DB results and animation frames
+            if hasattr(screen, "timer_running"):
+                screen.timer_running = False
+            if game_answers and answers > game_answers and games < 2:
+                raise RuntimeError(f"bench: {label} never finished a game")
+            report["modes"][label] = {
+                "games":      games,
+                "latency_ms": _percentiles(latency),
+                "db_ms":      _percentiles(db_ms),
+                "widget_ms":  _percentiles(widget_ms),
+            }
+        report["animation"] = app.anim.stats()
+    finally:
+        app.on_close()
+        shutil.rmtree(tmp, ignore_errors=True)
+    print(json.dumps(report, indent=2))
+    return report
+
+
 # ══════════════════════════ ENTRY POINT ══════════════════════════════════════
 
 if __name__ == "__main__":
-    app = FlashcardApp()
+    import argparse
+    parser = argparse.ArgumentParser(description="CS Flashcard Game")
+    parser.add_argument("--bench-synth", action="store_true",
+                        help="time PCM synthesis backends and exit")
+    parser.add_argument("--bench", action="store_true",
+                        help="time scripted answers in every game mode, print JSON and exit")
+    parser.add_argument("--answers", type=int, default=2000,
+                        help="answers per mode for --bench (default 2000)")
+    parser.add_argument("--deck", default=DEFAULT_DECK,
+                        help=f"deck to play (default {DEFAULT_DECK!r})")
+    parser.add_argument("--import-deck", metavar="PATH",
+                        help="import a JSON deck file into the card store and exit")
+    parser.add_argument("--precompute-daily", metavar="DAYS", type=int, nargs="?", const=365,
+                        help="store the next DAYS (default 365) daily challenges for --deck, "
+                             "print them as JSON and exit")
+    args = parser.parse_args()
+
+    if args.bench_synth:
+        bench_synth()
+        sys.exit(0)
+    if args.bench:
+        bench_game(args.answers)
+        sys.exit(0)
+    if args.import_deck:
+        db = DatabaseManager()
+        spec = load_deck_file(args.import_deck)
+        n = db.import_deck(**spec)
+        db.close()
+        print(f"Imported {n} cards into deck {spec['deck_id']!r}")
+        sys.exit(0)
+    if args.precompute_daily:
+        db = DatabaseManager()
+        print(json.dumps(db.precompute_daily(args.deck, args.precompute_daily), indent=2))
+        db.close()
+        sys.exit(0)
+
+    app = FlashcardApp(deck_id=args.deck)
     app.protocol("WM_DELETE_WINDOW", app.on_close)
     app.mainloop()
\ No newline at end of file
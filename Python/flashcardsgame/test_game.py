@@ -0,0 +1,865 @@
+"""
+Tests for game.py.  Database tests each run on a temporary file; tests
+that need Tk are skipped without a display.  Run with `python -m pytest -q`
+from this directory.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from array import array
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import game
+from game import DatabaseManager, DeckScheduler
+
+
+def _has_display():
+    try:
+        game.tk.Tk().destroy()
+    except game.tk.TclError:
+        return False
+    return True
+
+
+needs_display = pytest.mark.skipif(not _has_display(), reason="Tk needs a display")
+
+LATEST_VERSION = max(int(name[len("_schema_v"):]) for name in dir(DatabaseManager)
+                     if name.startswith("_schema_v"))
+
+
+@pytest.fixture
+def db(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "game.db"))
+    yield manager
+    manager.close()
+
+
+def add_user(db, username):
+    db.create_user(username, "1234").result()
+    return db.get_user(username)["id"]
+
+
+def user_version(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        conn.close()
+
+
+# ── Migrations ───────────────────────────────────────────────────────────────
+
+def make_legacy_db(path):
+    """A file as the game wrote it before user_version was used."""
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE users (
+            id                INTEGER PRIMARY KEY AUTOINCREMENT,
+            username          TEXT UNIQUE NOT NULL,
+            code              TEXT NOT NULL,
+            endless_highscore INTEGER DEFAULT 0,
+            total_answered    INTEGER DEFAULT 0
+        );
+        CREATE TABLE game_history (
+            id                 INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id            INTEGER NOT NULL,
+            mode               TEXT NOT NULL,
+            score              INTEGER DEFAULT 0,
+            questions_answered INTEGER DEFAULT 0,
+            timestamp          TEXT NOT NULL
+        );
+        CREATE TABLE card_performance (
+            id         INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id    INTEGER NOT NULL,
+            card_term  TEXT NOT NULL,
+            correct    INTEGER DEFAULT 0,
+            wrong      INTEGER DEFAULT 0,
+            last_seen  TEXT DEFAULT '',
+            UNIQUE(user_id, card_term)
+        );
+        INSERT INTO users(username, code, endless_highscore, total_answered)
+        VALUES ('old', '1234', 42, 7);
+        INSERT INTO game_history(user_id, mode, score, questions_answered, timestamp)
+        VALUES (1, 'normal', 5, 10, '2024-01-01T10:00:00');
+        INSERT INTO card_performance(user_id, card_term, correct, wrong)
+        VALUES (1, 'CPU', 3, 2);
+    """)
+    conn.close()
+
+
+def test_legacy_db_migrates_to_latest_version(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    make_legacy_db(path)
+    db = DatabaseManager(path)
+    try:
+        user = db.get_user("old")
+        assert (user["endless_highscore"], user["total_answered"]) == (42, 7)
+        assert user["coins"] == 0
+        row = db.conn.execute("""
+            SELECT deck_id, category, correct, wrong FROM card_performance
+            WHERE user_id=? AND card_term='CPU'""", (user["id"],)).fetchone()
+        assert row == (game.DEFAULT_DECK, game.TERM_CATEGORY["CPU"], 3, 2)
+        assert db.conn.execute("SELECT games, accuracy_sum FROM daily_accuracy").fetchall() == [(1, 0.0)]
+        assert len(db.get_deck()) == len(game.FLASHCARDS)
+    finally:
+        db.close()
+    assert user_version(path) == LATEST_VERSION
+
+
+def test_reopen_is_idempotent(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    make_legacy_db(path)
+
+    def snapshot():
+        conn = sqlite3.connect(path)
+        try:
+            return (conn.execute("SELECT type, name, sql FROM sqlite_master ORDER BY name").fetchall(),
+                    conn.execute("SELECT * FROM users").fetchall(),
+                    conn.execute("SELECT * FROM card_performance").fetchall(),
+                    conn.execute("SELECT * FROM cards ORDER BY id").fetchall(),
+                    conn.execute("SELECT * FROM user_badges").fetchall())
+        finally:
+            conn.close()
+
+    DatabaseManager(path).close()
+    first = snapshot()
+    DatabaseManager(path).close()
+    assert snapshot() == first
+    assert user_version(path) == LATEST_VERSION
+
+
+# ── Users ────────────────────────────────────────────────────────────────────
+
+def test_user_records_are_identity_mapped(db):
+    uid = add_user(db, "amy")
+    user = db.get_user("amy")
+    assert db.get_user_by_id(uid) is user
+    cols = [r[1] for r in db.conn.execute("PRAGMA table_info(users)")]
+    assert list(user) == cols
+    assert user == dict(zip(cols, db.conn.execute(
+        "SELECT * FROM users WHERE id=?", (uid,)).fetchone()))
+
+    db.update_endless_highscore(uid, 12).result()
+    assert db.get_user("amy") is user and user["endless_highscore"] == 12
+    db._users.clear()
+    assert db.get_user_by_id(uid) == user      # read back from the row
+    assert db.get_user("nobody") is None
+
+
+# ── DB threads ───────────────────────────────────────────────────────────────
+
+def test_submit_reads_on_a_reader_after_pending_writes(db):
+    uid = add_user(db, "amy")
+    db.add_coins(uid, 7)                          # still in the journal
+
+    def coins():
+        return db.conn.execute("SELECT coins FROM users WHERE id=?", (uid,)).fetchone()[0]
+    coins.db_kind = "read"
+
+    def on_writer():
+        return db._exec.in_writer()
+    assert db.submit(coins).result() == 7
+    assert db.submit(on_writer).result()
+    on_writer.db_kind = "read"
+    assert not db.submit(on_writer).result()
+
+
+# ── Answer journal ───────────────────────────────────────────────────────────
+
+def test_journal_flush_totals(db):
+    uid = add_user(db, "amy")
+    answers = [True, True, False, True, True, True]
+    for n, correct in enumerate(answers):
+        term = db.get_deck().terms[n % 2]
+        db.update_streak(uid, correct)
+        db.record_card_result(uid, term, correct)
+        db.add_coins(uid, 3)
+    db.flush_journal().result()
+
+    row = db.conn.execute("""
+        SELECT total_correct, current_streak, longest_streak, coins, coins_earned_total
+        FROM users WHERE id=?""", (uid,)).fetchone()
+    assert row == (5, 3, 3, 18, 18)
+    cards = db.conn.execute("""
+        SELECT SUM(correct), SUM(wrong), COUNT(*) FROM card_performance
+        WHERE user_id=?""", (uid,)).fetchone()
+    assert cards == (5, 1, 2)
+    assert not db._journal
+
+
+# ── Learning curve ───────────────────────────────────────────────────────────
+
+def test_accuracy_rollup_matches_raw_history(db, monkeypatch):
+    uid = add_user(db, "amy")
+    games = [(datetime(2026, 3, 1, 9), 10, 50.0), (datetime(2026, 3, 1, 23), 4, 100.0),
+             (datetime(2026, 3, 2, 8), 0, 0.0), (datetime(2026, 3, 9, 12), 8, 75.0),
+             (datetime(2026, 4, 2, 12), 5, 20.0)]
+    for when, questions, accuracy in games:
+        clock = type("Clock", (datetime,), {"now": classmethod(lambda cls, tz=None, t=when: t)})
+        monkeypatch.setattr(game, "datetime", clock)
+        db.save_game_history(uid, "normal", 0, questions, accuracy).result()
+
+    def raw(key):
+        return db.conn.execute(f"""
+            SELECT {key}, AVG(accuracy) FROM game_history
+            WHERE user_id=? AND questions_answered>0
+            GROUP BY 1 ORDER BY 1""", (uid,)).fetchall()
+
+    daily = db.get_accuracy_history(uid, days=None)
+    assert [d for d, _ in daily] == ["2026-03-01", "2026-03-09", "2026-04-02"]
+    assert [a for _, a in daily] == pytest.approx([a for _, a in raw("DATE(timestamp)")])
+    monthly = db.get_monthly_accuracy(uid)
+    expected = raw("substr(timestamp, 1, 7)")
+    assert [m for m, _ in monthly] == [m for m, _ in expected] == ["2026-03", "2026-04"]
+    assert [a for _, a in monthly] == pytest.approx([a for _, a in expected])
+
+
+def test_lttb_keeps_endpoints_and_extremes():
+    values = [50.0 + (i % 7) for i in range(1000)]
+    values[137], values[700] = 100.0, 0.0
+    for xs in (None, [i * i for i in range(1000)]):
+        keep = game.lttb(values, 40, xs)
+        assert len(keep) == 40 and keep == sorted(set(keep))
+        assert (keep[0], keep[-1]) == (0, 999)
+        assert {137, 700} <= set(keep)
+    assert game.lttb(values[:30], 40) == list(range(30))
+
+
+def test_curve_points_sit_at_their_period_offsets():
+    assert game.period_offsets(["2026-02-27", "2026-03-01", "2026-03-09"]) == [0, 2, 10]
+    assert game.period_offsets(["2025-11", "2026-02"]) == [0, 3]
+    assert game.period_offsets([]) == []
+
+
+# ── Session modes ────────────────────────────────────────────────────────────
+
+def test_modes_played_today_prunes_earlier_days(db):
+    uid = add_user(db, "amy")
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+    with db.conn:
+        db.conn.execute("INSERT INTO modes_played(user_id, date_str, mode) VALUES(?,?,?)",
+                        (uid, yesterday, "speedrun"))
+    assert db.record_mode_played_today(uid, "normal") == ["normal"]
+    assert sorted(db.record_mode_played_today(uid, "endless")) == ["endless", "normal"]
+    assert sorted(db.record_mode_played_today(uid, "normal")) == ["endless", "normal"]
+    assert db.conn.execute("SELECT COUNT(*) FROM modes_played WHERE date_str<?",
+                           (date.today().isoformat(),)).fetchone() == (0,)
+
+
+def test_session_modes_won_reset(db):
+    uid, other = add_user(db, "amy"), add_user(db, "bob")
+    db.record_mode_won(other, "speedrun")
+    assert db.record_mode_won(uid, "normal") == ["normal"]
+    assert sorted(db.record_mode_won(uid, "endless")) == ["endless", "normal"]
+    db.reset_session_modes(uid).result()
+    assert db.record_mode_won(uid, "timewarp") == ["timewarp"]
+    assert db.record_mode_won(other, "speedrun") == ["speedrun"]
+    assert db.get_user("amy")["session_modes_won"] == "[]"
+
+
+# ── Power-ups ────────────────────────────────────────────────────────────────
+
+def test_racing_use_powerup_never_goes_negative(db):
+    uid = add_user(db, "amy")
+    db.add_powerup(uid, "shield", 5).result()
+    inv = db.get_powerups(uid)
+    with ThreadPoolExecutor(8) as pool:
+        used = list(pool.map(lambda _: db.use_powerup(uid, "shield"), range(20)))
+    assert used.count(True) == 5
+    assert inv["shield"] == 0
+    assert db.conn.execute("SELECT qty FROM user_powerups WHERE user_id=? AND pup_id='shield'",
+                           (uid,)).fetchone() == (0,)
+
+
+def test_racing_buy_powerup_spends_only_what_is_there(db):
+    uid = add_user(db, "amy")
+    db.add_coins(uid, 35)
+    with ThreadPoolExecutor(8) as pool:
+        bought = list(pool.map(lambda _: db.buy_powerup(uid, "peek", 10), range(10)))
+    assert bought.count(True) == 3
+    assert db.get_powerups(uid)["peek"] == 3
+    user = db.get_user("amy")
+    assert (user["coins"], user["coins_spent"]) == (5, 30)
+    assert db.conn.execute("SELECT coins, coins_spent FROM users WHERE id=?",
+                           (uid,)).fetchone() == (5, 30)
+
+
+# ── Badges ───────────────────────────────────────────────────────────────────
+
+def test_badges_wait_for_their_prerequisites(db):
+    uid = add_user(db, "amy")
+    assert db.award_badges(uid, ["Human Cache", "Gambler"]) == ["Gambler"]
+    assert db.award_badges(uid, ["Human Cache", "First Steps", "Gambler"]) == \
+        ["Human Cache", "First Steps"]
+
+    eight = ["Survivor", "Untouchable", "Legend", "Risk Taker",
+             "Night Coder", "Owl", "Wizard", "Hare"]
+    assert db.award_badges(uid, eight) == eight
+    names = db.get_user_badge_names(uid)
+    assert "Root Access" in names                  # the 10-badge milestone, silently
+    assert len(names) == 12 == db.get_user("amy")["badge_count"]
+
+    db._badges = game.BadgeEngine()                # a fresh engine reloads what was earned
+    assert db.award_badges(uid, eight + ["Root Access"]) == []
+
+
+# ── Card store ───────────────────────────────────────────────────────────────
+
+def test_reimport_moves_card_progress_to_new_categories(db):
+    uid = add_user(db, "amy")
+    db.import_deck("geo", "Geography", [("Paris", "capital of France", "Old"),
+                                        ("Nile", "a river", "Old")])
+    db.record_card_result(uid, "Paris", True, "geo")
+    db.record_card_result(uid, "Nile", False, "geo")
+    assert db.get_category_stats(uid, "geo") == {"Old": [1, 1]}
+
+    db.import_deck("geo", "Geography", [("Paris", "capital of France", "Cities"),
+                                        ("Nile", "a river", "Rivers")])
+    assert db.get_deck("geo").categories == ["Cities", "Rivers"]
+    assert db.get_category_stats(uid, "geo") == {"Cities": [1, 0], "Rivers": [0, 1]}
+
+    db.import_deck("geo", "Geography", [("Paris", "capital of France", "Capitals")])
+    assert db.get_category_stats(uid, "geo") == {"Capitals": [1, 0], "Rivers": [0, 1]}
+
+
+def test_category_stats_follow_new_answers(db):
+    uid, other = add_user(db, "amy"), add_user(db, "bob")
+    db.import_deck("geo", "Geography", [("Paris", "capital of France", "Cities"),
+                                        ("Rome", "capital of Italy", "Cities"),
+                                        ("Nile", "a river", "Rivers")])
+    for term, correct in [("Paris", True), ("Rome", True), ("Rome", False), ("Nile", False)]:
+        db.record_card_result(uid, term, correct, "geo")
+    db.record_card_result(other, "Nile", True, "geo")
+    stats = db.get_category_stats(uid, "geo")
+    assert stats == {"Cities": [2, 1], "Rivers": [0, 1]}
+    assert db.get_category_stats(uid, "geo") is stats          # cached
+
+    db.record_card_result(uid, "Nile", True, "geo")
+    assert db.get_category_stats(uid, "geo") == {"Cities": [2, 1], "Rivers": [1, 1]}
+    assert db.get_category_stats(other, "geo") == {"Rivers": [1, 0]}
+    assert db.get_category_stats(uid) == {}
+
+
+# ── Leaderboard ──────────────────────────────────────────────────────────────
+
+def test_leaderboard_keyset_pages(db):
+    for n in range(23):
+        uid = add_user(db, f"user{n:02}")
+        db.update_endless_highscore(uid, n % 5).result()   # plenty of ties
+    everyone = db.get_leaderboard(limit=100)
+    assert len(everyone) == 23
+
+    pages, after = [], None
+    while True:
+        page = db.get_leaderboard(after=after, limit=4)
+        if not page:
+            break
+        pages.append(page)
+        after = page[-1]
+    assert [len(p) for p in pages] == [4] * 5 + [3]
+    assert [row for page in pages for row in page] == everyone
+    keys = [(r[2], r[5], r[0]) for r in everyone]
+    assert keys == sorted(keys, reverse=True)
+    assert db.get_leaderboard_rank(everyone[6][0]) == (7, everyone[6])
+
+
+# ── Spaced repetition ────────────────────────────────────────────────────────
+
+def test_sm2_correct_answers_grow_the_interval():
+    sched = DeckScheduler(["a", "b"])
+    assert sched.record("a", True, now=1000) == [2.5, 1.0, 1, 1000 + 86400]
+    assert sched.record("a", True, now=1000) == [2.5, 6.0, 2, 1000 + 6 * 86400]
+    ease, interval, reps, due = sched.record("a", True, now=1000)
+    assert (ease, interval, reps) == (2.5, 15.0, 3)
+    assert due == 1000 + 15 * 86400
+
+
+def test_sm2_wrong_answer_relearns():
+    sched = DeckScheduler(["a"], [("a", 2.5, 15.0, 3, 0.0)])
+    ease, interval, reps, due = sched.record("a", False, now=1000)
+    assert ease == pytest.approx(1.96)
+    assert (interval, reps, due) == (0.0, 0, 1000 + DeckScheduler.RELEARN_SECONDS)
+    for _ in range(5):
+        sched.record("a", False, now=1000)
+    assert sched.state["a"][0] == DeckScheduler.MIN_EASE
+
+
+def test_scheduler_skips_superseded_entries():
+    sched = DeckScheduler(["a", "b"], [("a", 2.5, 1.0, 1, 100.0), ("b", 2.5, 1.0, 1, 200.0)])
+    sched.record("a", True, now=50)       # a's entry at due=100 is superseded
+    assert sched.next(now=300) == "b"
+    for _ in range(1000):
+        sched.record("a", False, now=50)
+    assert len(sched._heap) <= 2 * len(sched.state)
+    assert [sched.next(now=1000) for _ in range(3)] == ["b", "a", "b"]
+
+
+def test_scheduler_serves_the_card_due_soonest():
+    sched = DeckScheduler(["a", "b", "c"], [("a", 2.5, 1.0, 1, 500.0),
+                                            ("b", 2.5, 1.0, 1, 100.0),
+                                            ("c", 2.5, 1.0, 1, 900.0)])
+    assert [sched.next(now=1000) for _ in range(3)] == ["b", "a", "c"]
+    assert sched.next(now=1000) == "b"   # shown, never answered
+
+
+def test_journal_flush_keeps_scheduler_state(tmp_path):
+    path = str(tmp_path / "game.db")
+    db = DatabaseManager(path)
+    uid = add_user(db, "amy")
+    term = db.get_deck().terms[0]
+    db.import_deck("other", "Other", [(term, "same term, another deck", "Misc")])
+    db.record_card_result(uid, term, True)
+    db.record_card_result(uid, term, True)
+    state = list(db.get_scheduler(uid).state[term])
+    db.close()
+
+    db = DatabaseManager(path)
+    try:
+        assert db.get_scheduler(uid).state[term] == pytest.approx(state)
+        assert db.get_scheduler(uid, "other").state[term] == [DeckScheduler.NEW_EASE, 0.0, 0, 0.0]
+    finally:
+        db.close()
+
+
+def test_shuffle_answers_build_no_scheduler(db):
+    uid = add_user(db, "amy")
+    terms = db.get_deck().terms[:3]
+    for term in terms + terms[:1]:
+        db.record_card_result(uid, term, True)
+    assert db._schedulers == {}
+    db.flush_journal().result()
+    rows = db.conn.execute("""
+        SELECT card_term, ease, interval_days, reps FROM card_performance
+        WHERE user_id=? ORDER BY card_term""", (uid,)).fetchall()
+    assert rows == sorted([(terms[0], 2.5, 6.0, 2)] + [(t, 2.5, 1.0, 1) for t in terms[1:]])
+
+
+def test_stored_sm2_state_matches_a_loaded_scheduler(db):
+    uid = add_user(db, "amy")
+    terms = db.get_deck().terms[:4]
+    db.record_card_result(uid, terms[0], True)        # before the scheduler exists
+    sched = db.get_scheduler(uid)
+    for n in range(20):
+        db.record_card_result(uid, terms[n % 4], n % 3 != 0)
+    db.flush_journal().result()
+    stored = {t: [e, i, r, d] for t, e, i, r, d in db.conn.execute("""
+        SELECT card_term, ease, interval_days, reps, due FROM card_performance
+        WHERE user_id=?""", (uid,))}
+    assert stored == {t: sched.state[t] for t in terms}
+
+
+# ── Daily challenge ──────────────────────────────────────────────────────────
+
+def test_sample_daily_cards_is_deterministic():
+    terms = [f"t{i}" for i in range(500)]
+    day = date(2026, 3, 14)
+    cards = game.sample_daily_cards(terms, "cs", day)
+    assert cards == game.sample_daily_cards(list(terms), "cs", day)
+    assert len(cards) == len(set(cards)) == game.DAILY_CARDS
+    assert set(cards) <= set(terms)
+    assert cards != game.sample_daily_cards(terms, "cs", day + timedelta(days=1))
+    assert cards != game.sample_daily_cards(terms, "other", day)
+    assert game.sample_daily_cards(terms[:3], "cs", day, k=10) == \
+        game.sample_daily_cards(terms[:3], "cs", day, k=3)
+    assert game.sample_daily_cards([], "cs", day) == []
+
+
+def test_first_stored_daily_challenge_wins(db):
+    day = date(2026, 3, 14).isoformat()
+    assert db._store_daily("cs", day, ["RAM"]) == ["RAM"]
+    assert db._store_daily("cs", day, ["CPU"]) == ["RAM"]
+
+
+# ── Card search ──────────────────────────────────────────────────────────────
+
+SEARCH_DECK = [
+    ("alpha", "first letter of the alphabet", "greek"),
+    ("alphabet", "the letters of a language", "words"),
+    ("alpine", "of high mountains", "words"),
+    ("beta", "second letter, after alpha", "greek"),
+    ("gamma ray", "high energy light", "physics"),
+    ("letter", "a character such as alpha", "words"),
+]
+
+
+@pytest.mark.parametrize("query", ["al", "alpha", "alpha ", "letter", "of the",
+                                   "high", "al let", "zzz", "", "  ", "a"])
+def test_search_fts_matches_search_index(db, query):
+    db.import_deck("greek", "Greek", SEARCH_DECK)
+    if not db._has_fts():
+        pytest.skip("SQLite built without FTS5")
+    fts = db.search_cards("greek", query)
+    db._fts = False
+    assert fts == db.search_cards("greek", query)
+
+
+def test_search_stays_in_deck_after_reimport(db):
+    db.import_deck("greek", "Greek", SEARCH_DECK[:3])
+    db.import_deck("more", "More", [("alpaca", "a llama's cousin", "animals")])
+    db.import_deck("greek", "Greek", SEARCH_DECK)
+    for fts in (None, False):
+        db._fts = fts
+        assert db.search_cards("greek", "alp") == ["alpha", "alphabet", "alpine", "beta", "letter"]
+        assert db.search_cards("more", "alp") == ["alpaca"]
+
+
+def test_search_index_empty_query():
+    index = game.Deck("greek", "Greek", [], SEARCH_DECK).search_index
+    assert index.search([], False, 10) == []
+    assert index.search(["alpha"], False, 10)[0] == "alpha"
+
+
+@pytest.fixture(scope="module")
+def big_deck_db(tmp_path_factory):
+    db = DatabaseManager(str(tmp_path_factory.mktemp("search") / "big.db"))
+    db.import_deck("big", "Big", [(f"term{i}", f"definition of card {i} w{i % 997}", "Misc")
+                                  for i in range(100_000)])
+    yield db
+    db.close()
+
+
+@pytest.mark.parametrize("fts", [None, False], ids=["fts5", "search_index"])
+@pytest.mark.parametrize("query", ["term", "te", "term12", "of card", "definition of c",
+                                   "w99", "card 5", "zzz"])
+def test_search_is_fast_on_a_100k_deck(big_deck_db, fts, query):
+    db = big_deck_db
+    db._fts = fts
+    db.search_cards("big", query)   # loads the deck and, without FTS5, its index
+    best = float("inf")
+    for _ in range(5):
+        t0 = time.perf_counter()
+        terms = db.search_cards("big", query)
+        best = min(best, time.perf_counter() - t0)
+    assert len(terms) <= game.SEARCH_LIMIT
+    assert best < 0.010, f"{query!r} took {best * 1000:.1f} ms"
+
+
+# ── Animation clock ──────────────────────────────────────────────────────────
+
+class FakeRoot:
+    """Just enough of Tk's after() to step an AnimationClock by hand."""
+
+    def __init__(self):
+        self.jobs = []
+
+    def after(self, ms, fn):
+        self.jobs.append(fn)
+        return len(self.jobs)
+
+    def frame(self):
+        jobs, self.jobs = self.jobs, []
+        for fn in jobs:
+            fn()
+
+
+class FakeWidget:
+    alive = True
+
+    def winfo_exists(self):
+        return self.alive
+
+
+def test_animation_clock_runs_only_while_animating():
+    root  = FakeRoot()
+    clock = game.AnimationClock(root)
+    calls = {"a": [], "b": []}
+    fading, spinning = FakeWidget(), FakeWidget()
+    clock.add(fading, lambda dt: calls["a"].append(dt) or len(calls["a"]) < 3)
+    clock.add(spinning, lambda dt: calls["b"].append(dt))
+    assert len(root.jobs) == 1            # one timer however many animations
+
+    for _ in range(3):
+        root.frame()
+    assert len(calls["a"]) == 3 and clock.active == 1
+    assert all(0 <= dt <= clock.MAX_DT for dt in calls["a"] + calls["b"])
+
+    spinning.alive = False
+    root.frame()
+    assert len(calls["b"]) == 3 and clock.active == 0
+    assert root.jobs == []                # the timer stopped with the last one
+
+    def broken(dt):
+        raise game.tk.TclError("widget destroyed mid-frame")
+    clock.add(FakeWidget(), broken)
+    token = clock.add(FakeWidget(), lambda dt: calls["a"].append(dt))
+    clock.remove(token)
+    root.frame()
+    assert clock.active == 0 and len(calls["a"]) == 3
+    assert clock.ticks == 5
+
+
+# ── Screens ──────────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def app(tmp_path):
+    app = game.FlashcardApp(db_path=str(tmp_path / "game.db"), audio="null")
+    app.withdraw()
+    add_user(app.db, "amy")
+    app.user = app.db.get_user("amy")
+    yield app
+    app.on_close()
+
+
+def screen_class(name, cacheable=True, refresh=True):
+    """A stand-in screen that records the kwargs it was built or refreshed with."""
+    def __init__(self, master, **kwargs):
+        game.tk.Frame.__init__(self, master)
+        self.shown = [kwargs]
+    attrs = {"__init__": __init__, "cacheable": cacheable}
+    if refresh:
+        attrs["refresh"] = lambda self, **kwargs: self.shown.append(kwargs)
+    return type(name, (game.tk.Frame,), attrs)
+
+
+@needs_display
+def test_screen_pool_reuses_refreshable_screens(app):
+    Menu, Game, Plain = (screen_class("Menu"), screen_class("Game", cacheable=False),
+                         screen_class("Plain", refresh=False))
+    app.show_frame(Menu, tab=1)
+    menu = app._current_frame
+    app.show_frame(Game)
+    game_screen = app._current_frame
+    app.show_frame(Menu, tab=2)
+    assert app._current_frame is menu and menu.shown == [{"tab": 1}, {"tab": 2}]
+    assert not game_screen.winfo_exists()
+    app.show_frame(Plain)
+    plain = app._current_frame
+    app.show_frame(Plain)
+    assert app._current_frame is not plain and not plain.winfo_exists()
+    assert set(app._screens) == {Menu}
+
+
+@needs_display
+def test_screen_pool_evicts_least_recently_shown(app):
+    classes = [screen_class(f"Screen{i}") for i in range(game.SCREEN_POOL_SIZE + 1)]
+    for cls in classes[:-1]:
+        app.show_frame(cls)
+    first = app._screens[classes[0]]
+    second = app._screens[classes[1]]
+    app.show_frame(classes[0])            # now the most recently shown
+    app.show_frame(classes[-1])
+    assert len(app._screens) == game.SCREEN_POOL_SIZE
+    assert not second.winfo_exists() and classes[1] not in app._screens
+    assert app._screens[classes[0]] is first and first.winfo_exists()
+
+    add_user(app.db, "bob")
+    app.user = app.db.get_user("bob")
+    app.show_frame(classes[0])
+    assert app._current_frame is not first and not first.winfo_exists()
+    assert list(app._screens) == [classes[0]]
+
+
+@needs_display
+def test_virtual_list_builds_only_the_rows_in_view(app):
+    data, made, fetched, pending = [f"row {i}" for i in range(120)], [], [], []
+
+    def make_row(parent):
+        made.append(game.tk.Label(parent))
+        return made[-1]
+
+    def fetch(page, last, deliver):
+        fetched.append((page, last))
+        pending.append(lambda: deliver(data[page * 50:(page + 1) * 50]))
+
+    def scroll_to_end():
+        vl._canvas.yview_moveto(1.0)
+        app.update()
+
+    vl = game.VirtualList(app, 20, make_row, lambda w, i, row: w.config(text=row),
+                          fetch, page_size=50, overscan=2)
+    vl.pack(fill="both", expand=True)
+    app.deiconify()
+    app.update()
+    pending.pop()()
+    app.update()
+
+    def check_view():
+        top   = int(vl._canvas.canvasy(0))
+        first = max(0, top // 20 - 2)
+        last  = min(len(vl._rows), (top + vl._canvas.winfo_height()) // 20 + 3)
+        assert set(vl._shown) == set(range(first, last))
+        for index, (widget, _) in vl._shown.items():
+            assert widget.cget("text") == data[index]
+
+    check_view()
+    visible = len(vl._shown)
+    assert visible < 50 and len(made) == visible and fetched == [(0, None)]
+
+    scroll_to_end()                       # asks for page 1 ...
+    assert fetched[-1] == (1, data[49])
+    vl.reset()                            # ... which is dropped when it arrives late
+    stale, fresh = pending
+    pending.clear()
+    stale()
+    assert vl._rows == []
+    fresh()
+    app.update()
+    assert len(vl._rows) == 50
+
+    for _ in range(10):
+        if vl._done:
+            break
+        scroll_to_end()
+        while pending:
+            pending.pop()()
+            app.update()
+    assert fetched[2:] == [(0, None), (1, data[49]), (2, data[99])]
+    assert vl._rows == data
+    check_view()
+    assert len(made) <= visible + 5       # rows are reused, not rebuilt
+
+
+@needs_display
+def test_confetti_sheds_pieces_when_frames_run_slow(app):
+    canvas = game.tk.Canvas(app, width=400, height=300)
+    confetti = game.ConfettiCanvas(canvas, 400, 300)
+    for _ in range(20):
+        confetti._animate(confetti.FRAME_MS / 1000)
+    assert len(confetti.items) == confetti.PARTICLES
+    for _ in range(50):
+        confetti._animate(0.1)
+    assert len(confetti.items) == confetti.MIN_PARTICLES == len(canvas.find_all())
+    for arr in (confetti.x, confetti.y, confetti.size, confetti.vy,
+                confetti.vx, confetti.angle, confetti.spin):
+        assert len(arr) == confetti.MIN_PARTICLES
+    assert max(confetti.y) <= 300                   # fallen pieces went back to the top
+
+
+# ── Benchmarks ───────────────────────────────────────────────────────────────
+
+@needs_display
+def test_bench_game_plays_every_mode_through_several_games(capsys):
+    report = game.bench_game(answers=450)
+    assert set(report["modes"]) == {"normal", "endless", "speedrun", "timewarp"}
+    for label in ("speedrun", "timewarp"):
+        assert report["modes"][label]["games"] >= 2
+    for mode in report["modes"].values():
+        assert mode["latency_ms"]["max"] >= mode["latency_ms"]["p50"] > 0
+
+
+# ── Sound ────────────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def cold_sound(tmp_path, monkeypatch):
+    """A SoundManager on an empty WAV cache whose preload never runs."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setattr(game.SoundManager, "load_sounds", lambda self: None)
+    backend = game.AudioBackend("true", ["true"], {"wav"})
+    sound = game.SoundManager(game.AudioBackends([backend]))
+    yield sound
+    sound.shutdown()
+
+
+def wait_for(check, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not check() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return check()
+
+
+def test_sfx_on_a_cold_cache_is_rendered_and_played(cold_sound):
+    assert cold_sound._sounds == {}
+    cold_sound.play("correct")
+    assert wait_for(lambda: cold_sound.sfx_stats()["played"] == 1)
+    path = cold_sound._sounds["correct"]
+    assert os.path.dirname(path) == game.SoundManager._cache_dir()
+    with open(path, "rb") as f:
+        assert f.read() == game.SoundManager._build_sfx("correct")
+
+
+def test_audio_backends_probe_each_player_once(monkeypatch):
+    installed, asked = {"aplay", "mpg123", "ffplay"}, []
+
+    def which(cmd):
+        asked.append(cmd)
+        return f"/usr/bin/{cmd}" if cmd in installed else None
+    monkeypatch.setattr(game.sys, "platform", "linux")
+    monkeypatch.setattr(game.shutil, "which", which)
+    monkeypatch.delenv("FLASHCARDS_AUDIO", raising=False)
+    backends = game.AudioBackends.create()
+    assert [b.name for b in backends.backends] == ["aplay", "mpg123", "ffplay"]
+    assert sorted(asked) == sorted({argv[0] for _, argv, _, platforms in game.AudioBackends.KNOWN
+                                    if argv and "linux" in platforms})
+    assert backends.for_format("wav").name == "aplay"
+    assert backends.for_format("mp3").name == "mpg123"
+    assert backends.for_format("raw").raw_command(22050, 1) == \
+        ["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-r", "22050", "-c", "1", "-"]
+    assert backends.for_format("ogg") is None
+
+    monkeypatch.setenv("FLASHCARDS_AUDIO", "null")
+    assert game.AudioBackends.create().is_null
+
+
+def test_sfx_player_coalesces_and_drops_instead_of_queueing(monkeypatch):
+    gate, started = threading.Event(), []
+
+    def start(self, path):
+        started.append(path)
+        return gate.wait(5)
+    monkeypatch.setattr(game.SFXPlayer, "_start", start)
+    names = [f"s{i}" for i in range(game.SFX_QUEUE_MAX + 2)]
+    sfx = game.SFXPlayer({n: f"{n}.wav" for n in names},
+                         game.AudioBackend("true", ["true"], {"wav"}))
+    try:
+        assert sfx.play("s0")
+        assert wait_for(lambda: started == ["s0.wav"])   # the worker is busy with s0
+        assert sfx.play("s1") and not sfx.play("s1")
+        for name in names[2:-1]:
+            assert sfx.play(name)
+        assert not sfx.play(names[-1])                   # queue full
+        assert not sfx.play("unknown")
+        gate.set()
+        assert wait_for(lambda: sfx.stats()["played"] == game.SFX_QUEUE_MAX + 1)
+        assert started == [f"{n}.wav" for n in names[:-1]]
+        assert (sfx.stats()["coalesced"], sfx.stats()["dropped"]) == (1, 1)
+    finally:
+        sfx.close()
+
+
+@pytest.mark.parametrize("player, returncode", [
+    ("exec sleep 30", -15),                   # ends on SIGTERM
+    ("trap '' TERM; sleep 3", -9),            # ignores it, so is killed
+], ids=["terminates", "killed"])
+def test_stop_music_leaves_the_player_to_the_music_thread(tmp_path, monkeypatch,
+                                                          player, returncode):
+    backend = game.AudioBackend("sh", ["sh", "-c", player], {"mp3"})
+    sound = game.SoundManager(game.AudioBackends([backend]))
+    monkeypatch.setattr(sound, "_find_music_files", lambda: [str(tmp_path / "a.mp3")])
+    try:
+        sound.start_music()
+        assert wait_for(lambda: sound._music_proc is not None)
+        proc = sound._music_proc
+        time.sleep(0.1)                       # let sh set its trap
+        t0 = time.perf_counter()
+        sound.stop_music()
+        assert time.perf_counter() - t0 < 0.05
+        assert wait_for(lambda: not sound._music_thread.is_alive())
+        assert proc.returncode == returncode
+    finally:
+        sound.shutdown()
+
+
+# ── PCM synthesis ────────────────────────────────────────────────────────────
+
+@pytest.fixture(scope="module")
+def reference_sounds():
+    return game.SoundManager._build_sounds(game.ReferencePCM)
+
+
+@pytest.mark.parametrize("backend", ["ArrayPCM", "NumpyPCM"])
+def test_pcm_backends_match_reference(reference_sounds, backend):
+    if backend == "NumpyPCM" and game.np is None:
+        pytest.skip("numpy not installed")
+    sounds = game.SoundManager._build_sounds(getattr(game, backend))
+    assert sounds.keys() == reference_sounds.keys()
+    for name, wav in sounds.items():
+        ref = reference_sounds[name]
+        assert wav[:44] == ref[:44], name
+        a, b = array("h", ref[44:]), array("h", wav[44:])
+        assert len(a) == len(b), name
+        assert max((abs(x - y) for x, y in zip(a, b)), default=0) <= 1, name